@@ -0,0 +1,236 @@
+from CommonServerPython import *
+from CommonServerUserPython import *
+
+''' IMPORTS '''
+import asyncio
+import aiohttp
+from requests.structures import CaseInsensitiveDict
+from typing import Callable, Iterable
+
+DEFAULT_MAX_CONCURRENT_REQUESTS = 10
+RETRY_METHODS = frozenset(['GET', 'POST', 'PUT'])
+
+
+class AsyncBaseClient:
+    def __init__(self, base_url: str, verify: bool = True, proxy: bool = False, ok_codes: tuple = tuple(),
+                 headers: Optional[dict] = None, auth: Optional[tuple] = None,
+                 timeout: Union[float, tuple] = BaseClient.REQUESTS_TIMEOUT,
+                 max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS):
+        """
+        asyncio client to use in integrations which send many independent requests, with an _http_request which
+        mirrors the one of BaseClient.
+        The client session is opened lazily, and should be closed with close() (or by using the client as an
+        async context manager).
+        :param base_url: Base server address with suffix, for example: https://example.com/api/v2/.
+        :param verify: Whether the request should verify the SSL certificate.
+        :param proxy: Whether to run the integration using the system proxy.
+        :param ok_codes: The request codes to accept as OK, for example: (200, 201, 204).
+        :param headers: The request headers, for example: {'Accept`: `application/json`}.
+        :param auth: The request authorization, for example: (username, password).
+        :param timeout: The requests timeout in seconds, or a (connect timeout, read timeout) tuple.
+        :param max_concurrent_requests: The maximal number of requests gather_requests sends at a time.
+        """
+        self._base_url = base_url
+        self._verify = verify
+        self._ok_codes = ok_codes
+        self._headers = headers
+        self._auth = auth
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.max_concurrent_requests = max(int(max_concurrent_requests or 1), 1)
+
+        if proxy:
+            ensure_proxy_has_http_prefix()
+        else:
+            skip_proxy()
+
+        if not verify:
+            skip_cert_verification()
+
+        # removing trailing = char from env var value added by the server
+        entity_timeout = os.getenv('REQUESTS_TIMEOUT.' + (get_integration_name() or get_script_name()), '')
+        system_timeout = os.getenv('REQUESTS_TIMEOUT', '')
+        self.timeout: Union[float, tuple] = timeout if isinstance(timeout, tuple) \
+            else float(entity_timeout or system_timeout or timeout)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if not self._session or self._session.closed:
+            # trust_env makes the session honour the proxy environment variables, like requests does
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=None if self._verify else False),
+                                                  trust_env=True)
+        return self._session
+
+    @staticmethod
+    def _get_client_timeout(timeout: Union[float, tuple]) -> aiohttp.ClientTimeout:
+        if isinstance(timeout, tuple):
+            connect_timeout, read_timeout = timeout
+            return aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        return aiohttp.ClientTimeout(total=timeout)
+
+    @staticmethod
+    async def _to_requests_response(res: aiohttp.ClientResponse) -> requests.Response:
+        """Reads the aiohttp response, and converts it to a requests response, so error handlers and callers
+        written for BaseClient can handle it."""
+        response = requests.Response()
+        response.status_code = res.status
+        response.reason = res.reason  # type: ignore[assignment]
+        response.url = str(res.url)
+        response.headers = CaseInsensitiveDict(res.headers)
+        response.encoding = res.charset  # type: ignore[assignment]
+        response._content = await res.read()
+        return response
+
+    def _is_status_code_valid(self, response: requests.Response, ok_codes: Optional[tuple] = None) -> bool:
+        status_codes = ok_codes if ok_codes else self._ok_codes
+        if status_codes:
+            return response.status_code in status_codes
+        return response.ok
+
+    async def _send_with_retries(self, method: str, address: str, retries: int = 0,
+                                 status_list_to_retry: Optional[Iterable] = None, backoff_factor: float = 5,
+                                 raise_on_status: bool = False, **kwargs) -> requests.Response:
+        """Sends the request, and retries it (like the urllib3 Retry of BaseClient) on connection errors and on the
+        status codes in status_list_to_retry, for GET, POST and PUT requests."""
+        retry_statuses = set(status_list_to_retry or [])
+        can_retry = method.upper() in RETRY_METHODS
+        attempt = 0
+        while True:
+            attempt += 1
+            retries_left = can_retry and attempt <= retries
+            try:
+                async with self._get_session().request(method, address, **kwargs) as res:
+                    response = await self._to_requests_response(res)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if not retries_left:
+                    raise
+            else:
+                if response.status_code not in retry_statuses:
+                    return response
+                if not retries_left:
+                    if raise_on_status:
+                        raise DemistoException(f'Max Retries Error- Request attempts with {retries} retries failed.'
+                                               f' \nReason: too many {response.status_code} error responses',
+                                               res=response)
+                    return response
+
+            if attempt > 1:
+                # same as urllib3 - no backoff before the first retry
+                await asyncio.sleep(backoff_factor * (2 ** (attempt - 1)))
+
+    async def _http_request(self, method: str, url_suffix: str = '', full_url: Optional[str] = None,
+                            headers: Optional[dict] = None, auth: Optional[tuple] = None, json_data: Any = None,
+                            params: Optional[dict] = None, data: Any = None, timeout: Optional[Union[float, tuple]] = None,
+                            resp_type: str = 'json', ok_codes: Optional[tuple] = None,
+                            return_empty_response: bool = False, retries: int = 0,
+                            status_list_to_retry: Optional[Iterable] = None, backoff_factor: float = 5,
+                            raise_on_status: bool = False, error_handler: Optional[Callable] = None,
+                            empty_valid_codes: Optional[list] = None, **kwargs):
+        """
+        An asyncio version of BaseClient._http_request, with the same arguments and return values.
+        The responses passed to the error_handler, or returned for resp_type 'response', are requests.Response
+        objects, so the error handlers of the sync clients can be reused.
+        """
+        try:
+            address = full_url if full_url else urljoin(self._base_url, url_suffix)
+            headers = headers if headers else self._headers
+            auth = auth if auth else self._auth
+            if not timeout:
+                timeout = self.timeout
+
+            res = await self._send_with_retries(
+                method,
+                address,
+                retries=retries,
+                status_list_to_retry=status_list_to_retry,
+                backoff_factor=backoff_factor,
+                raise_on_status=raise_on_status,
+                params=params,
+                data=data,
+                json=json_data,
+                headers=headers,
+                auth=aiohttp.BasicAuth(*auth) if isinstance(auth, tuple) else auth,
+                timeout=self._get_client_timeout(timeout),
+                **kwargs
+            )
+            # Handle error responses gracefully
+            if not self._is_status_code_valid(res, ok_codes):
+                if error_handler:
+                    error_handler(res)
+                else:
+                    err_msg = f'Error in API call [{res.status_code}] - {res.reason}'
+                    try:
+                        # Try to parse json error response
+                        error_entry = res.json()
+                        err_msg += f'\n{json.dumps(error_entry)}'
+                        raise DemistoException(err_msg, res=res)
+                    except ValueError:
+                        err_msg += f'\n{res.text}'
+                        raise DemistoException(err_msg, res=res)
+
+            if not empty_valid_codes:
+                empty_valid_codes = [204]
+            is_response_empty_and_successful = (res.status_code in empty_valid_codes)
+            if is_response_empty_and_successful and return_empty_response:
+                return res
+
+            resp_type = resp_type.lower()
+            try:
+                if resp_type == 'json':
+                    return res.json()
+                if resp_type == 'text':
+                    return res.text
+                if resp_type == 'content':
+                    return res.content
+                if resp_type == 'xml':
+                    ET.fromstring(res.text)
+                return res
+            except ValueError as exception:
+                raise DemistoException(f'Failed to parse json object from response: {res.content!r}', exception, res)
+        except asyncio.TimeoutError as exception:
+            err_msg = 'Connection Timeout Error - potential reasons might be that the Server URL parameter' \
+                      ' is incorrect or that the Server is not accessible from your host.'
+            raise DemistoException(err_msg, exception)
+        except aiohttp.ClientSSLError as exception:
+            # in case the "Trust any certificate" is already checked
+            if not self._verify:
+                raise
+            err_msg = 'SSL Certificate Verification Failed - try selecting \'Trust any certificate\' checkbox in' \
+                      ' the integration configuration.'
+            raise DemistoException(err_msg, exception)
+        except aiohttp.ClientProxyConnectionError as exception:
+            err_msg = 'Proxy Error - if the \'Use system proxy\' checkbox in the integration configuration is' \
+                      ' selected, try clearing the checkbox.'
+            raise DemistoException(err_msg, exception)
+        except aiohttp.ClientConnectionError as exception:
+            err_type = f'<{exception.__class__.__module__}.{exception.__class__.__name__}>'
+            err_msg = 'Verify that the server URL parameter' \
+                      ' is correct and that you have access to the server from your host.' \
+                      f'\nError Type: {err_type}\nMessage: {exception}\n'
+            raise DemistoException(err_msg, exception)
+
+    async def gather_requests(self, requests_kwargs: List[dict], return_exceptions: bool = False) -> list:
+        """
+        Sends the given requests concurrently, with at most max_concurrent_requests requests at a time.
+        :param requests_kwargs: the _http_request arguments of each of the requests
+        :param return_exceptions: whether to return the exception of a failed request as its result, instead of
+            raising it
+        :return: the results of the requests, by the requests order
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+
+        async def send_request(request_kwargs: dict) -> Any:
+            async with semaphore:
+                return await self._http_request(**request_kwargs)
+
+        return await asyncio.gather(*(send_request(request_kwargs) for request_kwargs in requests_kwargs),
+                                    return_exceptions=return_exceptions)
@@ -0,0 +1,132 @@
+import asyncio
+import json
+
+import pytest
+
+import CommonServerPython
+from AsyncBaseClientApiModule import *
+
+BASE_URL = 'https://example.com/api/v2/'
+
+
+class MockResponse:
+    """A minimal aiohttp.ClientResponse, used as the async context manager returned by ClientSession.request."""
+
+    def __init__(self, status=200, payload=None, reason='OK'):
+        self.status = status
+        self.reason = reason
+        self.url = BASE_URL
+        self.headers = {'Content-Type': 'application/json'}
+        self.charset = 'utf-8'
+        self._body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+
+    async def read(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def handle_calling_context(mocker):
+    mocker.patch.object(CommonServerPython, 'get_integration_name', return_value='Test')
+
+
+def mock_session(mocker, client, side_effect):
+    session = mocker.MagicMock()
+    session.request.side_effect = side_effect
+    mocker.patch.object(client, '_get_session', return_value=session)
+    return session
+
+
+def test_http_request_json(mocker):
+    """
+    Given:
+        - An async client.
+    When:
+        - Sending a request which returns a JSON response.
+    Then:
+        - Ensure the request is sent with the full URL and the params.
+        - Ensure the parsed JSON is returned.
+    """
+    client = AsyncBaseClient(BASE_URL)
+    session = mock_session(mocker, client, [MockResponse(payload={'status': 'ok'})])
+
+    assert asyncio.run(client._http_request('GET', 'event', params={'id': '1'})) == {'status': 'ok'}
+    assert session.request.call_args[0] == ('GET', f'{BASE_URL}event')
+    assert session.request.call_args[1]['params'] == {'id': '1'}
+
+
+def test_http_request_error(mocker):
+    """
+    Given:
+        - An async client.
+    When:
+        - Sending requests which return an error status code, with and without an error handler.
+    Then:
+        - Ensure a DemistoException is raised with the error details.
+        - Ensure the error handler gets a requests.Response.
+    """
+    responses = []
+    client = AsyncBaseClient(BASE_URL)
+    mock_session(mocker, client, lambda *_, **__: MockResponse(status=404, payload={'error': 'not found'}))
+
+    with pytest.raises(DemistoException, match=r'Error in API call \[404\]'):
+        asyncio.run(client._http_request('GET', 'event'))
+
+    asyncio.run(client._http_request('GET', 'event', error_handler=responses.append, resp_type='response'))
+
+    assert isinstance(responses[0], requests.Response)
+    assert responses[0].status_code == 404
+    assert responses[0].json() == {'error': 'not found'}
+
+
+def test_http_request_retries(mocker):
+    """
+    Given:
+        - An async client, and an endpoint which fails twice with 503 before succeeding.
+    When:
+        - Sending a request with retries on 503.
+    Then:
+        - Ensure the request is retried until it succeeds.
+    """
+    client = AsyncBaseClient(BASE_URL)
+    session = mock_session(mocker, client, [MockResponse(status=503), MockResponse(status=503),
+                                            MockResponse(payload={'status': 'ok'})])
+
+    res = asyncio.run(client._http_request('GET', 'event', retries=2, status_list_to_retry=[503], backoff_factor=0))
+
+    assert res == {'status': 'ok'}
+    assert session.request.call_count == 3
+
+
+def test_gather_requests(mocker):
+    """
+    Given:
+        - An async client with max_concurrent_requests of 2.
+    When:
+        - Gathering several requests.
+    Then:
+        - Ensure the results are ordered by the requests, and that at most 2 requests were sent at a time.
+    """
+    running = 0
+    max_running = 0
+
+    async def http_request(url_suffix, **_):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return url_suffix
+
+    client = AsyncBaseClient(BASE_URL, max_concurrent_requests=2)
+    mocker.patch.object(client, '_http_request', side_effect=http_request)
+
+    results = asyncio.run(client.gather_requests([{'method': 'GET', 'url_suffix': f'event/{i}'} for i in range(6)]))
+
+    assert results == [f'event/{i}' for i in range(6)]
+    assert max_running == 2
@@ -3,16 +3,23 @@ from CommonServerPython import *
 from CommonServerUserPython import *
 
 ''' IMPORTS '''
+import codecs
 import csv
 import gzip
+import tempfile
+import zlib
 import urllib3
-from typing import Optional, Pattern, Dict, Any, Tuple, Union, List
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Optional, Pattern, Dict, Any, Tuple, Union, List, Iterator, IO
 
 # disable insecure warnings
 urllib3.disable_warnings()
 
 # Globals
 DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+STREAM_CHUNK_SIZE = 1024 * 1024
+DEFAULT_MAX_CONCURRENT_REQUESTS = 5
 
 
 class Client(BaseClient):
@@ -20,7 +27,8 @@ class Client(BaseClient):
                  insecure: bool = False, credentials: dict = None, ignore_regex: str = None, encoding: str = 'latin-1',
                  delimiter: str = ',', doublequote: bool = True, escapechar: str = '',
                  quotechar: str = '"', skipinitialspace: bool = False, polling_timeout: int = 20, proxy: bool = False,
-                 feedTags: Optional[str] = None, tlp_color: Optional[str] = None, value_field: str = 'value', **kwargs):
+                 feedTags: Optional[str] = None, tlp_color: Optional[str] = None, value_field: str = 'value',
+                 max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS, **kwargs):
         """
         :param url: URL of the feed.
         :param feed_url_to_config: for each URL, a configuration of the feed that contains
@@ -65,6 +73,7 @@ class Client(BaseClient):
         :param polling_timeout: timeout of the polling request in seconds. Default: 20
         :param proxy: Sets whether use proxy when sending requests
         :param tlp_color: Traffic Light Protocol color.
+        :param max_concurrent_requests: maximal number of feed URLs which are downloaded concurrently. Default: 5
         """
         self.tags: List[str] = argToList(feedTags)
         self.tlp_color = tlp_color
@@ -86,7 +95,11 @@ class Client(BaseClient):
             if username and password:
                 auth = (username, password)
 
-        super().__init__(base_url=url, proxy=proxy, verify=not insecure, auth=auth)
+        self.max_concurrent_requests = max(int(max_concurrent_requests or 1), 1)
+        # all the feed URLs share the client session, so its connection pools should fit the concurrent requests
+        session_pool_size = self.max_concurrent_requests \
+            if self.max_concurrent_requests > requests.adapters.DEFAULT_POOLSIZE else None
+        super().__init__(base_url=url, proxy=proxy, verify=not insecure, auth=auth, session_pool_size=session_pool_size)
 
         try:
             self.polling_timeout = int(polling_timeout)
@@ -115,79 +128,135 @@ class Client(BaseClient):
 
         return r.prepare()
 
+    def send_request(self, url: str, last_run: Optional[dict] = None, **kwargs) -> requests.Response:
+        """Sends the (streamed) feed request of a single URL with the client session.
+
+        Args:
+            url: The feed's url.
+            last_run: The last run object, used to set the If-None-Match and If-Modified-Since headers.
+                None if the server version doesn't support these headers.
+
+        Returns:
+            requests.Response. The raw response of the feed.
+        """
+        prepreq = self._build_request(url)
+
+        # this is to honour the proxy environment variables
+        kwargs.update(self._session.merge_environment_settings(
+            prepreq.url,
+            {}, None, None, None  # defaults
+        ))
+        kwargs['stream'] = True
+        kwargs['verify'] = self._verify
+        kwargs['timeout'] = self.polling_timeout
+
+        headers = dict(self.headers)
+        if last_run is not None:
+            # Set the If-None-Match and If-Modified-Since headers if we have etag or
+            # last_modified values in the context.
+            etag = last_run.get(url, {}).get('etag')
+            last_modified = last_run.get(url, {}).get('last_modified')
+
+            if etag:
+                headers['If-None-Match'] = etag
+
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        if headers:
+            prepreq.headers = headers
+
+        try:
+            return self._session.send(prepreq, **kwargs)
+        except requests.exceptions.ConnectTimeout as exception:
+            err_msg = 'Connection Timeout Error - potential reasons might be that the Server URL parameter' \
+                      ' is incorrect or that the Server is not accessible from your host.'
+            raise DemistoException(err_msg, exception)
+        except requests.exceptions.SSLError as exception:
+            # in case the "Trust any certificate" is already checked
+            if not self._verify:
+                raise
+            err_msg = 'SSL Certificate Verification Failed - try selecting \'Trust any certificate\' checkbox in' \
+                      ' the integration configuration.'
+            raise DemistoException(err_msg, exception)
+        except requests.exceptions.ProxyError as exception:
+            err_msg = 'Proxy Error - if the \'Use system proxy\' checkbox in the integration configuration is' \
+                      ' selected, try clearing the checkbox.'
+            raise DemistoException(err_msg, exception)
+        except requests.exceptions.ConnectionError as exception:
+            # Get originating Exception in Exception chain
+            error_class = str(exception.__class__)
+            err_type = '<' + error_class[error_class.find('\'') + 1: error_class.rfind('\'')] + '>'
+            err_msg = 'Verify that the server URL parameter' \
+                      ' is correct and that you have access to the server from your host.' \
+                      '\nError Type: {}\nError Number: [{}]\nMessage: {}\n' \
+                .format(err_type, exception.errno, exception.strerror)
+            raise DemistoException(err_msg, exception)
+
+    def download_feed(self, url: str, last_run: Optional[dict] = None,
+                      **kwargs) -> Tuple[requests.Response, Optional[IO[bytes]]]:
+        """Sends the feed request of a single URL, and downloads the body of a successful response chunk by chunk
+        into a temporary file. The connection is released once the download is done, while the memory usage stays
+        flat regardless of the feed size. Used to download several feeds concurrently.
+
+        Args:
+            url: The feed's url.
+            last_run: The last run object (see send_request).
+
+        Returns:
+            Tuple. The response of the feed, and the temporary file of its body (None if the request failed).
+        """
+        r = self.send_request(url, last_run, **kwargs)
+        if not r.ok:
+            return r, None
+
+        body_file = tempfile.TemporaryFile()
+        try:
+            for chunk in r.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                body_file.write(chunk)
+        except Exception:
+            body_file.close()
+            raise
+        finally:
+            r.close()
+        body_file.seek(0)
+        return r, body_file
+
     def build_iterator(self, **kwargs):
         results = []
         urls = self._base_url
         if not isinstance(urls, list):
             urls = [urls]
-        for url in urls:
-            _session = requests.Session()
-
-            prepreq = self._build_request(url)
-
-            # this is to honour the proxy environment variables
-            kwargs.update(_session.merge_environment_settings(
-                prepreq.url,
-                {}, None, None, None  # defaults
-            ))
-            kwargs['stream'] = True
-            kwargs['verify'] = self._verify
-            kwargs['timeout'] = self.polling_timeout
-
-            if is_demisto_version_ge('6.5.0'):
-                # Set the If-None-Match and If-Modified-Since headers if we have etag or
-                # last_modified values in the context.
-                last_run = demisto.getLastRun()
-                etag = last_run.get(url, {}).get('etag')
-                last_modified = last_run.get(url, {}).get('last_modified')
 
-                if etag:
-                    self.headers['If-None-Match'] = etag
+        # set request headers
+        if 'headers' in kwargs:
+            self.headers.update(kwargs['headers'])
+            del kwargs['headers']
 
-                if last_modified:
-                    self.headers['If-Modified-Since'] = last_modified
+        # the last run is read once here, as the requests are sent from worker threads
+        last_run = demisto.getLastRun() if is_demisto_version_ge('6.5.0') else None
 
-            # set request headers
-            if 'headers' in kwargs:
-                self.headers.update(kwargs['headers'])
-                del kwargs['headers']
-
-            if self.headers:
-                prepreq.headers = self.headers
+        if len(urls) == 1:
+            # a single feed is streamed from its response
+            responses: List[Tuple[requests.Response, Optional[IO[bytes]]]] = [
+                (self.send_request(urls[0], last_run, **kwargs), None)]
+        else:
+            # several feeds are downloaded concurrently, each into a temporary file, so at most max_concurrent_requests
+            # bodies are downloaded at once and none of them is held in memory. They are then streamed by their order
+            with ThreadPoolExecutor(max_workers=max(min(self.max_concurrent_requests, len(urls)), 1)) as executor:
+                responses = list(executor.map(lambda feed_url: self.download_feed(feed_url, last_run, **kwargs), urls))
 
-            try:
-                r = _session.send(prepreq, **kwargs)
-            except requests.exceptions.ConnectTimeout as exception:
-                err_msg = 'Connection Timeout Error - potential reasons might be that the Server URL parameter' \
-                          ' is incorrect or that the Server is not accessible from your host.'
-                raise DemistoException(err_msg, exception)
-            except requests.exceptions.SSLError as exception:
-                # in case the "Trust any certificate" is already checked
-                if not self._verify:
-                    raise
-                err_msg = 'SSL Certificate Verification Failed - try selecting \'Trust any certificate\' checkbox in' \
-                          ' the integration configuration.'
-                raise DemistoException(err_msg, exception)
-            except requests.exceptions.ProxyError as exception:
-                err_msg = 'Proxy Error - if the \'Use system proxy\' checkbox in the integration configuration is' \
-                          ' selected, try clearing the checkbox.'
-                raise DemistoException(err_msg, exception)
-            except requests.exceptions.ConnectionError as exception:
-                # Get originating Exception in Exception chain
-                error_class = str(exception.__class__)
-                err_type = '<' + error_class[error_class.find('\'') + 1: error_class.rfind('\'')] + '>'
-                err_msg = 'Verify that the server URL parameter' \
-                          ' is correct and that you have access to the server from your host.' \
-                          '\nError Type: {}\nError Number: [{}]\nMessage: {}\n' \
-                    .format(err_type, exception.errno, exception.strerror)
-                raise DemistoException(err_msg, exception)
+        for url, (r, body_file) in zip(urls, responses):
             try:
                 r.raise_for_status()
             except Exception:
                 return_error('Exception in request: {} {}'.format(r.status_code, r.content))
                 raise
 
-            response = self.get_feed_content_divided_to_lines(url, r)
+            if body_file is not None:
+                response = self.get_feed_content_lines(url, read_file_chunks(body_file))
+            else:
+                response = self.get_feed_content_lines_stream(url, r)
             if self.feed_url_to_config:
                 fieldnames = self.feed_url_to_config.get(url, {}).get('fieldnames', [])
                 skip_first_line = self.feed_url_to_config.get(url, {}).get('skip_first_line', False)
@@ -230,6 +299,78 @@ class Client(BaseClient):
 
         return response_content.decode(self.encoding).split('\n')
 
+    def get_feed_content_lines_stream(self, url, raw_response):
+        """Lazily decode the feed response into lines, without holding the whole feed in memory.
+
+        The response body is read chunk by chunk (gunzipped on the fly if the feed is zipped), and every
+        line is yielded as soon as it is complete, so the result is identical to the one returned by
+        get_feed_content_divided_to_lines while the memory usage stays flat regardless of the feed size.
+
+        Args:
+            url: Current feed's url.
+            raw_response: The raw (streamed) response from the feed's url.
+
+        Returns:
+            Generator. The lines of the feed content.
+        """
+        return self.get_feed_content_lines(url, raw_response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+
+    def get_feed_content_lines(self, url, chunks):
+        """Lazily decode the feed content chunks into lines (see get_feed_content_lines_stream).
+
+        Args:
+            url: Current feed's url.
+            chunks: The (raw) content chunks of the feed.
+
+        Returns:
+            Generator. The lines of the feed content.
+        """
+        if self.feed_url_to_config and self.feed_url_to_config.get(url, {}).get('is_zipped_file'):
+            chunks = gunzip_stream(chunks)
+
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        pending = ''
+        for chunk in chunks:
+            pending += decoder.decode(chunk)
+            lines = pending.split('\n')
+            pending = lines.pop()
+            yield from lines
+
+        pending += decoder.decode(b'', final=True)
+        yield from pending.split('\n')
+
+
+def read_file_chunks(file: IO[bytes]) -> Iterator[bytes]:
+    """
+    Reads a file chunk by chunk, and closes it once it was read.
+    Args:
+        file: The file to read.
+    Returns:
+        Generator of the file content chunks.
+    """
+    with file:
+        yield from iter(lambda: file.read(STREAM_CHUNK_SIZE), b'')
+
+
+def gunzip_stream(chunks):
+    """
+    Incrementally decompress a gzip stream (including multi-member gzip files, like gzip.decompress does).
+    Args:
+        chunks: (Iterable[bytes]) The compressed content chunks.
+    Returns:
+        Generator of the decompressed content chunks.
+    """
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        while chunk:
+            yield decompressor.decompress(chunk)
+            if not decompressor.eof:
+                break
+            # a new gzip member starts right after the end of the current one
+            chunk = decompressor.unused_data
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    yield decompressor.flush()
+
 
 def get_no_update_value(response: requests.models.Response, url: str) -> bool:
     """
@@ -337,14 +478,40 @@ def create_fields_mapping(raw_json: Dict[str, Any], mapping: Dict[str, Union[Tup
 
 def fetch_indicators_command(client: Client, default_indicator_type: str, auto_detect: bool, limit: int = 0,
                              create_relationships: bool = False, **kwargs):
+    indicators, no_update = stream_indicators_command(client, default_indicator_type, auto_detect, limit,
+                                                      create_relationships, **kwargs)
+    return list(indicators), no_update
+
+
+def stream_indicators_command(client: Client, default_indicator_type: str, auto_detect: bool, limit: int = 0,
+                              create_relationships: bool = False, **kwargs) -> Tuple[Iterator[dict], bool]:
+    """
+    Fetches the feeds and returns a generator of their indicators, which are parsed only when consumed.
+    Args:
+        client: (Client) The feed client.
+        default_indicator_type: (str) The default indicator type.
+        auto_detect: (bool) Whether to automatically detect the indicator type.
+        limit: (int) The maximal number of indicators to generate, 0 for no limit.
+        create_relationships: (bool) Whether to create the indicators relationships.
+    Returns:
+        A tuple of the indicators generator and the noUpdate value for the createIndicators command.
+    """
     iterator = client.build_iterator(**kwargs)
-    relationships_of_indicator = []
-    indicators = []
-    config = client.feed_url_to_config or {}
 
     # set noUpdate flag in createIndicators command True only when all the results from all the urls are True.
     no_update = all([next(iter(item.values())).get('no_update', False) for item in iterator])
 
+    indicators = generate_indicators(client, iterator, default_indicator_type, auto_detect, create_relationships)
+    if limit:
+        indicators = islice(indicators, limit)
+    return indicators, no_update
+
+
+def generate_indicators(client: Client, iterator: List[dict], default_indicator_type: str, auto_detect: bool,
+                        create_relationships: bool = False) -> Iterator[dict]:
+    relationships_of_indicator = []
+    config = client.feed_url_to_config or {}
+
     for url_to_reader in iterator:
         for url, reader in url_to_reader.items():
             mapping = config.get(url, {}).get('mapping', {})
@@ -385,12 +552,7 @@ def fetch_indicators_command(client: Client, default_indicator_type: str, auto_d
                     if client.tlp_color:
                         indicator['fields']['trafficlightprotocol'] = client.tlp_color
 
-                    indicators.append(indicator)
-                    # exit the loop if we have more indicators than the limit
-                    if limit and len(indicators) >= limit:
-                        return indicators, no_update
-
-    return indicators, no_update
+                    yield indicator
 
 
 def get_indicators_command(client, args: dict, tags: Optional[List[str]] = None):
@@ -409,7 +571,7 @@ def get_indicators_command(client, args: dict, tags: Optional[List[str]] = None)
     return hr, {}, indicators_list
 
 
-def feed_main(feed_name, params=None, prefix=''):   # pragma: no cover
+def feed_main(feed_name, params=None, prefix='', batch_size=2000):   # pragma: no cover
     if not params:
         params = {k: v for k, v in demisto.params().items() if v is not None}
     handle_proxy()
@@ -426,29 +588,15 @@ def feed_main(feed_name, params=None, prefix=''):   # pragma: no cover
     }
     try:
         if command == 'fetch-indicators':
-            indicators, no_update = fetch_indicators_command(
+            indicators, no_update = stream_indicators_command(
                 client,
                 params.get('indicator_type'),
                 params.get('auto_detect_type'),
                 params.get('limit'),
                 params.get('create_relationships')
             )
-
-            # check if the version is higher than 6.5.0 so we can use noUpdate parameter
-            if is_demisto_version_ge('6.5.0'):
-                if not indicators:
-                    demisto.createIndicators(indicators, noUpdate=no_update)  # type: ignore
-                else:
-                    # we submit the indicators in batches
-                    for b in batch(indicators, batch_size=2000):
-                        demisto.createIndicators(b, noUpdate=no_update)  # type: ignore
-            else:
-                # call createIndicators without noUpdate arg
-                if not indicators:
-                    demisto.createIndicators(indicators)  # type: ignore
-                else:
-                    for b in batch(indicators, batch_size=2000):  # type: ignore
-                        demisto.createIndicators(b)
+            # the indicators are submitted in batches while the feed is still being read
+            create_indicators_in_batches(indicators, batch_size=batch_size, no_update=no_update)
 
         else:
             args = demisto.args()
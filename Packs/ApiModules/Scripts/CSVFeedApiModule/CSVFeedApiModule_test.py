@@ -151,6 +151,51 @@ def test_get_feed_content():
             assert client.get_feed_content_divided_to_lines(url, raw_response) == expected_output
 
 
+def test_get_feed_content_lines_stream(mocker):
+    """
+    Given
+    - A plain feed, a gzipped feed and a multi-member gzipped feed.
+    When
+    - Reading the feeds lines with get_feed_content_lines_stream using tiny chunks.
+    Then
+    - Ensure the lines are identical to the lines returned by get_feed_content_divided_to_lines.
+    """
+    import CSVFeedApiModule
+    mocker.patch.object(CSVFeedApiModule, 'STREAM_CHUNK_SIZE', 7)
+
+    with open('test_data/ip_ranges.txt', 'rb') as ip_ranges_txt:
+        ip_ranges_unzipped = ip_ranges_txt.read() + 'ñ,non ascii\n'.encode('utf8')
+
+    feed_url_to_config = {
+        'https://ipstack1.com': {
+            'content': ip_ranges_unzipped
+        },
+        'https://ipstack2.com': {
+            'content': gzip.compress(ip_ranges_unzipped),
+            'is_zipped_file': True
+        },
+        'https://ipstack3.com': {
+            'content': gzip.compress(ip_ranges_unzipped[:100]) + gzip.compress(ip_ranges_unzipped[100:]),
+            'is_zipped_file': True
+        }
+    }
+
+    with requests_mock.Mocker() as m:
+        for url in feed_url_to_config:
+            client = Client(
+                url=url,
+                feed_url_to_config=feed_url_to_config,
+                encoding='utf8',
+            )
+
+            m.get(url, content=feed_url_to_config.get(url).get('content'))
+            raw_response = requests.get(url, stream=True)
+            expected_output = client.get_feed_content_divided_to_lines(url, raw_response)
+            raw_response = requests.get(url, stream=True)
+
+            assert list(client.get_feed_content_lines_stream(url, raw_response)) == expected_output
+
+
 @pytest.mark.parametrize('date_string,expected_result', [
     ("2020-02-10 13:39:14", '2020-02-10T13:39:14Z'), ("2020-02-10T13:39:14", '2020-02-10T13:39:14Z'),
     ("2020-02-10 13:39:14.123", '2020-02-10T13:39:14Z'), ("2020-02-10T13:39:14.123", '2020-02-10T13:39:14Z'),
@@ -471,3 +516,56 @@ def test_get_no_update_value_without_headers(mocker):
     assert not no_update
     assert demisto.debug.call_args[0][0] == 'Last-Modified and Etag headers are not exists,' \
                                             'createIndicators will be executed with noUpdate=False.'
+
+
+def test_client_session_pool_size():
+    """
+    Given
+    - max_concurrent_requests larger than the default connection pool size.
+
+    When
+    - Creating the client.
+
+    Then
+    - Ensure the session adapters fit the concurrent requests, and keep their default retries configuration.
+    """
+    client = Client(url=['https://feed.com'], max_concurrent_requests=20)
+    for adapter in client._session.adapters.values():
+        assert adapter._pool_maxsize == 20
+        assert adapter.max_retries.total == requests.adapters.DEFAULT_RETRIES
+
+
+def test_build_iterator_multiple_urls_concurrently(mocker):
+    """
+    Given
+    - Several feed URLs, where only one of them has an etag in the last run.
+
+    When
+    - Running build_iterator method with concurrent requests.
+
+    Then
+    - Ensure the response bodies are downloaded by the workers into files, and are not held in memory.
+    - Ensure the results are ordered by the feed URLs.
+    - Ensure the If-None-Match header is sent only to the URL it belongs to.
+    """
+    urls = [f'https://feed{i}.com' for i in range(10)]
+    mocker.patch('CommonServerPython.get_demisto_version', return_value={"version": "6.5.0"})
+    mocker.patch.object(demisto, 'getLastRun', return_value={urls[3]: {'etag': 'etag3'}})
+    mocker.patch.object(demisto, 'setLastRun')
+    with requests_mock.Mocker() as m:
+        for i, url in enumerate(urls):
+            m.get(url, content=f'1.1.1.{i}'.encode())
+
+        client = Client(url=urls, fieldnames='value', max_concurrent_requests=4)
+        download_feed = mocker.spy(client, 'download_feed')
+        result = client.build_iterator()
+
+        assert download_feed.call_count == len(urls)
+        assert all(response._content is False and body_file is not None
+                   for response, body_file in download_feed.spy_return_list)
+
+        assert [next(iter(item)) for item in result] == urls
+        assert [list(result[i][url]['result']) for i, url in enumerate(urls)] == \
+               [[{'value': f'1.1.1.{i}'}] for i in range(len(urls))]
+        assert {request.url.rstrip('/'): request.headers.get('If-None-Match') for request in m.request_history} == \
+               {url: 'etag3' if url == urls[3] else None for url in urls}
@@ -5,7 +5,7 @@ from CommonServerUserPython import *
 ''' IMPORTS '''
 import urllib3
 import requests
-from typing import Optional, Pattern, List
+from typing import Optional, Pattern, List, Tuple, Iterator
 
 # disable insecure warnings
 urllib3.disable_warnings()
@@ -414,12 +414,36 @@ def get_indicator_fields(line, url, feed_tags: list, tlp_color: Optional[str], c
 
 
 def fetch_indicators_command(client, feed_tags, tlp_color, itype, auto_detect, create_relationships=False, **kwargs):
+    indicators, no_update = stream_indicators_command(client, feed_tags, tlp_color, itype, auto_detect,
+                                                      create_relationships, **kwargs)
+    return list(indicators), no_update
+
+
+def stream_indicators_command(client, feed_tags, tlp_color, itype, auto_detect, create_relationships=False,
+                              **kwargs) -> Tuple[Iterator[dict], bool]:
+    """
+    Fetches the feeds and returns a generator of their indicators, which are parsed only when consumed.
+    Args:
+        client: (Client) The feed client.
+        feed_tags: (list) The indicators tags.
+        tlp_color: (str) Traffic Light Protocol color.
+        itype: (str) The default indicator type.
+        auto_detect: (bool) Whether to automatically detect the indicator type.
+        create_relationships: (bool) Whether to create the indicators relationships.
+    Returns:
+        A tuple of the indicators generator and the noUpdate value for the createIndicators command.
+    """
     iterators = client.build_iterator(**kwargs)
-    indicators = []
 
     # set noUpdate flag in createIndicators command True only when all the results from all the urls are True.
     no_update = all([next(iter(iterator.values())).get('no_update', False) for iterator in iterators])
 
+    return generate_indicators(client, iterators, feed_tags, tlp_color, itype, auto_detect,
+                               create_relationships), no_update
+
+
+def generate_indicators(client, iterators, feed_tags, tlp_color, itype, auto_detect,
+                        create_relationships=False) -> Iterator[dict]:
     for iterator in iterators:
         for url, lines in iterator.items():
             for line in lines.get('result', []):
@@ -454,8 +478,7 @@ def fetch_indicators_command(client, feed_tags, tlp_color, itype, auto_detect, c
                         custom_fields = client.custom_fields_creator(attributes)
                         indicator_data["fields"] = custom_fields
 
-                    indicators.append(indicator_data)
-    return indicators, no_update
+                    yield indicator_data
 
 
 def determine_indicator_type(indicator_type, default_indicator_type, auto_detect, value):
@@ -504,7 +527,7 @@ def test_module(client: Client, args):
     return 'ok', {}, {}
 
 
-def feed_main(feed_name, params=None, prefix=''):
+def feed_main(feed_name, params=None, prefix='', batch_size=2000):
     if not params:
         params = assign_params(**demisto.params())
     if 'feed_name' not in params:
@@ -524,26 +547,12 @@ def feed_main(feed_name, params=None, prefix=''):
     }
     try:
         if command == 'fetch-indicators':
-            indicators, no_update = fetch_indicators_command(client, feed_tags, tlp_color,
-                                                             params.get('indicator_type'),
-                                                             params.get('auto_detect_type'),
-                                                             params.get('create_relationships'))
-
-            # check if the version is higher than 6.5.0 so we can use noUpdate parameter
-            if is_demisto_version_ge('6.5.0'):
-                if not indicators:
-                    demisto.createIndicators(indicators, noUpdate=no_update)  # type: ignore
-                else:
-                    # we submit the indicators in batches
-                    for b in batch(indicators, batch_size=2000):
-                        demisto.createIndicators(b, noUpdate=no_update)  # type: ignore
-            else:
-                # call createIndicators without noUpdate arg
-                if not indicators:
-                    demisto.createIndicators(indicators)  # type: ignore
-                else:
-                    for b in batch(indicators, batch_size=2000):  # type: ignore
-                        demisto.createIndicators(b)
+            indicators, no_update = stream_indicators_command(client, feed_tags, tlp_color,
+                                                              params.get('indicator_type'),
+                                                              params.get('auto_detect_type'),
+                                                              params.get('create_relationships'))
+            # the indicators are submitted in batches while the feed is still being read
+            create_indicators_in_batches(indicators, batch_size=batch_size, no_update=no_update)
 
         else:
             args = demisto.args()
@@ -3,18 +3,28 @@ from CommonServerPython import *
 ''' IMPORTS '''
 import urllib3
 import jmespath
-from typing import List, Dict, Union, Optional, Callable, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Union, Optional, Callable, Tuple, Iterator, Any
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
 
 # disable insecure warnings
 urllib3.disable_warnings()
 
+STREAM_CHUNK_SIZE = 1024 * 1024
+DEFAULT_MAX_CONCURRENT_REQUESTS = 5
+
 
 class Client:
     def __init__(self, url: str = '', credentials: dict = None,
                  feed_name_to_config: Dict[str, dict] = None, source_name: str = 'JSON',
                  extractor: str = '', indicator: str = 'indicator',
                  insecure: bool = False, cert_file: str = None, key_file: str = None, headers: Union[dict, str] = None,
-                 tlp_color: Optional[str] = None, data: Union[str, dict] = None, **_):
+                 tlp_color: Optional[str] = None, data: Union[str, dict] = None, stream_json: bool = False,
+                 max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS, **_):
         """
         Implements class for miners of JSON feeds over http/https.
         :param url: URL of the feed.
@@ -36,6 +46,10 @@ class Client:
         :param data: Data to post. If not specified will do a GET request. May also be passed as dict as
             supported by requests. If passed as a string will set content-type to
             application/x-www-form-urlencoded if not specified in the headers.
+        :param stream_json: if *True* and the extractor is a projection over a path of keys (e.g. objects[*] or
+            prefixes[?service=='AMAZON']), the feed is parsed incrementally and the items are extracted one by one,
+            without loading the whole document to memory. Other extractors are evaluated on the whole document.
+        :param max_concurrent_requests: maximal number of feeds which are downloaded concurrently. Default: 5
 
          Example:
             Example feed config:
@@ -77,6 +91,14 @@ class Client:
         self.cert = (cert_file, key_file) if cert_file and key_file else None
         self.tlp_color = tlp_color
         self.post_data = data
+        self.stream_json = stream_json
+        self.max_concurrent_requests = max(int(max_concurrent_requests or 1), 1)
+
+        # all the feeds share the same session (and its connection pools), which fits the concurrent requests
+        self.session = requests.Session()
+        if self.max_concurrent_requests > requests.adapters.DEFAULT_POOLSIZE:
+            for prefix in list(self.session.adapters):
+                self.session.mount(prefix, requests.adapters.HTTPAdapter(pool_maxsize=self.max_concurrent_requests))
 
         if isinstance(self.post_data, str):
             content_type_header = 'Content-Type'
@@ -107,8 +129,39 @@ class Client:
             return headers
 
     def build_iterator(self, feed: dict, feed_name: str, **kwargs) -> Tuple[List, bool]:
-        url = feed.get('url', self.url)
+        headers = self.get_feed_headers(feed_name)
+        stream_prefix = get_stream_prefix(feed.get('extractor')) if self.stream_json else None
+        r = self.send_request(feed, headers, stream=bool(stream_prefix), **kwargs)
+        return self.parse_response(r, feed, feed_name, stream_prefix)
+
+    def build_iterators(self, feeds: Dict[str, dict], **kwargs) -> Dict[str, Tuple[List, bool]]:
+        """
+        Runs build_iterator for each of the given feeds, where the feeds are downloaded concurrently.
+        :param feeds: the configurations of the feeds, by their names
+        :return: the build_iterator result of each feed, ordered by the given feeds
+        """
+        stream_prefixes = {feed_name: get_stream_prefix(feed.get('extractor')) if self.stream_json else None
+                           for feed_name, feed in feeds.items()}
+        # the headers and the responses are handled by the feeds order in the main thread,
+        # as they update the client headers and the last run
+        feeds_headers = {feed_name: self.get_feed_headers(feed_name) for feed_name in feeds}
+
+        with ThreadPoolExecutor(max_workers=max(min(self.max_concurrent_requests, len(feeds)), 1)) as executor:
+            futures = {
+                feed_name: executor.submit(self.send_request, feed, feeds_headers[feed_name],
+                                           stream=bool(stream_prefixes[feed_name]), **kwargs)
+                for feed_name, feed in feeds.items()
+            }
+
+        return {feed_name: self.parse_response(futures[feed_name].result(), feed, feed_name, stream_prefixes[feed_name])
+                for feed_name, feed in feeds.items()}
 
+    def get_feed_headers(self, feed_name: str) -> dict:
+        """
+        Updates the client headers with the etag and last_modified values of the feed, and returns them.
+        :param feed_name: the name of the feed
+        :return: the headers to send with the feed request
+        """
         if is_demisto_version_ge('6.5.0'):
             # Set the If-None-Match and If-Modified-Since headers
             # if we have etag or last_modified values in the context, with server version higher than 6.5.0.
@@ -122,30 +175,39 @@ class Client:
             if last_modified:
                 self.headers['If-Modified-Since'] = last_modified
 
-        result = []
+        return dict(self.headers)
+
+    def send_request(self, feed: dict, headers: dict, stream: bool = False, **kwargs) -> requests.Response:
+        url = feed.get('url', self.url)
         if not self.post_data:
-            r = requests.get(
-                url=url,
-                verify=self.verify,
-                auth=self.auth,
-                cert=self.cert,
-                headers=self.headers,
-                **kwargs
-            )
-        else:
-            r = requests.post(
+            return self.session.get(
                 url=url,
-                data=self.post_data,
                 verify=self.verify,
                 auth=self.auth,
                 cert=self.cert,
-                headers=self.headers,
+                headers=headers,
+                stream=stream,
                 **kwargs
             )
-
+        return self.session.post(
+            url=url,
+            data=self.post_data,
+            verify=self.verify,
+            auth=self.auth,
+            cert=self.cert,
+            headers=headers,
+            stream=stream,
+            **kwargs
+        )
+
+    def parse_response(self, r: requests.Response, feed: dict, feed_name: str,
+                       stream_prefix: Optional[str] = None) -> Tuple[List, bool]:
+        result: Any = []
         try:
             r.raise_for_status()
-            if r.content:
+            if stream_prefix:
+                result = stream_json_items(r, feed.get('extractor', '@'), stream_prefix)
+            elif r.content:
                 data = r.json()
                 result = jmespath.search(expression=feed.get('extractor'), data=data)
 
@@ -156,6 +218,100 @@ class Client:
         return result, True
 
 
+def get_fields_path(node: dict) -> Optional[List[str]]:
+    """Returns the keys path of a jmespath AST node which only accesses fields (e.g. a.b), None for any other node."""
+    if node['type'] == 'identity':
+        return []
+    if node['type'] == 'field':
+        name = node['value']
+        # ijson prefixes are dot separated, and use 'item' for the list items
+        return [name] if '.' not in name and name != 'item' else None
+    if node['type'] == 'subexpression':
+        left_path, right_path = (get_fields_path(child) for child in node['children'])
+        if left_path is not None and right_path is not None:
+            return left_path + right_path
+    return None
+
+
+def get_projected_list_path(node: dict) -> Optional[List[str]]:
+    """Returns the keys path of the list projected by a jmespath AST node (e.g. a.b for a.b[*].c), or None if the
+    expression is not a projection over a keys path."""
+    if node['type'] in ('projection', 'filter_projection'):
+        return get_fields_path(node['children'][0])
+    if node['type'] == 'subexpression':
+        left_node, right_node = node['children']
+        left_path = get_fields_path(left_node)
+        right_path = get_projected_list_path(right_node)
+        if left_path is not None and right_path is not None:
+            return left_path + right_path
+    return None
+
+
+def get_stream_prefix(extractor: Optional[str]) -> Optional[str]:
+    """
+    Converts a jmespath extractor to the ijson prefix of the items it projects, e.g. objects[*] -> objects.item.
+    Only projections over a path of keys are supported, as their result can be computed for each item separately.
+    Args:
+        extractor: (str) The jmespath extractor of the feed.
+    Returns:
+        The ijson prefix, or None if the extractor can't be evaluated on a stream (or ijson is not available).
+    """
+    if not extractor:
+        return None
+    if not ijson:
+        demisto.info('The ijson package is not installed in the docker image, '
+                     'the feed is not streamed and is parsed as a whole.')
+        return None
+    try:
+        path = get_projected_list_path(jmespath.compile(extractor).parsed)
+    except jmespath.exceptions.JMESPathError:
+        return None
+    if path is None:
+        demisto.debug(f'The extractor {extractor} is not a projection over a path of keys, '
+                      'the feed is not streamed and is parsed as a whole.')
+        return None
+    return '.'.join(path + ['item'])
+
+
+def stream_json_items(response: requests.Response, extractor: str, prefix: str) -> Iterator[Any]:
+    """
+    Parses the JSON response incrementally, and yields the items which the extractor returns for it.
+    Each list item under the prefix is evaluated separately by the extractor (which is a projection), so the result
+    is identical to evaluating the extractor on the whole document.
+    Args:
+        response: (requests.Response) The streamed feed response.
+        extractor: (str) The jmespath extractor of the feed.
+        prefix: (str) The ijson prefix of the projected list items.
+    Returns:
+        Generator of the extracted items.
+    """
+    expression = jmespath.compile(extractor)
+    path = prefix.split('.')[:-1]
+    items: list = ijson.sendable_list()
+    coroutine = ijson.items_coro(items, prefix, use_float=True)
+
+    def extract_items():
+        for item in items:
+            document: Any = [item]
+            for key in reversed(path):
+                document = {key: document}
+            yield from expression.search(document) or []
+        del items[:]
+
+    try:
+        has_content = False
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            if chunk:
+                has_content = True
+                coroutine.send(chunk)
+                yield from extract_items()
+        if has_content:
+            coroutine.close()
+            yield from extract_items()
+    except ijson.JSONError as err:
+        raise ValueError(f'Could not parse returned data to Json. \n\nError massage: {err}')
+
+
 def get_no_update_value(response: requests.Response, feed_name: str) -> bool:
     """
     detect if the feed response has been modified according to the headers etag and last_modified.
@@ -216,9 +372,27 @@ def fetch_indicators_command(client: Client, indicator_type: str, feedTags: list
     :param limit: given only when get-indicators command is running. function will return number indicators as the limit
     :param create_relationships: whether to add connected indicators
     """
-    indicators: List[dict] = []
+    indicators, no_update = stream_indicators_command(client, indicator_type, feedTags, auto_detect,
+                                                      create_relationships, limit, **kwargs)
+    return list(indicators), no_update
+
+
+def stream_indicators_command(client: Client, indicator_type: str, feedTags: list, auto_detect: bool,
+                              create_relationships: bool = False, limit: int = 0,
+                              **kwargs) -> Tuple[Iterator[dict], bool]:
+    """
+    Fetches the feeds from client and returns a generator of their indicators, which are created only when consumed.
+    :param client: Client of a JSON Feed
+    :param indicator_type: the default indicator type
+    :param feedTags: the indicator tags
+    :param auto_detect: a boolean indicates if we should automatically detect the indicator_type
+    :param limit: given only when get-indicators command is running. function will return number indicators as the limit
+    :param create_relationships: whether to add connected indicators
+    """
     feeds_results = {}
     no_update = False
+    feeds_iterators = client.build_iterators({feed_name: feed for feed_name, feed in client.feed_name_to_config.items()
+                                              if not feed.get('custom_build_iterator')}, **kwargs)
     for feed_name, feed in client.feed_name_to_config.items():
         custom_build_iterator = feed.get('custom_build_iterator')
         if custom_build_iterator:
@@ -227,8 +401,15 @@ def fetch_indicators_command(client: Client, indicator_type: str, feedTags: list
                 raise Exception("Custom function to handle with pagination must return a list type")
             feeds_results[feed_name] = indicators_from_feed
         else:
-            feeds_results[feed_name], no_update = client.build_iterator(feed, feed_name, **kwargs)
+            feeds_results[feed_name], no_update = feeds_iterators[feed_name]
 
+    return generate_indicators(client, feeds_results, indicator_type, feedTags, auto_detect, create_relationships,
+                               limit), no_update
+
+
+def generate_indicators(client: Client, feeds_results: Dict[str, list], indicator_type: str, feedTags: list,
+                        auto_detect: bool, create_relationships: bool = False, limit: int = 0) -> Iterator[dict]:
+    indicators_count = 0
     for service_name, items in feeds_results.items():
         feed_config = client.feed_name_to_config.get(service_name, {})
         indicator_field = str(feed_config.get('indicator') if feed_config.get('indicator') else 'indicator')
@@ -242,15 +423,16 @@ def fetch_indicators_command(client: Client, indicator_type: str, feedTags: list
             if isinstance(item, str):
                 item = {indicator_field: item}
 
-            indicators.extend(
-                handle_indicator_function(client, item, feed_config, service_name, indicator_type, indicator_field,
-                                          use_prefix_flat, feedTags, auto_detect, mapping_function,
-                                          create_relationships, create_relationships_function))
+            for indicator in handle_indicator_function(client, item, feed_config, service_name, indicator_type,
+                                                       indicator_field, use_prefix_flat, feedTags, auto_detect,
+                                                       mapping_function, create_relationships,
+                                                       create_relationships_function):
+                indicators_count += 1
+                yield indicator
 
-            if limit and len(indicators) >= limit:  # We have a limitation only when get-indicators command is
+            if limit and indicators_count >= limit:  # We have a limitation only when get-indicators command is
                 # called, and then we return for each service_name "limit" of indicators
                 break
-    return indicators, no_update
 
 
 def indicator_mapping(mapping: Dict, indicator: Dict, attributes: Dict):
@@ -375,7 +557,7 @@ def extract_all_fields_from_indicator(indicator: Dict, indicator_key: str, flat_
     return fields
 
 
-def feed_main(params, feed_name, prefix):
+def feed_main(params, feed_name, prefix, batch_size=2000):
     handle_proxy()
     client = Client(**params)
     indicator_type = params.get('indicator_type')
@@ -393,31 +575,18 @@ def feed_main(params, feed_name, prefix):
 
         elif command == 'fetch-indicators':
             create_relationships = params.get('create_relationships')
-            indicators, no_update = fetch_indicators_command(client, indicator_type, feedTags, auto_detect,
-                                                             create_relationships)
-
-            # check if the version is higher than 6.5.0 so we can use noUpdate parameter
-            if is_demisto_version_ge('6.5.0'):
-                if not indicators:
-                    demisto.createIndicators(indicators, noUpdate=no_update)
-                else:
-                    for b in batch(indicators, batch_size=2000):
-                        demisto.createIndicators(b, noUpdate=no_update)
-
-            else:
-                # call createIndicators without noUpdate arg
-                if not indicators:
-                    demisto.createIndicators(indicators)
-                else:
-                    for b in batch(indicators, batch_size=2000):
-                        demisto.createIndicators(b)
+            indicators, no_update = stream_indicators_command(client, indicator_type, feedTags, auto_detect,
+                                                              create_relationships)
+            # the indicators are submitted in batches while they are being created
+            create_indicators_in_batches(indicators, batch_size=batch_size, no_update=no_update)
 
         elif command == f'{prefix}get-indicators':
             # dummy command for testing
             create_relationships = params.get('create_relationships')
-            indicators, _ = fetch_indicators_command(client, indicator_type, feedTags, auto_detect, create_relationships, limit)
-            hr = tableToMarkdown('Indicators', indicators, headers=['value', 'type', 'rawJSON'])
-            return_results(CommandResults(readable_output=hr, raw_response=indicators))
+            fetched_indicators, _ = fetch_indicators_command(client, indicator_type, feedTags, auto_detect,
+                                                             create_relationships, limit)
+            hr = tableToMarkdown('Indicators', fetched_indicators, headers=['value', 'type', 'rawJSON'])
+            return_results(CommandResults(readable_output=hr, raw_response=fetched_indicators))
 
     except Exception as err:
         err_msg = f'Error in {feed_name} integration [{err}]'
@@ -1,4 +1,6 @@
-from JSONFeedApiModule import Client, fetch_indicators_command, jmespath, get_no_update_value
+from JSONFeedApiModule import Client, fetch_indicators_command, stream_indicators_command, jmespath, get_no_update_value, \
+    get_stream_prefix
+import pytest
 from CommonServerPython import *
 import requests_mock
 import demistomock as demisto
@@ -54,6 +56,40 @@ def test_json_feed_with_config():
         assert len(jmespath.search(expression="[].rawJSON.service", data=indicators)) == 1117
 
 
+def test_stream_indicators_command():
+    """
+    Given
+    - A JSON feed.
+    When
+    - Streaming the feed indicators with stream_indicators_command, with and without a limit.
+    Then
+    - Ensure a generator is returned, which yields the same indicators as fetch_indicators_command.
+    """
+    with open('test_data/amazon_ip_ranges.json') as ip_ranges_json:
+        ip_ranges = json.load(ip_ranges_json)
+
+    with requests_mock.Mocker() as m:
+        m.get('https://ip-ranges.amazonaws.com/ip-ranges.json', json=ip_ranges)
+
+        client = Client(
+            url='https://ip-ranges.amazonaws.com/ip-ranges.json',
+            extractor="prefixes[?service=='AMAZON']",
+            indicator='ip_prefix',
+            insecure=True
+        )
+
+        expected_indicators, _ = fetch_indicators_command(client=client, indicator_type='CIDR', feedTags=['test'],
+                                                          auto_detect=False)
+        indicators, _ = stream_indicators_command(client=client, indicator_type='CIDR', feedTags=['test'],
+                                                  auto_detect=False)
+        assert not isinstance(indicators, list)
+        assert list(indicators) == expected_indicators
+
+        indicators, _ = stream_indicators_command(client=client, indicator_type='CIDR', feedTags=['test'],
+                                                  auto_detect=False, limit=10)
+        assert list(indicators) == expected_indicators[:10]
+
+
 def test_json_feed_with_config_mapping():
     with open('test_data/amazon_ip_ranges.json') as ip_ranges_json:
         ip_ranges = json.load(ip_ranges_json)
@@ -286,3 +322,119 @@ def test_get_no_update_value_without_headers(mocker):
 
 def test_version_6_2_0(mocker):
     mocker.patch('CommonServerPython.get_demisto_version', return_value={"version": "6.2.0"})
+
+
+@pytest.mark.parametrize('extractor, expected_prefix', [
+    ('objects[*]', 'objects.item'),
+    ('[*]', 'item'),
+    ('data.objects[*].value', 'data.objects.item'),
+    ("prefixes[?service=='AMAZON']", 'prefixes.item'),
+    ('@', None),
+    ('objects', None),
+    ('objects[0]', None),
+    ('objects[*] | [0]', None),
+    ('"my.objects"[*]', None),
+])
+def test_get_stream_prefix(extractor, expected_prefix):
+    """
+    Given
+    - A jmespath extractor.
+    When
+    - Converting it to an ijson prefix.
+    Then
+    - Ensure only projections over a keys path are converted, and other expressions are left to jmespath.
+    """
+    assert get_stream_prefix(extractor) == expected_prefix
+
+
+def test_get_stream_prefix_no_ijson(mocker):
+    """
+    Given
+    - A projection extractor, when the ijson package is not installed.
+    When
+    - Converting it to an ijson prefix.
+    Then
+    - Ensure the feed is not streamed, and that the fallback is logged.
+    """
+    import JSONFeedApiModule
+    mocker.patch.object(JSONFeedApiModule, 'ijson', None)
+    info = mocker.patch.object(demisto, 'info')
+
+    assert get_stream_prefix('objects[*]') is None
+    assert 'ijson' in info.call_args[0][0]
+
+
+@pytest.mark.parametrize('extractor', ["prefixes[?service=='AMAZON']", 'prefixes[*].ip_prefix', 'prefixes[*]'])
+def test_build_iterator_stream_json(extractor):
+    """
+    Given
+    - A JSON feed with an extractor which can be evaluated on a stream.
+    When
+    - Running build_iterator with stream_json enabled.
+    Then
+    - Ensure the items are parsed incrementally, and are identical to the items extracted with jmespath.
+    """
+    with open('test_data/amazon_ip_ranges.json') as ip_ranges_json:
+        ip_ranges = json.load(ip_ranges_json)
+
+    feed = {'url': 'https://ip-ranges.amazonaws.com/ip-ranges.json', 'extractor': extractor}
+    with requests_mock.Mocker() as m:
+        m.get('https://ip-ranges.amazonaws.com/ip-ranges.json', json=ip_ranges)
+
+        client = Client(url=feed['url'], stream_json=True)
+        result, _ = client.build_iterator(feed, 'AMAZON')
+
+        assert not isinstance(result, list)
+        assert list(result) == jmespath.search(expression=extractor, data=ip_ranges)
+
+
+def test_build_iterator_stream_json_invalid():
+    """
+    Given
+    - A feed which returns an invalid JSON.
+    When
+    - Running build_iterator with stream_json enabled.
+    Then
+    - Ensure a ValueError is raised while reading the items.
+    """
+    feed = {'url': 'https://test.com/feed.json', 'extractor': 'objects[*]'}
+    with requests_mock.Mocker() as m:
+        m.get('https://test.com/feed.json', content=b'{"objects": [{"value": "1.1.1.1"}, ')
+
+        client = Client(url=feed['url'], stream_json=True)
+        result, _ = client.build_iterator(feed, 'test')
+
+        with pytest.raises(ValueError, match='Could not parse returned data to Json'):
+            list(result)
+
+
+def test_fetch_indicators_multiple_feeds_concurrently(mocker):
+    """
+    Given
+    - Several feeds, which are downloaded concurrently.
+    When
+    - Fetching the indicators.
+    Then
+    - Ensure the indicators are ordered by the feeds configuration.
+    - Ensure each of the feeds was requested once.
+    """
+    feed_name_to_config = {
+        f'feed{i}': {
+            'url': f'https://test.com/feed{i}.json',
+            'extractor': 'objects[*]',
+            'indicator': 'value',
+            'indicator_type': 'IP',
+        } for i in range(10)
+    }
+    mocker.patch('CommonServerPython.get_demisto_version', return_value={"version": "6.2.0"})
+    with requests_mock.Mocker() as m:
+        for i in range(10):
+            m.get(f'https://test.com/feed{i}.json', json={'objects': [{'value': f'1.1.1.{i}'}, {'value': f'2.2.2.{i}'}]})
+
+        client = Client(feed_name_to_config=feed_name_to_config, max_concurrent_requests=3)
+        indicators, _ = fetch_indicators_command(client=client, indicator_type='IP', feedTags=[], auto_detect=False)
+
+        assert [indicator['value'] for indicator in indicators] == [f'{ip}.{i}' for i in range(10)
+                                                                    for ip in ('1.1.1', '2.2.2')]
+        assert sorted(request.url for request in m.request_history) == sorted(
+            feed['url'] for feed in feed_name_to_config.values())
@@ -9,9 +9,11 @@ import subprocess
 import gevent
 from signal import SIGUSR1
 import requests
+from flask import Response, request
 from flask.logging import default_handler
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterable, Iterator
 import os
+import zlib
 import traceback
 from string import Template
 
@@ -42,6 +44,7 @@ NGINX_SSL_CERTS = f'''
     ssl_certificate {NGINX_SSL_CRT_FILE};
     ssl_certificate_key {NGINX_SSL_KEY_FILE};
 '''
+GZIP_COMPRESS_LEVEL = 6
 NGINX_SERVER_CONF = '''
 server {
 
@@ -258,6 +261,48 @@ def get_params_port(params: Dict = None) -> int:
     return port
 
 
+def iter_gzip(chunks: Iterable[bytes], compress_level: int = GZIP_COMPRESS_LEVEL) -> Iterator[bytes]:
+    """
+    Compresses a streamed response body to the gzip format, chunk by chunk
+    """
+    compressor = zlib.compressobj(compress_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed_chunk = compressor.compress(chunk)
+        if compressed_chunk:
+            yield compressed_chunk
+    yield compressor.flush()
+
+
+def create_streaming_response(chunks: Iterable[bytes], etag: str, mimetype: str, headers: list,
+                              content_length: Optional[int] = None, close: Optional[Callable] = None) -> Response:
+    """
+    Creates a response which streams the body chunks of the current request.
+    The body is compressed with gzip if the client accepts it, and is then sent with chunked transfer encoding, as
+    the compressed length is not known in advance.
+    :param chunks: The chunks of the response body
+    :param etag: The (quoted) ETag of the body. The ETag of the gzip compressed body has a '-gzip' suffix
+    :param mimetype: The mimetype of the response
+    :param headers: Additional response headers
+    :param content_length: The length of the body, if it is known
+    :param close: A function which releases the resources of the chunks, called if the body is not sent
+    :return: The response, or a 304 (Not Modified) response if the client has the ETag
+    """
+    headers = headers + [('Vary', 'Accept-Encoding')]
+    if request.accept_encodings['gzip']:
+        etag = f'{etag[:-1]}-gzip"'
+        headers.append(('Content-Encoding', 'gzip'))
+        chunks = iter_gzip(chunks)
+    elif content_length is not None:
+        headers.append(('Content-Length', str(content_length)))
+    headers.append(('ETag', etag))
+
+    if request.if_none_match.contains(etag.strip('"')):
+        if close:
+            close()
+        return Response(status=304, headers=[header for header in headers if header[0] != 'Content-Length'])
+    return Response(chunks, status=200, mimetype=mimetype, headers=headers)
+
+
 def run_long_running(params: Dict = None, is_test: bool = False):
     """
     Start the long running server
@@ -179,3 +179,37 @@ def test_nginx_log_process(nginx_cleanup, mocker: MockerFixture):
     # make sure log was rolled over files should be of size 0
     assert not Path(module.NGINX_SERVER_ACCESS_LOG).stat().st_size
     assert not Path(module.NGINX_SERVER_ERROR_LOG).stat().st_size
+
+
+def test_create_streaming_response():
+    """
+    Given:
+      - chunks of a response body, and requests which accept gzip, do not accept it, or have the body ETag
+    When:
+      - creating a streaming response
+    Then:
+      - the body is compressed with gzip only if it is accepted, and a request with the ETag gets a 304 response
+    """
+    import gzip
+    from flask import Flask
+    from NGINXApiModule import create_streaming_response
+    app = Flask('test')
+    closed = []
+
+    def create_response(headers):
+        with app.test_request_context(headers=headers):
+            return create_streaming_response(iter([b'1.1.1.1\n', b'2.2.2.2']), '"etag"', 'text/plain', [],
+                                             content_length=15, close=lambda: closed.append(True))
+
+    response = create_response({})
+    gzip_response = create_response({'Accept-Encoding': 'gzip;q=1.0, identity;q=0.5'})
+    not_modified_response = create_response({'If-None-Match': '"etag"'})
+
+    assert response.get_data() == b'1.1.1.1\n2.2.2.2'
+    assert response.headers['Content-Length'] == '15'
+    assert gzip.decompress(gzip_response.get_data()) == b'1.1.1.1\n2.2.2.2'
+    assert gzip_response.headers['Content-Encoding'] == 'gzip'
+    assert gzip_response.headers['ETag'] == '"etag-gzip"'
+    assert not_modified_response.status_code == 304
+    assert 'Content-Length' not in not_modified_response.headers
+    assert closed == [True]
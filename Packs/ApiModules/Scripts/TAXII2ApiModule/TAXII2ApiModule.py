@@ -2,10 +2,17 @@ import demistomock as demisto
 from CommonServerPython import *
 from CommonServerUserPython import *
 
-from typing import Union, Optional, List, Dict, Tuple
+from typing import Union, Optional, List, Dict, Tuple, Iterator, Generator
 from requests.sessions import merge_setting, CaseInsensitiveDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice, takewhile
 import re
 import copy
+import json
+import queue
+import sqlite3
+import threading
 import types
 import urllib3
 from taxii2client import v20, v21
@@ -20,6 +27,13 @@ TAXII_VER_2_0 = "2.0"
 TAXII_VER_2_1 = "2.1"
 
 DFLT_LIMIT_PER_REQUEST = 100
+DEFAULT_MAX_CONCURRENT_REQUESTS = 5
+# the number of fetched pages of each object type, which are waiting to be parsed
+PREFETCHED_PAGES_PER_TYPE = 2
+# the number of STIX objects which are indexed in memory, before they are moved to disk
+STIX_INDEX_MAX_OBJECTS_IN_MEMORY = 50000
+# the fields of the STIX objects which are used to resolve the relationships
+STIX_INDEX_FIELDS = ('type', 'name', 'pattern')
 API_USERNAME = "_api_token_key"
 HEADER_USERNAME = "_header:"
 
@@ -41,6 +55,10 @@ CIDR_ISUPPERSET_VAL_PATTERN = INDICATOR_OPERATOR_VAL_FORMAT_PATTERN.format(
 HASHES_EQUALS_VAL_PATTERN = INDICATOR_OPERATOR_VAL_FORMAT_PATTERN.format(
     value=r"hashes\..*?", operator="="
 )
+# the quoted literals of a pattern, which are replaced with empty literals to get the template of the pattern
+STIX_PATTERN_LITERAL_REGEX = re.compile(r"'(.*?)'")
+STIX_PATTERN_EMPTY_LITERAL = "''"
+STIX_PATTERN_TEMPLATES_CACHE_SIZE = 4096
 
 TAXII_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
 TAXII_TIME_FORMAT_NO_MS = "%Y-%m-%dT%H:%M:%SZ"
@@ -106,6 +124,91 @@ THREAT_INTEL_TYPE_TO_DEMISTO_TYPES = {
 }
 
 
+@lru_cache(maxsize=STIX_PATTERN_TEMPLATES_CACHE_SIZE)
+def compile_stix_pattern_template(template: str, regexes: Tuple[Any, ...]) \
+        -> Tuple[Tuple[Tuple[str, ...], int, int], ...]:
+    """
+    Runs the regexes on a pattern template (a pattern with empty quoted literals), once for each distinct template
+    :param template: the pattern template
+    :param regexes: regexes to run to the template, with the groups [`type`, `indicator`]
+    :return: for each match, the parts of the `type` group between its literals, the index of its first literal,
+        and the index of the literal of the `indicator` group
+    """
+    groups = []
+    for regex in regexes:
+        for match in regex.finditer(template):
+            # each literal in the template is two quotes, so the quotes before a position count the literals
+            type_parts = tuple(match.group(1).split(STIX_PATTERN_EMPTY_LITERAL))
+            first_type_literal_index = template.count("'", 0, match.start(1)) // 2
+            literal_index = template.count("'", 0, match.start(2) - 1) // 2
+            groups.append((type_parts, first_type_literal_index, literal_index))
+    return tuple(groups)
+
+
+def fill_stix_pattern_template(template_parts: Tuple[str, ...], literals: List[str], first_literal_index: int) -> str:
+    """
+    Puts the quoted literals back between the parts of a pattern template
+    """
+    if len(template_parts) == 1:
+        return template_parts[0]
+    filled_literals = (f"'{literal}'" for literal in literals[first_literal_index:])
+    return ''.join(part + next(filled_literals) for part in template_parts[:-1]) + template_parts[-1]
+
+
+class STIXObjectIndex:
+    def __init__(self, max_objects_in_memory: int = STIX_INDEX_MAX_OBJECTS_IN_MEMORY):
+        """
+        An index of the fetched STIX objects by their ID, used to resolve the relationships.
+        Only the fields in STIX_INDEX_FIELDS are kept, and once there are more than max_objects_in_memory objects
+        in memory, they are moved to a temporary sqlite database on disk.
+        :param max_objects_in_memory: max amount of objects kept in memory
+        """
+        self.max_objects_in_memory = max_objects_in_memory
+        self._objects: Dict[str, Dict[str, Any]] = {}
+        self._db: Optional[sqlite3.Connection] = None
+
+    def __setitem__(self, obj_id: str, obj: Dict[str, Any]):
+        self._objects[obj_id] = {field: obj[field] for field in STIX_INDEX_FIELDS if field in obj}
+        if len(self._objects) > self.max_objects_in_memory:
+            self._move_to_disk()
+
+    def __getitem__(self, obj_id: str) -> Dict[str, Any]:
+        obj = self.get(obj_id)
+        if obj is None:
+            raise KeyError(obj_id)
+        return obj
+
+    def __contains__(self, obj_id: str) -> bool:
+        return self.get(obj_id) is not None
+
+    def get(self, obj_id: str, default: Any = None) -> Any:
+        obj = self._objects.get(obj_id)
+        if obj is not None:
+            return obj
+        if self._db is not None:
+            row = self._db.execute('SELECT obj FROM objects WHERE id = ?', (obj_id,)).fetchone()
+            if row:
+                return json.loads(row[0])
+        return default
+
+    def close(self):
+        self._objects = {}
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _move_to_disk(self):
+        if self._db is None:
+            # an empty file name creates a temporary database, which is deleted when it is closed
+            self._db = sqlite3.connect('', check_same_thread=False)
+            self._db.execute('CREATE TABLE objects (id TEXT PRIMARY KEY, obj TEXT)')
+        demisto.debug(f'TAXII 2 Feed moves {len(self._objects)} indexed STIX objects to disk')
+        with self._db:
+            self._db.executemany('INSERT OR REPLACE INTO objects VALUES (?, ?)',
+                                 ((obj_id, json.dumps(obj)) for obj_id, obj in self._objects.items()))
+        self._objects = {}
+
+
 class Taxii2FeedClient:
     def __init__(
             self,
@@ -123,6 +226,7 @@ class Taxii2FeedClient:
             limit_per_request: int = DFLT_LIMIT_PER_REQUEST,
             certificate: str = None,
             key: str = None,
+            max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
     ):
         """
         TAXII 2 Client used to poll and parse indicators in XSOAR formar
@@ -139,6 +243,7 @@ class Taxii2FeedClient:
         :param tlp_color: Traffic Light Protocol color
         :param certificate: TLS Certificate
         :param key: TLS Certificate key
+        :param max_concurrent_requests: maximal number of object types which are polled concurrently. Default: 5
         """
         self._conn = None
         self.server = None
@@ -151,6 +256,7 @@ class Taxii2FeedClient:
         if not limit_per_request:
             limit_per_request = DFLT_LIMIT_PER_REQUEST
         self.limit_per_request = limit_per_request
+        self.max_concurrent_requests = max(int(max_concurrent_requests or 1), 1)
 
         self.base_url = url
         self.proxies = proxies
@@ -189,7 +295,7 @@ class Taxii2FeedClient:
             re.compile(CIDR_ISSUBSET_VAL_PATTERN),
             re.compile(CIDR_ISUPPERSET_VAL_PATTERN),
         ]
-        self.id_to_object: Dict[str, Any] = {}
+        self.id_to_object: Union[STIXObjectIndex, Dict[str, Any]] = STIXObjectIndex()
         self.objects_to_fetch = objects_to_fetch
 
     def init_server(self, version=TAXII_VER_2_0):
@@ -210,6 +316,12 @@ class Taxii2FeedClient:
                     dict_class=CaseInsensitiveDict,
                 ),
             )
+        if self.max_concurrent_requests > requests.adapters.DEFAULT_POOLSIZE:
+            # the object types are polled concurrently with the same session, so its connection pools should fit them
+            for prefix in ('https://', 'http://'):
+                self._conn.session.mount(  # type: ignore[attr-defined]
+                    prefix, requests.adapters.HTTPAdapter(pool_maxsize=self.max_concurrent_requests)
+                )
         if version is TAXII_VER_2_0:
             self.server = v20.Server(
                 server_url, verify=self.verify, proxies=self.proxies, conn=self._conn,
@@ -327,7 +439,7 @@ class Taxii2FeedClient:
         return True
 
     @staticmethod
-    def get_ioc_type(indicator: str, id_to_object: Dict[str, Dict[str, Any]]) -> str:
+    def get_ioc_type(indicator: str, id_to_object: Union[STIXObjectIndex, Dict[str, Dict[str, Any]]]) -> str:
         """
         Get IOC type by extracting it from the pattern field.
 
@@ -763,6 +875,22 @@ class Taxii2FeedClient:
         return indicators
 
     def load_stix_objects_from_envelope(self, envelopes: Dict[str, Any], limit: int = -1):
+        indicators = list(self.iter_stix_objects_from_envelope(envelopes, limit))
+        demisto.debug(
+            f"TAXII 2 Feed has extracted {len(indicators)} indicators"
+        )
+        return indicators
+
+    def iter_stix_objects_from_envelope(self, envelopes: Dict[str, Any], limit: int = -1) -> Iterator[Dict[str, Any]]:
+        """
+        Parses the objects of the envelopes, and yields the indicators while the next pages are fetched.
+        The pages of the object types are fetched concurrently, and no more pages are fetched once the limit is reached.
+        :param envelopes: the envelopes of the object types (TAXII 2.0 pages generators or TAXII 2.1 first pages)
+        :param limit: max amount of indicators to yield
+        :return: Cortex indicators
+        """
+        if not envelopes:
+            return
 
         parse_stix_2_objects = {
             "indicator": self.parse_indicator,
@@ -776,96 +904,140 @@ class Taxii2FeedClient:
             "threat-actor": self.parse_threat_actor,
             "infrastructure": self.parse_infrastructure
         }
-        indicators = []
 
+        pages_by_type: Dict[str, Iterator[Dict[str, Any]]]
         # TAXII 2.0
         if isinstance(list(envelopes.values())[0], types.GeneratorType):
-            indicators.extend(self.parse_generator_type_envelope(envelopes, parse_stix_2_objects))
+            pages_by_type = {obj_type: takewhile(lambda page: page.get("objects"), envelope)
+                             for obj_type, envelope in envelopes.items()}
         # TAXII 2.1
         else:
-            indicators.extend(self.parse_dict_envelope(envelopes, parse_stix_2_objects, limit))
-        demisto.debug(
-            f"TAXII 2 Feed has extracted {len(indicators)} indicators"
-        )
-        if limit > -1:
-            return indicators[:limit]
-        return indicators
+            pages_by_type = {obj_type: self.iter_envelope_pages(envelope, limit)
+                             for obj_type, envelope in envelopes.items()}
 
-    def parse_generator_type_envelope(self, envelopes: Dict[str, Any],
-                                      parse_objects_func):
-        indicators = []
-        relationships_lst = []
-        for obj_type, envelope in envelopes.items():
-            for sub_envelope in envelope:
-                stix_objects = sub_envelope.get("objects")
-                if not stix_objects:
-                    # no fetched objects
-                    break
-                # now we have a list of objects, go over each obj, save id with obj, parse the obj
-                if obj_type != "relationship":
-                    for obj in stix_objects:
-                        # we currently don't support extension object
-                        if obj.get('type') == 'extension-definition':
-                            continue
-                        self.id_to_object[obj.get('id')] = obj
-                        result = parse_objects_func[obj_type](obj)
-                        if not result:
-                            continue
-                        indicators.extend(result)
-                        self.update_last_modified_indicator_date(obj.get("modified"))
-                else:
-                    relationships_lst.extend(stix_objects)
-        if relationships_lst:
-            indicators.extend(self.parse_relationships(relationships_lst))
+        indicators = self.parse_envelope_pages(self.prefetch_envelope_pages(pages_by_type), parse_stix_2_objects)
+        try:
+            yield from (islice(indicators, limit) if limit > -1 else indicators)
+        finally:
+            # stops fetching the next pages
+            indicators.close()
 
-        return indicators
+    def iter_envelope_pages(self, envelope: Dict[str, Any], limit: int = -1) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the first page of a TAXII 2.1 envelope, and fetches its next pages one by one
+        :param envelope: the first page
+        :param limit: max amount of entries allowed overall
+        """
+        yield envelope
+        while envelope.get("more", False):
+            page_size = self.get_page_size(limit, limit)
+            envelope = self.collection_to_fetch.get_objects(
+                limit=page_size, next=envelope.get("next", "")
+            )
+            if not isinstance(envelope, Dict):
+                raise DemistoException(
+                    "Error: TAXII 2 client received the following response while requesting "
+                    f"indicators: {str(envelope)}\n\nExpected output is json"
+                )
+            yield envelope
 
-    def parse_dict_envelope(self, envelopes: Dict[str, Any],
-                            parse_objects_func, limit: int = -1):
-        indicators = []
+    def prefetch_envelope_pages(self, pages_by_type: Dict[str, Iterator[Dict[str, Any]]]) \
+            -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Fetches the pages of the object types concurrently, up to max_concurrent_requests types at a time,
+        and yields them by the order of the types. Only a few pages of each type are waiting to be parsed.
+        :param pages_by_type: an iterator of the pages of each object type
+        :return: the object type and the page
+        """
+        if self.max_concurrent_requests <= 1 or len(pages_by_type) <= 1:
+            for obj_type, pages in pages_by_type.items():
+                for page in pages:
+                    yield obj_type, page
+            return
+
+        stop_fetching = threading.Event()
+        pages_queues: Dict[str, queue.Queue] = {
+            obj_type: queue.Queue(maxsize=PREFETCHED_PAGES_PER_TYPE) for obj_type in pages_by_type
+        }
+
+        def put_page(pages_queue: queue.Queue, item: tuple) -> bool:
+            while not stop_fetching.is_set():
+                try:
+                    pages_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def fetch_pages(obj_type: str, pages: Iterator[Dict[str, Any]]):
+            pages_queue = pages_queues[obj_type]
+            try:
+                for page in pages:
+                    if not put_page(pages_queue, (page, None)):
+                        return
+            except Exception as e:
+                put_page(pages_queue, (None, e))
+                return
+            # no more pages
+            put_page(pages_queue, (None, None))
+
+        # the types are submitted by their order, so the type which is parsed is always being fetched
+        executor = ThreadPoolExecutor(max_workers=min(self.max_concurrent_requests, len(pages_by_type)))
+        try:
+            for obj_type, pages in pages_by_type.items():
+                executor.submit(fetch_pages, obj_type, pages)
+            for obj_type, pages_queue in pages_queues.items():
+                while True:
+                    page, error = pages_queue.get()
+                    if error:
+                        raise error
+                    if page is None:
+                        break
+                    yield obj_type, page
+        finally:
+            stop_fetching.set()
+            executor.shutdown(wait=True)
+
+    def parse_envelope_pages(self, pages: Iterator[Tuple[str, Dict[str, Any]]],
+                             parse_objects_func) -> Generator[Dict[str, Any], None, None]:
+        """
+        Parses the objects of the pages, and yields the indicators.
+        The relationships are parsed after all the other objects, as they refer to them.
+        :param pages: the object type and the page
+        :param parse_objects_func: the parse function of each object type
+        :return: Cortex indicators
+        """
         relationships_list: List[Dict[str, Any]] = []
-        for obj_type, envelope in envelopes.items():
-            cur_limit = limit
-            stix_objects = envelope.get("objects", [])
-            if obj_type != "relationship":
-                for obj in stix_objects:
-                    # we currently don't support extension object
-                    if obj.get('type') == 'extension-definition':
-                        continue
-                    self.id_to_object[obj.get('id')] = obj
-                    result = parse_objects_func[obj_type](obj)
-                    if not result:
-                        continue
-                    indicators.extend(result)
-                    self.update_last_modified_indicator_date(obj.get("modified"))
-            else:
+        for obj_type, page in pages:
+            stix_objects = page.get("objects") or []
+            if obj_type == "relationship":
                 relationships_list.extend(stix_objects)
-
-            while envelope.get("more", False):
-                page_size = self.get_page_size(limit, cur_limit)
-                envelope = self.collection_to_fetch.get_objects(
-                    limit=page_size, next=envelope.get("next", "")
-                )
-                if isinstance(envelope, Dict):
-                    stix_objects = envelope.get("objects")
-                    if obj_type != "relationship":
-                        for obj in stix_objects:
-                            self.id_to_object[obj.get('id')] = obj
-                            result = parse_objects_func[obj_type](obj)
-                            if not result:
-                                continue
-                            indicators.extend(result)
-                            self.update_last_modified_indicator_date(obj.get("modified"))
-                    else:
-                        relationships_list.extend(stix_objects)
-                else:
-                    raise DemistoException(
-                        "Error: TAXII 2 client received the following response while requesting "
-                        f"indicators: {str(envelope)}\n\nExpected output is json"
-                    )
+                continue
+            # now we have a list of objects, go over each obj, save id with obj, parse the obj
+            for obj in stix_objects:
+                # we currently don't support extension object
+                if obj.get('type') == 'extension-definition':
+                    continue
+                self.id_to_object[obj.get('id')] = obj
+                result = parse_objects_func[obj_type](obj)
+                if not result:
+                    continue
+                self.update_last_modified_indicator_date(obj.get("modified"))
+                yield from result
         if relationships_list:
-            indicators.extend(self.parse_relationships(relationships_list))
-        return indicators
+            yield from self.parse_relationships(relationships_list)
+
+    def parse_generator_type_envelope(self, envelopes: Dict[str, Any],
+                                      parse_objects_func):
+        pages = ((obj_type, sub_envelope) for obj_type, envelope in envelopes.items()
+                 for sub_envelope in takewhile(lambda page: page.get("objects"), envelope))
+        return list(self.parse_envelope_pages(pages, parse_objects_func))
+
+    def parse_dict_envelope(self, envelopes: Dict[str, Any],
+                            parse_objects_func, limit: int = -1):
+        pages = ((obj_type, page) for obj_type, envelope in envelopes.items()
+                 for page in self.iter_envelope_pages(envelope, limit))
+        return list(self.parse_envelope_pages(pages, parse_objects_func))
 
     def poll_collection(
             self, page_size: int, **kwargs
@@ -876,14 +1048,22 @@ class Taxii2FeedClient:
         """
         types_envelopes = {}
         get_objects = self.collection_to_fetch.get_objects
-        if len(self.objects_to_fetch) > 1:  # when fetching one type no need to fetch relationship
+        if len(self.objects_to_fetch) > 1 and 'relationship' not in self.objects_to_fetch:
+            # when fetching one type no need to fetch relationship
             self.objects_to_fetch.append('relationship')
-        for obj_type in self.objects_to_fetch:
-            kwargs['type'] = obj_type
-            if isinstance(self.collection_to_fetch, v20.Collection):
-                envelope = v20.as_pages(get_objects, per_request=page_size, **kwargs)
-            else:
-                envelope = get_objects(limit=page_size, **kwargs)
+        if isinstance(self.collection_to_fetch, v20.Collection):
+            # the pages are fetched only when the generators are iterated
+            envelopes = [v20.as_pages(get_objects, per_request=page_size, **dict(kwargs, type=obj_type))
+                         for obj_type in self.objects_to_fetch]
+        else:
+            # the first page of each type is fetched concurrently
+            max_workers = max(min(self.max_concurrent_requests, len(self.objects_to_fetch)), 1)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                envelopes = list(executor.map(
+                    lambda obj_type: get_objects(limit=page_size, **dict(kwargs, type=obj_type)),
+                    self.objects_to_fetch
+                ))
+        for obj_type, envelope in zip(self.objects_to_fetch, envelopes):
             if envelope:
                 types_envelopes[obj_type] = envelope
         return types_envelopes
@@ -1002,17 +1182,24 @@ class Taxii2FeedClient:
             pattern: str, regexes: List
     ) -> List[Tuple[str, str]]:
         """
-        Extracts indicator [`type`, `indicator`] groups from pattern
+        Extracts indicator [`type`, `indicator`] groups from pattern.
+        Patterns which differ only in their quoted literals have the same template, which is parsed only once.
+        Patterns with escaped quotes or unbalanced quotes have no template, and the regexes are run on the pattern.
         :param pattern: stix pattern
         :param regexes: regexes to run to pattern
         :return: extracted indicators list from pattern
         """
-        groups: List[Tuple[str, str]] = []
-        for regex in regexes:
-            find_result = regex.findall(pattern)
-            if find_result:
-                groups.extend(find_result)
-        return groups
+        if '\\' in pattern or pattern.count("'") % 2:
+            groups: List[Tuple[str, str]] = []
+            for regex in regexes:
+                groups.extend(regex.findall(pattern))
+            return groups
+
+        literals = STIX_PATTERN_LITERAL_REGEX.findall(pattern)
+        template = STIX_PATTERN_LITERAL_REGEX.sub(STIX_PATTERN_EMPTY_LITERAL, pattern)
+        return [(fill_stix_pattern_template(type_parts, literals, first_type_literal_index), literals[literal_index])
+                for type_parts, first_type_literal_index, literal_index
+                in compile_stix_pattern_template(template, tuple(regexes))]
 
     @staticmethod
     def stix_time_to_datetime(s_time):
@@ -1,5 +1,5 @@
 from CommonServerPython import *
-from TAXII2ApiModule import Taxii2FeedClient, TAXII_VER_2_1, HEADER_USERNAME
+from TAXII2ApiModule import Taxii2FeedClient, STIXObjectIndex, TAXII_VER_2_1, HEADER_USERNAME
 from taxii2client import v20, v21
 import pytest
 import json
@@ -390,3 +390,159 @@ class TestFetchingStixObjects:
         result = mock_client.parse_generator_type_envelope(objects_envelopes, parse_stix_2_objects)
         assert mock_client.id_to_object == id_to_object
         assert result == parsed_objects
+
+    @pytest.mark.parametrize('max_concurrent_requests', [1, 4])
+    def test_load_stix_objects_from_envelope_v21_pages(self, mocker, max_concurrent_requests):
+        """
+        Scenario: Test loading of STIX objects from envelopes with more pages for v2.1
+
+        Given:
+        - Envelopes of the object types, where the objects are in the next page of each type.
+
+        When:
+        - load_stix_objects_from_envelope is called, with and without concurrent requests
+
+        Then:
+        - Fetch the next page of each type, and parse the objects by the order of the types.
+        - Stop fetching the pages once the limit is reached.
+        """
+        mock_client = Taxii2FeedClient(url='', collection_to_fetch='', proxies=[], verify=False, objects_to_fetch=[],
+                                       max_concurrent_requests=max_concurrent_requests)
+        mock_client.id_to_object = dict(id_to_object)
+        mocker.patch.object(mock_client, 'collection_to_fetch', spec=v21.Collection)
+        mock_client.collection_to_fetch.get_objects.side_effect = lambda limit, next: envelopes_v21[next]
+        first_pages = {obj_type: {'more': True, 'next': obj_type} for obj_type in envelopes_v21}
+
+        result = mock_client.load_stix_objects_from_envelope(first_pages, -1)
+        assert result == parsed_objects
+        assert mock_client.collection_to_fetch.get_objects.call_count == len(envelopes_v21)
+
+        result = mock_client.load_stix_objects_from_envelope(first_pages, 2)
+        assert result == parsed_objects[:2]
+
+    def test_load_stix_objects_from_envelope_v21_page_error(self, mocker):
+        """
+        Scenario: Test loading of STIX objects when fetching a page fails for v2.1
+
+        Given:
+        - Envelopes of the object types, where the next page of a type is not json.
+
+        When:
+        - load_stix_objects_from_envelope is called with concurrent requests
+
+        Then:
+        - Ensure the error of the page is raised.
+        """
+        mock_client = Taxii2FeedClient(url='', collection_to_fetch='', proxies=[], verify=False, objects_to_fetch=[],
+                                       max_concurrent_requests=4)
+        mocker.patch.object(mock_client, 'collection_to_fetch', spec=v21.Collection)
+        mock_client.collection_to_fetch.get_objects.return_value = 'not json'
+        first_pages = {obj_type: {'more': True, 'next': obj_type} for obj_type in envelopes_v21}
+
+        with pytest.raises(DemistoException, match='Expected output is json'):
+            mock_client.load_stix_objects_from_envelope(first_pages, -1)
+
+    def test_load_stix_objects_from_envelope_v21_objects_on_disk(self):
+        """
+        Scenario: Test loading of STIX objects when the indexed objects were moved to disk for v2.1
+
+        Given:
+        - Envelope with indicators, arranged by object type.
+        - An index which keeps only 2 STIX objects in memory.
+
+        When:
+        - load_stix_objects_from_envelope is called
+
+        Then:
+        - Resolve the relationships from the objects on disk, same as from the objects in memory.
+        """
+        mock_client = Taxii2FeedClient(url='', collection_to_fetch='', proxies=[], verify=False, objects_to_fetch=[])
+        mock_client.id_to_object = STIXObjectIndex(max_objects_in_memory=2)
+        for obj_id, obj in id_to_object.items():
+            mock_client.id_to_object[obj_id] = obj
+
+        result = mock_client.load_stix_objects_from_envelope(envelopes_v21, -1)
+        assert result == parsed_objects
+        mock_client.id_to_object.close()
+
+
+class TestSTIXObjectIndex:
+    def test_objects_on_disk(self):
+        """
+        Scenario: Index more STIX objects than are kept in memory
+
+        Given:
+        - An index which keeps only 2 STIX objects in memory.
+
+        When:
+        - Indexing STIX objects, and indexing an object with an ID which is already on disk.
+
+        Then:
+        - Ensure only the fields which resolve the relationships are kept.
+        - Ensure the objects are found in memory and on disk, and the latest object of each ID is returned.
+        """
+        index = STIXObjectIndex(max_objects_in_memory=2)
+        for i in range(5):
+            index[f'indicator--{i}'] = {'id': f'indicator--{i}', 'type': 'indicator', 'name': f'{i}.com',
+                                        'pattern': f"[domain-name:value = '{i}.com']", 'description': 'desc'}
+        index['indicator--0'] = {'type': 'indicator', 'name': 'new.com'}
+
+        assert index['indicator--0'] == {'type': 'indicator', 'name': 'new.com'}
+        assert index.get('indicator--3') == {'type': 'indicator', 'name': '3.com',
+                                             'pattern': "[domain-name:value = '3.com']"}
+        assert 'indicator--4' in index
+        assert index.get('indicator--5', {}) == {}
+        with pytest.raises(KeyError):
+            index['indicator--5']
+        index.close()
+
+
+@pytest.mark.parametrize('pattern', [
+    "[ipv4-addr:value='195.123.227.186']",
+    "[ipv4-addr:value='1.1.1.1'ANDipv4-addr:value='2.2.2.2']",
+    "[file:hashes.'SHA-256'='abc'ANDfile:hashes.MD5='def']",
+    "[file:name='domain.exe'ANDfile:hashes.'SHA-256'='abc']",
+    "[ipv4-addr:valueISSUBSET'10.0.0.0/8'ORipv6-addr:valueISUPPERSET'::1/64']",
+    "[url:value='http://a.com/'path'']",
+    "[domain-name:value='x.com'",
+    "[url:value='http://a/it\\'s']OR[ipv4-addr:value='1.2.3.4']",
+    "[file:name='a\\\\b.exe'ANDfile:hashes.'SHA-256'='abc']",
+])
+def test_extract_indicator_groups_from_pattern(pattern):
+    """
+    Scenario: Extract indicator groups from patterns by their templates
+
+    Given:
+    - A STIX pattern, with quoted literals in the type part, unbalanced quotes or escaped quotes
+
+    When:
+    - extract_indicator_groups_from_pattern is called twice, the second time with the memoized template
+
+    Then:
+    - Ensure the groups are the same as the groups found by the regexes in the pattern
+    """
+    mock_client = Taxii2FeedClient(url='', collection_to_fetch='', proxies=[], verify=False, objects_to_fetch=[])
+    for regexes in (mock_client.indicator_regexes, mock_client.cidr_regexes):
+        expected = [groups for regex in regexes for groups in regex.findall(pattern)]
+        assert mock_client.extract_indicator_groups_from_pattern(pattern, regexes) == expected
+        assert mock_client.extract_indicator_groups_from_pattern(pattern, regexes) == expected
+
+
+def test_extract_indicator_groups_from_pattern_with_escaped_quote():
+    """
+    Scenario: Extract indicator groups from a pattern with an escaped quote in a literal
+
+    Given:
+    - A STIX pattern with an escaped quote in its first literal, followed by another indicator
+
+    When:
+    - extract_indicator_groups_from_pattern is called
+
+    Then:
+    - Ensure the indicator after the escaped quote is extracted
+    """
+    mock_client = Taxii2FeedClient(url='', collection_to_fetch='', proxies=[], verify=False, objects_to_fetch=[])
+    groups = mock_client.extract_indicator_groups_from_pattern(
+        "[url:value='http://a/it\\'s']OR[ipv4-addr:value='1.2.3.4']", mock_client.indicator_regexes)
+    assert [value for _, value in groups] == ['http://a/it\\', '1.2.3.4']
+    assert 'ipv4-addr' in groups[1][0]
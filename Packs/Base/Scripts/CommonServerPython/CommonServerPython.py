@@ -18,13 +18,14 @@ import time
 import traceback
 import types
 import urllib
+from itertools import islice
 from random import randint
 import xml.etree.cElementTree as ET
 from collections import OrderedDict
 from datetime import datetime, timedelta
 from abc import abstractmethod
 from distutils.version import LooseVersion
-from threading import Lock
+from threading import Lock, Thread
 from inspect import currentframe
 
 import demistomock as demisto
@@ -36,9 +37,9 @@ def __line__():
     return cf.f_back.f_lineno
 
 
-# 41 - The line offset from the beggining of the file.
+# 42 - The line offset from the beggining of the file.
 _MODULES_LINE_MAPPING = {
-    'CommonServerPython': {'start': __line__() - 41, 'end': float('inf')},
+    'CommonServerPython': {'start': __line__() - 42, 'end': float('inf')},
 }
 
 
@@ -653,63 +654,72 @@ def get_schedule_metadata(context):
     return schedule_metadata
 
 
-def auto_detect_indicator_type(indicator_value):
-    """
-      Infer the type of the indicator.
+AUTO_DETECT_INDICATOR_TYPE_CACHE_SIZE = 100000
+_AUTO_DETECT_INDICATOR_TYPE_CACHE = OrderedDict()  # type: OrderedDict
+_AUTO_DETECT_INDICATOR_TYPE_LOCK = Lock()
+_AUTO_DETECT_REGEXES = []  # type: list
+_TLD_EXTRACTOR = (None, None)  # type: tuple
+_HEX_CHARS = frozenset('0123456789abcdefABCDEF')
+_DIGIT_CHARS = frozenset('0123456789')
 
-      :type indicator_value: ``str``
-      :param indicator_value: The indicator whose type we want to check. (required)
 
-      :return: The type of the indicator.
-      :rtype: ``str``
+def _get_auto_detect_regexes():
     """
-    try:
-        import tldextract
-    except Exception:
-        raise Exception("Missing tldextract module, In order to use the auto detect function please use a docker"
-                        " image with it installed such as: demisto/jmespath")
-
-    if re.match(ipv4cidrRegex, indicator_value):
-        return FeedIndicatorType.CIDR
-
-    if re.match(ipv6cidrRegex, indicator_value):
-        return FeedIndicatorType.IPv6CIDR
+      Gets the compiled regexes of auto_detect_indicator_type, by their order, with the indicator type of each regex,
+      and a cheap check of whether a value can match the regex (a necessary condition for a match).
 
-    if re.match(ipv4Regex, indicator_value):
-        return FeedIndicatorType.IP
-
-    if re.match(ipv6Regex, indicator_value):
-        return FeedIndicatorType.IPv6
-
-    if re.match(sha256Regex, indicator_value):
-        return FeedIndicatorType.File
-
-    if re.match(urlRegex, indicator_value):
-        return FeedIndicatorType.URL
-
-    if re.match(md5Regex, indicator_value):
-        return FeedIndicatorType.File
-
-    if re.match(sha1Regex, indicator_value):
-        return FeedIndicatorType.File
+      :return: A list of (check, regex, indicator type) tuples.
+      :rtype: ``list``
+    """
+    if not _AUTO_DETECT_REGEXES:
+        def starts_with_digit(value): return value[0] in _DIGIT_CHARS  # noqa
+        def may_be_hash(value): return len(value) >= 32 and value[0] in _HEX_CHARS  # noqa
+        _AUTO_DETECT_REGEXES.extend([
+            (lambda value: starts_with_digit(value) and '/' in value, re.compile(ipv4cidrRegex), FeedIndicatorType.CIDR),
+            (lambda value: value[0] in _HEX_CHARS and ':' in value and '/' in value, re.compile(ipv6cidrRegex),
+             FeedIndicatorType.IPv6CIDR),
+            (lambda value: starts_with_digit(value) and '.' in value, re.compile(ipv4Regex), FeedIndicatorType.IP),
+            (lambda value: value[0] in _HEX_CHARS and ':' in value, re.compile(ipv6Regex), FeedIndicatorType.IPv6),
+            (may_be_hash, sha256Regex, FeedIndicatorType.File),
+            (None, re.compile(urlRegex), FeedIndicatorType.URL),
+            (may_be_hash, md5Regex, FeedIndicatorType.File),
+            (may_be_hash, sha1Regex, FeedIndicatorType.File),
+            (lambda value: '@' in value, re.compile(emailRegex), FeedIndicatorType.Email),
+            (lambda value: value[:4].lower() == 'cve-', re.compile(cveRegex), FeedIndicatorType.CVE),
+            (may_be_hash, sha512Regex, FeedIndicatorType.File),
+        ])
+    return _AUTO_DETECT_REGEXES
 
-    if re.match(emailRegex, indicator_value):
-        return FeedIndicatorType.Email
 
-    if re.match(cveRegex, indicator_value):
-        return FeedIndicatorType.CVE
+def _get_tld_extractor(tldextract):
+    """
+      Gets a tldextract extractor which does not use a cache file and does not fetch the suffix list.
+      The extractor is created once (per tldextract version), as loading the suffix list is expensive.
 
-    if re.match(sha512Regex, indicator_value):
-        return FeedIndicatorType.File
+      :type tldextract: ``module``
+      :param tldextract: The tldextract module.
 
-    try:
-        tldextract_version = tldextract.__version__
+      :return: The extractor.
+      :rtype: ``tldextract.TLDExtract``
+    """
+    global _TLD_EXTRACTOR
+    tldextract_version = tldextract.__version__
+    if _TLD_EXTRACTOR[0] != tldextract_version:
         if LooseVersion(tldextract_version) < '3.0.0':
             no_cache_extract = tldextract.TLDExtract(cache_file=False, suffix_list_urls=None)
         else:
             no_cache_extract = tldextract.TLDExtract(cache_dir=False, suffix_list_urls=None)
+        _TLD_EXTRACTOR = (tldextract_version, no_cache_extract)
+    return _TLD_EXTRACTOR[1]
+
 
-        if no_cache_extract(indicator_value).suffix:
+def _detect_indicator_type(indicator_value, tldextract):
+    for can_match, regex, indicator_type in _get_auto_detect_regexes():
+        if (can_match is None or (indicator_value and can_match(indicator_value))) and regex.match(indicator_value):
+            return indicator_type
+
+    try:
+        if _get_tld_extractor(tldextract)(indicator_value).suffix:
             if '*' in indicator_value:
                 return FeedIndicatorType.DomainGlob
             return FeedIndicatorType.Domain
@@ -721,6 +731,51 @@ def auto_detect_indicator_type(indicator_value):
     return None
 
 
+def auto_detect_indicator_type(indicator_value):
+    """
+      Infer the type of the indicator.
+
+      :type indicator_value: ``str``
+      :param indicator_value: The indicator whose type we want to check. (required)
+
+      :return: The type of the indicator.
+      :rtype: ``str``
+    """
+    return auto_detect_indicator_types([indicator_value])[0]
+
+
+def auto_detect_indicator_types(indicator_values):
+    """
+      Infer the types of the given indicators.
+      The types of the most recently detected indicator values are cached, so values which repeat (in the same
+      call or across calls) are detected once.
+
+      :type indicator_values: ``Iterable[str]``
+      :param indicator_values: The indicators whose types we want to check. (required)
+
+      :return: The types of the indicators, by the order of the indicators.
+      :rtype: ``list``
+    """
+    try:
+        import tldextract
+    except Exception:
+        raise Exception("Missing tldextract module, In order to use the auto detect function please use a docker"
+                        " image with it installed such as: demisto/jmespath")
+
+    indicator_types = []
+    for indicator_value in indicator_values:
+        with _AUTO_DETECT_INDICATOR_TYPE_LOCK:
+            indicator_type = _AUTO_DETECT_INDICATOR_TYPE_CACHE.get(indicator_value, False)
+        if indicator_type is False:
+            indicator_type = _detect_indicator_type(indicator_value, tldextract)
+            with _AUTO_DETECT_INDICATOR_TYPE_LOCK:
+                if len(_AUTO_DETECT_INDICATOR_TYPE_CACHE) >= AUTO_DETECT_INDICATOR_TYPE_CACHE_SIZE:
+                    _AUTO_DETECT_INDICATOR_TYPE_CACHE.popitem(last=False)
+                _AUTO_DETECT_INDICATOR_TYPE_CACHE[indicator_value] = indicator_type
+        indicator_types.append(indicator_type)
+    return indicator_types
+
+
 def add_http_prefix_if_missing(address=''):
     """
         This function adds `http://` prefix to the proxy address in case it is missing.
@@ -2025,7 +2080,7 @@ class JsonTransformer:
 
 
 def tableToMarkdown(name, t, headers=None, headerTransform=None, removeNull=False, metadata=None, url_keys=None,
-                    date_fields=None, json_transform_mapping=None, is_auto_json_transform=False):
+                    date_fields=None, json_transform_mapping=None, is_auto_json_transform=False, max_rows=None):
     """
        Converts a demisto table in JSON form to a Markdown table
 
@@ -2060,6 +2115,11 @@ def tableToMarkdown(name, t, headers=None, headerTransform=None, removeNull=Fals
         :type is_auto_json_transform: ``bool``
         :param is_auto_json_transform: Boolean to try to auto transform complex json
 
+        :type max_rows: ``int``
+        :param max_rows: The maximal number of rows to present. If the table has more rows, only the first
+            max_rows rows are presented, followed by a note about the truncated rows. If max_rows is 0 or
+            negative, only the note is presented. Default is all the rows.
+
        :return: A string representation of the markdown table
        :rtype: ``str``
     """
@@ -2067,16 +2127,16 @@ def tableToMarkdown(name, t, headers=None, headerTransform=None, removeNull=Fals
     if url_keys:
         t = url_to_clickable_markdown(t, url_keys)
 
-    mdResult = ''
+    md_lines = []
     if name:
-        mdResult = '### ' + name + '\n'
+        md_lines.append('### ' + name + '\n')
 
     if metadata:
-        mdResult += metadata + '\n'
+        md_lines.append(metadata + '\n')
 
     if not t or len(t) == 0:
-        mdResult += '**No entries.**\n'
-        return mdResult
+        md_lines.append('**No entries.**\n')
+        return ''.join(md_lines)
 
     if not headers and isinstance(t, dict) and len(t.keys()) == 1:
         # in case of a single key, create a column table where each element is in a different row.
@@ -2089,6 +2149,13 @@ def tableToMarkdown(name, t, headers=None, headerTransform=None, removeNull=Fals
     if headers and isinstance(headers, STRING_TYPES):
         headers = [headers]
 
+    total_rows = len(t)
+    if max_rows is not None and total_rows > max_rows:
+        if max_rows <= 0:
+            md_lines.append('**Showing 0 out of {} entries.**\n'.format(total_rows))
+            return ''.join(md_lines)
+        t = t[:max_rows]
+
     if not isinstance(t[0], dict):
         # the table contains only simple objects (strings, numbers)
         # should be only one header
@@ -2110,50 +2177,62 @@ def tableToMarkdown(name, t, headers=None, headerTransform=None, removeNull=Fals
                 headers_aux.remove(header)
         headers = headers_aux
 
-    if not json_transform_mapping:
-        json_transform_mapping = {header: JsonTransformer(flatten=not is_auto_json_transform) for header in
-                                  headers}
-
     if t and len(headers) > 0:
-        newHeaders = []
         if headerTransform is None:  # noqa
             def headerTransform(s): return stringEscapeMD(s, True, True)  # noqa
-        for header in headers:
-            newHeaders.append(headerTransform(header))
-        mdResult += '|'
-        if len(newHeaders) == 1:
-            mdResult += newHeaders[0]
+        md_lines.append('|' + '|'.join([headerTransform(header) for header in headers]) + '|\n')
+        md_lines.append('|' + '|'.join(['---'] * len(headers)) + '|\n')
+
+        # the transformers are stateless, so a single one is shared by all the cells which have no specific one
+        default_json_transform = JsonTransformer(flatten=True)
+        if json_transform_mapping:
+            json_transforms = [json_transform_mapping.get(h) or default_json_transform for h in headers]
         else:
-            mdResult += '|'.join(newHeaders)
-        mdResult += '|\n'
-        sep = '---'
-        mdResult += '|' + '|'.join([sep] * len(headers)) + '|\n'
+            json_transforms = [default_json_transform if not is_auto_json_transform else JsonTransformer()] * len(headers)
+        columns = [(header, json_transform, json_transform.flatten and not json_transform.func)
+                   for header, json_transform in zip(headers, json_transforms)]
+
         for entry in t:
-            entry_copy = entry.copy()
             if date_fields:
+                entry = entry.copy()
                 for field in date_fields:
                     try:
-                        entry_copy[field] = datetime.fromtimestamp(int(entry_copy[field]) / 1000).strftime('%Y-%m-%d %H:%M:%S')
+                        entry[field] = datetime.fromtimestamp(int(entry[field]) / 1000).strftime('%Y-%m-%d %H:%M:%S')
                     except Exception:
                         pass
 
-            vals = [stringEscapeMD((formatCell(entry_copy.get(h, ''), False,
-                                               json_transform_mapping.get(h)) if entry_copy.get(h) is not None else ''),
-                                   True, True) for h in headers]
+            vals = []
+            for header, json_transform, is_flat_scalar_cell in columns:
+                value = entry.get(header)
+                if value is None:
+                    vals.append('')
+                    continue
+                value_type = type(value)
+                if value_type in STRING_TYPES and not json_transform.func:
+                    pass
+                elif value_type is int and is_flat_scalar_cell:
+                    # the same as the json dump of the flattened cell
+                    value = str(value)
+                else:
+                    value = json_transform.json_to_str(value, False)
+                if MARKDOWN_TABLE_CELL_ESCAPE_REGEX.search(value):
+                    value = MARKDOWN_TABLE_CELL_ESCAPE_REGEX.sub(_escape_markdown_table_cell_char, value)
+                vals.append(value)
 
             # this pipe is optional
-            mdResult += '| '
             try:
-                mdResult += ' | '.join(vals)
+                md_lines.append('| ' + ' | '.join(vals) + ' |\n')
             except UnicodeDecodeError:
                 vals = [str(v) for v in vals]
-                mdResult += ' | '.join(vals)
-            mdResult += ' |\n'
+                md_lines.append('| ' + ' | '.join(vals) + ' |\n')
+
+        if len(t) < total_rows:
+            md_lines.append('\n**Showing {} out of {} entries.**\n'.format(len(t), total_rows))
 
     else:
-        mdResult += '**No entries.**\n'
+        md_lines.append('**No entries.**\n')
 
-    return mdResult
+    return ''.join(md_lines)
 
 
 tblToMd = tableToMarkdown
@@ -2337,6 +2416,12 @@ def flattenTable(tableDict):
 
 
 MARKDOWN_CHARS = r"\`*_{}[]()#+-!|"
+MARKDOWN_TABLE_CELL_ESCAPE_REGEX = re.compile(r'\r\n|[\r\n|`]')
+MARKDOWN_TABLE_CELL_ESCAPES = {'\r\n': '<br>', '\r': '<br>', '\n': '<br>', '|': '\\|', '`': '\\`'}
+
+
+def _escape_markdown_table_cell_char(match):
+    return MARKDOWN_TABLE_CELL_ESCAPES[match.group()]
 
 
 def stringEscapeMD(st, minimal_escaping=False, escape_multiline=False):
@@ -2355,6 +2440,10 @@ def stringEscapeMD(st, minimal_escaping=False, escape_multiline=False):
        :return: A modified string
        :rtype: ``str``
     """
+    if minimal_escaping and escape_multiline:
+        # the escaping of table cells, in a single pass
+        return MARKDOWN_TABLE_CELL_ESCAPE_REGEX.sub(_escape_markdown_table_cell_char, st)
+
     if escape_multiline:
         st = st.replace('\r\n', '<br>')  # Windows
         st = st.replace('\r', '<br>')  # old Mac
@@ -7212,6 +7301,386 @@ if 'requests' in sys.modules:
                 kwargs['ssl_context'] = context
                 return super(SSLAdapter, self).proxy_manager_for(*args, **kwargs)
 
+    def _create_session(verify=True, pool_size=None):
+        """Creates a requests session for a client.
+
+        :type verify: ``bool``
+        :param verify: Whether the requests of the session verify the SSL certificate.
+
+        :type pool_size: ``int``
+        :param pool_size: The maximal number of connections to save in each of the session connection pools.
+            If None, the requests default is used.
+
+        :return: The session.
+        :rtype: ``requests.Session``
+        """
+        session = requests.Session()
+        adapter_kwargs = {'pool_maxsize': pool_size} if pool_size else {}
+        if pool_size:
+            session.mount('http://', HTTPAdapter(**adapter_kwargs))
+            session.mount('https://', HTTPAdapter(**adapter_kwargs))
+
+        # the following condition was added to overcome the security hardening happened in Python 3.10.
+        # https://github.com/python/cpython/pull/25778
+        # https://bugs.python.org/issue43998
+
+        if IS_PY3 and PY_VER_MINOR >= 10 and not verify:
+            session.mount('https://', SSLAdapter(**adapter_kwargs))
+
+        return session
+
+    class SessionRegistry(object):
+        """A process level registry of requests sessions, which are shared by clients with the same connection
+        settings. Clients which share a session reuse its warm (keep-alive) connections, instead of opening a new
+        connection (and doing a new TLS handshake) for each client.
+        Sessions which were not used for more than ``max_idle_time`` seconds are closed and evicted.
+
+        :type max_idle_time: ``int``
+        :param max_idle_time: The number of seconds after which an unused session is evicted.
+
+        :return: No data returned
+        :rtype: ``None``
+        """
+
+        DEFAULT_MAX_IDLE_TIME = 300
+
+        def __init__(self, max_idle_time=DEFAULT_MAX_IDLE_TIME):
+            self.max_idle_time = max_idle_time
+            self._sessions = {}  # type: Dict[tuple, list]
+            self._lock = Lock()
+
+        def get_session(self, key, verify=True, pool_size=None):
+            """Gets the session of the given key, and creates it if it does not exist.
+
+            :type key: ``tuple``
+            :param key: The connection settings of the session, for example: (base_url, verify, proxy, cert).
+
+            :type verify: ``bool``
+            :param verify: Whether the requests of the session verify the SSL certificate.
+
+            :type pool_size: ``int``
+            :param pool_size: The size of the session connection pools, used only when the session is created.
+
+            :return: The session.
+            :rtype: ``requests.Session``
+            """
+            with self._lock:
+                self.evict_idle_sessions()
+                session_entry = self._sessions.get(key)
+                if session_entry is None:
+                    session_entry = [_create_session(verify, pool_size), None]
+                    self._sessions[key] = session_entry
+                session_entry[1] = time.time()
+                return session_entry[0]
+
+        def touch(self, key):
+            """Marks the session of the given key as used now.
+
+            :type key: ``tuple``
+            :param key: The connection settings of the session.
+
+            :return: No data returned
+            :rtype: ``None``
+            """
+            with self._lock:
+                session_entry = self._sessions.get(key)
+                if session_entry is not None:
+                    session_entry[1] = time.time()
+
+        def evict_idle_sessions(self):
+            """Closes and removes the sessions which were not used for more than ``max_idle_time`` seconds.
+            A client which still holds an evicted session can keep using it, with new connections.
+
+            :return: No data returned
+            :rtype: ``None``
+            """
+            now = time.time()
+            for key, (session, last_used) in list(self._sessions.items()):
+                if now - last_used > self.max_idle_time:
+                    del self._sessions[key]
+                    session.close()
+
+        def clear(self):
+            """Closes and removes all of the sessions.
+
+            :return: No data returned
+            :rtype: ``None``
+            """
+            with self._lock:
+                for session, _ in self._sessions.values():
+                    session.close()
+                self._sessions.clear()
+
+    SESSION_REGISTRY = SessionRegistry()
+
+    class ResponseCache(object):
+        """An LRU cache of HTTP responses for BaseClient, keyed by the request method, URL, params, body, headers
+        and auth. Responses are served from the cache for ``ttl`` seconds. After that, a cached response which has an
+        ETag or a Last-Modified header is revalidated with a conditional request, and is served again if the server
+        answers with 304 (Not Modified).
+
+        When the cache is kept in the integration context, it is saved only by ``flush``, which should be called
+        once at the end of the command, for example: client.flush_response_cache().
+
+        :type ttl: ``int``
+        :param ttl: The number of seconds a cached response is served without revalidation.
+
+        :type max_size: ``int``
+        :param max_size: The maximal number of cached responses. The least recently used responses are evicted.
+
+        :type use_integration_context: ``bool``
+        :param use_integration_context: Whether to save the cache in the integration context, so it is kept
+            across command executions.
+
+        :type cacheable_methods: ``tuple``
+        :param cacheable_methods: The HTTP methods of the requests to cache.
+
+        :type max_entry_bytes: ``int``
+        :param max_entry_bytes: The maximal size in bytes of a cached response body. Larger responses are not cached.
+
+        :type max_saved_bytes: ``int``
+        :param max_saved_bytes: The maximal size in bytes of the response bodies saved in the integration context.
+            The most recently used responses which fit are saved.
+
+        :return: No data returned
+        :rtype: ``None``
+        """
+
+        INTEGRATION_CONTEXT_KEY = 'http_response_cache'
+
+        def __init__(self, ttl=300, max_size=1000, use_integration_context=False, cacheable_methods=('GET',),
+                     max_entry_bytes=1024 * 1024, max_saved_bytes=4 * 1024 * 1024):
+            self.ttl = ttl
+            self.max_size = max_size
+            self.use_integration_context = use_integration_context
+            self.cacheable_methods = {method.upper() for method in cacheable_methods}
+            self.max_entry_bytes = max_entry_bytes
+            self.max_saved_bytes = max_saved_bytes
+            self._entries = None  # type: Optional[OrderedDict]
+            self._modified = False
+            self._lock = Lock()
+
+        @staticmethod
+        def get_key(method, url, params=None, data=None, json_data=None, headers=None, auth=None):
+            """Gets the cache key of a request. The request headers and auth are part of the key, so a response
+            is never served to a request with other credentials or other headers (such as Authorization or Accept).
+
+            :type method: ``str``
+            :param method: The HTTP method of the request.
+
+            :type url: ``str``
+            :param url: The full URL of the request.
+
+            :type params: ``dict``
+            :param params: The URL parameters of the request.
+
+            :type data: ``dict`` or ``str``
+            :param data: The body of the request.
+
+            :type json_data: ``dict``
+            :param json_data: The JSON body of the request.
+
+            :type headers: ``dict``
+            :param headers: The headers of the request.
+
+            :type auth: ``tuple`` or ``requests.auth.AuthBase``
+            :param auth: The authorization of the request.
+
+            :return: The cache key.
+            :rtype: ``str``
+            """
+            import hashlib
+            headers = {name.lower(): value for name, value in (headers or {}).items()}
+            if isinstance(auth, requests.auth.HTTPBasicAuth):
+                auth = (auth.username, auth.password)
+            request_data = json.dumps([method.upper(), url, params, data, json_data, headers, auth],
+                                      sort_keys=True, default=str)
+            return hashlib.sha256(request_data.encode('utf-8')).hexdigest()
+
+        def _get_entries(self):
+            if self._entries is None:
+                self._entries = OrderedDict()
+                if self.use_integration_context:
+                    for key, entry in get_integration_context().get(self.INTEGRATION_CONTEXT_KEY) or []:
+                        self._entries[key] = entry
+            return self._entries
+
+        def flush(self):
+            """Saves the cache in the integration context, if it was modified since it was loaded.
+            The most recently used responses are saved, up to ``max_saved_bytes``.
+
+            :return: No data returned
+            :rtype: ``None``
+            """
+            with self._lock:
+                if not self.use_integration_context or not self._modified:
+                    return
+                saved = []
+                saved_bytes = 0
+                for key, entry in reversed(self._get_entries().items()):
+                    saved_bytes += len(entry['content'])
+                    if saved_bytes > self.max_saved_bytes:
+                        break
+                    saved.append([key, entry])
+                saved.reverse()
+                integration_context = get_integration_context()
+                integration_context[self.INTEGRATION_CONTEXT_KEY] = saved
+                set_integration_context(integration_context)
+                self._modified = False
+
+        def get(self, key):
+            """Gets the cache entry of the given key, and marks it as the most recently used.
+
+            :type key: ``str``
+            :param key: The cache key.
+
+            :return: The cache entry, or None if the key is not cached.
+            :rtype: ``dict``
+            """
+            with self._lock:
+                entries = self._get_entries()
+                entry = entries.pop(key, None)
+                if entry is not None:
+                    entries[key] = entry
+                return entry
+
+        def set(self, key, response):
+            """Caches the given response, and evicts the least recently used responses if the cache is full.
+
+            :type key: ``str``
+            :param key: The cache key.
+
+            :type response: ``requests.Response``
+            :param response: The response to cache.
+
+            :return: The cache entry, or None if the response body is larger than ``max_entry_bytes``.
+            :rtype: ``dict``
+            """
+            if len(response.content) > self.max_entry_bytes:
+                return None
+            entry = {
+                'status_code': response.status_code,
+                'reason': response.reason,
+                'url': response.url,
+                'headers': dict(response.headers),
+                'encoding': response.encoding,
+                'content': base64.b64encode(response.content).decode('ascii'),
+                'time': time.time(),
+            }
+            with self._lock:
+                entries = self._get_entries()
+                entries.pop(key, None)
+                entries[key] = entry
+                while len(entries) > self.max_size:
+                    entries.popitem(last=False)
+                self._modified = True
+            return entry
+
+        def refresh(self, key, entry, response):
+            """Marks a cache entry as fresh, after the server confirmed it was not modified.
+
+            :type key: ``str``
+            :param key: The cache key.
+
+            :type entry: ``dict``
+            :param entry: The cache entry.
+
+            :type response: ``requests.Response``
+            :param response: The 304 (Not Modified) response of the revalidation request.
+
+            :return: No data returned
+            :rtype: ``None``
+            """
+            with self._lock:
+                entry['time'] = time.time()
+                for header in ('ETag', 'Last-Modified'):
+                    if response.headers.get(header):
+                        entry['headers'][header] = response.headers[header]
+                self._modified = True
+
+        def is_fresh(self, entry):
+            return time.time() - entry['time'] < self.ttl
+
+        @staticmethod
+        def to_response(entry):
+            """Builds a response from a cache entry.
+
+            :type entry: ``dict``
+            :param entry: The cache entry.
+
+            :return: The response.
+            :rtype: ``requests.Response``
+            """
+            response = requests.Response()
+            response.status_code = entry['status_code']
+            response.reason = entry['reason']
+            response.url = entry['url']
+            response.headers = requests.structures.CaseInsensitiveDict(entry['headers'])
+            response.encoding = entry['encoding']
+            response._content = base64.b64decode(entry['content'])
+            return response
+
+        def request(self, send, method, url, params=None, data=None, json_data=None, headers=None, auth=None,
+                    **kwargs):
+            """Sends a request through the cache: a fresh cached response is returned without sending the request,
+            and a stale one is revalidated with the If-None-Match and If-Modified-Since headers.
+
+            :type send: ``callable``
+            :param send: The function which sends the request, with the ``requests.Session.request`` arguments.
+
+            :type method: ``str``
+            :param method: The HTTP method of the request.
+
+            :type url: ``str``
+            :param url: The full URL of the request.
+
+            :type params: ``dict``
+            :param params: The URL parameters of the request.
+
+            :type data: ``dict`` or ``str``
+            :param data: The body of the request.
+
+            :type json_data: ``dict``
+            :param json_data: The JSON body of the request.
+
+            :type headers: ``dict``
+            :param headers: The headers of the request.
+
+            :type auth: ``tuple`` or ``requests.auth.AuthBase``
+            :param auth: The authorization of the request.
+
+            :return: The response.
+            :rtype: ``requests.Response``
+            """
+            if method.upper() not in self.cacheable_methods:
+                return send(method, url, params=params, data=data, json=json_data, headers=headers, auth=auth, **kwargs)
+
+            key = self.get_key(method, url, params, data, json_data, headers, auth)
+            entry = self.get(key)
+            if entry is not None and self.is_fresh(entry):
+                demisto.debug('Returning the cached response of {} {}'.format(method.upper(), url))
+                return self.to_response(entry)
+
+            if entry is not None:
+                etag = entry['headers'].get('ETag')
+                last_modified = entry['headers'].get('Last-Modified')
+                if etag or last_modified:
+                    headers = dict(headers or {})
+                    if etag:
+                        headers['If-None-Match'] = etag
+                    if last_modified:
+                        headers['If-Modified-Since'] = last_modified
+
+            response = send(method, url, params=params, data=data, json=json_data, headers=headers, auth=auth, **kwargs)
+            if entry is not None and response.status_code == 304:
+                demisto.debug('The cached response of {} {} was not modified'.format(method.upper(), url))
+                self.refresh(key, entry, response)
+                return self.to_response(entry)
+
+            if 200 <= response.status_code < 300:
+                self.set(key, response)
+            return response
+
     class BaseClient(object):
         """Client to use in integrations with powerful _http_request
         :type base_url: ``str``
@@ -7238,6 +7707,26 @@ if 'requests' in sys.modules:
             The request authorization, for example: (username, password).
             Can be None.
 
+        :type cert: ``str`` or ``tuple``
+        :param cert: The client certificate of the requests, a path or a (cert, key) tuple. Can be None.
+
+        :type reuse_session: ``bool``
+        :param reuse_session:
+            Whether to take the requests session from the process level ``SESSION_REGISTRY``, so all the clients
+            with the same base_url, verify, proxy and cert share it and reuse its warm connections.
+            Note that the session state (cookies, retry adapters) is shared by these clients as well.
+
+        :type session_pool_size: ``int``
+        :param session_pool_size:
+            The maximal number of connections to save in each of the session connection pools.
+            If None, the requests default is used.
+
+        :type response_cache: ``ResponseCache``
+        :param response_cache:
+            A cache of the responses of _http_request (see ``ResponseCache``), for example:
+            ResponseCache(ttl=600, use_integration_context=True). If None, responses are not cached.
+            A cache in the integration context is saved by calling flush_response_cache at the end of the command.
+
         :return: No data returned
         :rtype: ``None``
         """
@@ -7253,20 +7742,25 @@ if 'requests' in sys.modules:
             headers=None,
             auth=None,
             timeout=REQUESTS_TIMEOUT,
+            cert=None,
+            reuse_session=False,
+            session_pool_size=None,
+            response_cache=None,
         ):
             self._base_url = base_url
             self._verify = verify
             self._ok_codes = ok_codes
             self._headers = headers
             self._auth = auth
-            self._session = requests.Session()
-
-            # the following condition was added to overcome the security hardening happened in Python 3.10.
-            # https://github.com/python/cpython/pull/25778
-            # https://bugs.python.org/issue43998
-
-            if IS_PY3 and PY_VER_MINOR >= 10 and not verify:
-                self._session.mount('https://', SSLAdapter())
+            self._reuse_session = reuse_session
+            self._session_key = (base_url, verify, proxy, tuple(cert) if isinstance(cert, list) else cert)
+            if reuse_session:
+                self._session = SESSION_REGISTRY.get_session(self._session_key, verify, session_pool_size)
+            else:
+                self._session = _create_session(verify, session_pool_size)
+            if cert:
+                self._session.cert = cert
+            self._response_cache = response_cache
 
             if proxy:
                 ensure_proxy_has_http_prefix()
@@ -7283,6 +7777,9 @@ if 'requests' in sys.modules:
 
         def __del__(self):
             try:
+                if self._reuse_session:
+                    # the session is shared with other clients, and is closed by the registry once it is idle
+                    return
                 self._session.close()
             except AttributeError:
                 # we ignore exceptions raised due to session not used by the client and hence do not exist in __del__
@@ -7290,6 +7787,16 @@ if 'requests' in sys.modules:
             except Exception:  # noqa
                 demisto.debug('failed to close BaseClient session with the following error:\n{}'.format(traceback.format_exc()))
 
+        def flush_response_cache(self):
+            """Saves the response cache in the integration context (see ``ResponseCache.flush``).
+            Should be called once at the end of the command.
+
+            :return: No data returned
+            :rtype: ``None``
+            """
+            if self._response_cache is not None:
+                self._response_cache.flush()
+
         def _implement_retry(self, retries=0,
                              status_list_to_retry=None,
                              backoff_factor=5,
@@ -7370,7 +7877,7 @@ if 'requests' in sys.modules:
                           params=None, data=None, files=None, timeout=None, resp_type='json', ok_codes=None,
                           return_empty_response=False, retries=0, status_list_to_retry=None,
                           backoff_factor=5, raise_on_redirect=False, raise_on_status=False,
-                          error_handler=None, empty_valid_codes=None, **kwargs):
+                          error_handler=None, empty_valid_codes=None, use_cache=True, **kwargs):
             """A wrapper for requests lib to send our requests and handle requests and responses better.
 
             :type method: ``str``
@@ -7466,6 +7973,9 @@ if 'requests' in sys.modules:
             :param empty_valid_codes: A list of all valid status codes of empty responses (usually only 204, but
                 can vary)
 
+            :type use_cache: ``bool``
+            :param use_cache: Whether to use the response cache of the client (if it has one) for the request.
+
             """
             try:
                 # Replace params if supplied
@@ -7476,21 +7986,38 @@ if 'requests' in sys.modules:
                     self._implement_retry(retries, status_list_to_retry, backoff_factor, raise_on_redirect, raise_on_status)
                 if not timeout:
                     timeout = self.timeout
+                if self._reuse_session:
+                    SESSION_REGISTRY.touch(self._session_key)
 
                 # Execute
-                res = self._session.request(
-                    method,
-                    address,
-                    verify=self._verify,
-                    params=params,
-                    data=data,
-                    json=json_data,
-                    files=files,
-                    headers=headers,
-                    auth=auth,
-                    timeout=timeout,
-                    **kwargs
-                )
+                if self._response_cache is not None and use_cache and not files and not kwargs.get('stream'):
+                    res = self._response_cache.request(
+                        self._session.request,
+                        method,
+                        address,
+                        verify=self._verify,
+                        params=params,
+                        data=data,
+                        json_data=json_data,
+                        headers=headers,
+                        auth=auth,
+                        timeout=timeout,
+                        **kwargs
+                    )
+                else:
+                    res = self._session.request(
+                        method,
+                        address,
+                        verify=self._verify,
+                        params=params,
+                        data=data,
+                        json=json_data,
+                        files=files,
+                        headers=headers,
+                        auth=auth,
+                        timeout=timeout,
+                        **kwargs
+                    )
                 # Handle error responses gracefully
                 if not self._is_status_code_valid(res, ok_codes):
                     if error_handler:
@@ -7586,7 +8113,8 @@ def batch(iterable, batch_size=1):
     """Gets an iterable and yields slices of it.
 
     :type iterable: ``list``
-    :param iterable: list or other iterable object.
+    :param iterable: list or other iterable object. Non sliceable iterables (e.g. generators) are consumed lazily,
+        so only one batch is held in memory at a time.
 
     :type batch_size: ``int``
     :param batch_size: the size of batches to fetch
@@ -7594,6 +8122,14 @@ def batch(iterable, batch_size=1):
     :rtype: ``list``
     :return:: Iterable slices of given
     """
+    if not hasattr(iterable, '__getitem__'):
+        iterator = iter(iterable)
+        current_batch = list(islice(iterator, batch_size))
+        while current_batch:
+            yield current_batch
+            current_batch = list(islice(iterator, batch_size))
+        return
+
     current_batch = iterable[:batch_size]
     not_batched = iterable[batch_size:]
     while current_batch:
@@ -7602,6 +8138,39 @@ def batch(iterable, batch_size=1):
         not_batched = not_batched[batch_size:]
 
 
+def create_indicators_in_batches(indicators, batch_size=2000, no_update=None):
+    """Submits indicators to the server with ``demisto.createIndicators`` in batches.
+    The indicators may be a generator, in which case each batch is submitted as soon as it is ready,
+    without holding all of the indicators in memory.
+
+    :type indicators: ``Iterable[dict]``
+    :param indicators: The indicators to create.
+
+    :type batch_size: ``int``
+    :param batch_size: The number of indicators to submit in each createIndicators call.
+
+    :type no_update: ``bool``
+    :param no_update: The noUpdate value of the createIndicators calls, used only on server 6.5.0 and above.
+
+    :return: The number of indicators that were submitted.
+    :rtype: ``int``
+    """
+    kwargs = {}
+    if no_update is not None and is_demisto_version_ge('6.5.0'):
+        kwargs['noUpdate'] = no_update
+
+    indicators_count = 0
+    for indicators_batch in batch(indicators, batch_size=batch_size):
+        demisto.createIndicators(indicators_batch, **kwargs)
+        indicators_count += len(indicators_batch)
+
+    if not indicators_count:
+        # an empty call is still needed, so the server will handle the noUpdate value of the fetch
+        demisto.createIndicators([], **kwargs)
+
+    return indicators_count
+
+
 def dict_safe_get(dict_object, keys, default_return_value=None, return_type=None, raise_return_type=True):
     """Recursive safe get query (for nested dicts and lists), If keys found return value otherwise return None or default value.
     Example:
@@ -8284,6 +8853,10 @@ class IndicatorsSearcher:
     :type limit: ``Optional[int]``
     :param limit: the current upper limit of the search (can be updated after init)
 
+    :type prefetch: ``bool``
+    :param prefetch: whether to search the next page in a background thread while the current page is processed.
+        Adds a lock on the calls to the server (see ``support_multithreading``).
+
     :return: No data returned
     :rtype: ``None``
     """
@@ -8297,7 +8870,8 @@ class IndicatorsSearcher:
                  size=100,
                  to_date=None,
                  value='',
-                 limit=None):
+                 limit=None,
+                 prefetch=False):
         # searchAfter is available in searchIndicators from version 6.1.0
         self._can_use_search_after = is_demisto_version_ge('6.1.0')
         # populateFields merged in https://github.com/demisto/server/pull/18398
@@ -8313,6 +8887,10 @@ class IndicatorsSearcher:
         self._value = value
         self._limit = limit
         self._total_iocs_fetched = 0
+        self._prefetch = prefetch
+        self._prefetched_page = None  # type: Optional[tuple]
+        if prefetch and not hasattr(demisto, 'lock') and hasattr(demisto, '_Demisto__do'):
+            support_multithreading()
 
     def __iter__(self):
         return self
@@ -8322,19 +8900,76 @@ class IndicatorsSearcher:
         return self.__next__()
 
     def __next__(self):
-        if self.is_search_done():
-            raise StopIteration
-        res = self.search_indicators_by_version(from_date=self._from_date,
-                                                query=self._query,
-                                                size=self._size,
-                                                to_date=self._to_date,
-                                                value=self._value)
+        if self._prefetched_page is None:
+            if self.is_search_done():
+                raise StopIteration
+            res = self._search_next_page()
+        else:
+            if self.limit is not None and self.limit <= self._total_iocs_fetched:
+                # the limit was updated while the next page was searched - keep the page in case it is raised again
+                raise StopIteration
+            res = self._get_prefetched_page()
         fetched_len = len(res.get('iocs') or [])
         if fetched_len == 0:
             raise StopIteration
         self._total_iocs_fetched += fetched_len
+        if self._prefetch and not self.is_search_done():
+            self._prefetch_next_page()
         return res
 
+    def _search_next_page(self):
+        return self.search_indicators_by_version(from_date=self._from_date,
+                                                 query=self._query,
+                                                 size=self._size,
+                                                 to_date=self._to_date,
+                                                 value=self._value)
+
+    def _prefetch_next_page(self):
+        # the thread only sends the search, the searcher state is updated by _get_prefetched_page in the caller thread
+        search_args = self._get_search_args(from_date=self._from_date,
+                                            query=self._query,
+                                            size=self._size,
+                                            to_date=self._to_date,
+                                            value=self._value)
+        result = {}  # type: Dict[str, Any]
+
+        def search():
+            try:
+                result['res'] = demisto.searchIndicators(**search_args)
+            except Exception as e:
+                result['error'] = e
+
+        thread = Thread(target=search)
+        thread.daemon = True
+        thread.start()
+        self._prefetched_page = (thread, result)
+
+    def _get_prefetched_page(self):
+        thread, result = self._prefetched_page  # type: ignore[misc]
+        thread.join()
+        self._prefetched_page = None
+        if 'error' in result:
+            raise result['error']
+        self._update_search_state(result['res'])
+        return result['res']
+
+    def iter_indicators(self):
+        """Iterates over the searched indicators one by one, instead of page by page.
+        If the limit is set, at most limit indicators are returned (the limit when the iteration starts, as the
+        search may update it to the number of fetched indicators).
+
+        :return: a generator of the indicators
+        :rtype: ``Iterator[dict]``
+        """
+        limit = self.limit
+        indicators_count = 0
+        for res in self:
+            for ioc in res.get('iocs') or []:
+                if limit is not None and indicators_count >= limit:
+                    return
+                indicators_count += 1
+                yield ioc
+
     @property
     def page(self):
         return self._page
@@ -8397,7 +9032,12 @@ class IndicatorsSearcher:
         :return: object contains the search results
         :rtype: ``dict``
         """
-        search_args = assign_params(
+        res = demisto.searchIndicators(**self._get_search_args(from_date, query, size, to_date, value))
+        self._update_search_state(res)
+        return res
+
+    def _get_search_args(self, from_date=None, query='', size=100, to_date=None, value=''):
+        return assign_params(
             fromDate=from_date,
             toDate=to_date,
             query=query,
@@ -8408,12 +9048,12 @@ class IndicatorsSearcher:
             # use paging as fallback when cannot use search_after
             page=self.page if not self._can_use_search_after else None
         )
-        res = demisto.searchIndicators(**search_args)
+
+    def _update_search_state(self, res):
         if isinstance(self._page, int):
             self._page += 1  # advance pages
         self._search_after_param = res.get(self.SEARCH_AFTER_TITLE)
         self._total = res.get('total')
-        return res
 
 
 class AutoFocusKeyRetriever:
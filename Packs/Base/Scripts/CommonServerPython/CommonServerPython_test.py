@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import demistomock as demisto
+import base64
 import copy
 import json
 import re
@@ -17,7 +18,7 @@ from CommonServerPython import set_to_integration_context_with_retries, xml2json
     argToBoolean, ipv4Regex, ipv4cidrRegex, ipv6cidrRegex, urlRegex, ipv6Regex, batch, FeedIndicatorType, \
     encode_string_results, safe_load_json, remove_empty_elements, aws_table_to_markdown, is_demisto_version_ge, \
     appendContext, auto_detect_indicator_type, handle_proxy, get_demisto_version_as_str, get_x_content_info_headers, \
-    url_to_clickable_markdown, WarningsHandler, DemistoException, SmartGetDict, JsonTransformer
+    url_to_clickable_markdown, WarningsHandler, DemistoException, SmartGetDict, JsonTransformer, create_indicators_in_batches
 import CommonServerPython
 
 try:
@@ -311,6 +312,55 @@ class TestTableToMarkdown:
         )
         assert table == expected_table
 
+    @staticmethod
+    def test_max_rows():
+        """
+        Given:
+          - list of objects with more rows than max_rows.
+          - values of different types, with line endings, pipes and backticks.
+        When:
+          - calling tableToMarkdown with max_rows.
+        Then:
+          - return a table with only the first max_rows rows, followed by a note about the truncated rows.
+        """
+        data = [
+            {'header_1': 'a\r\nb\rc`d`', 'header_2': 1, 'header_3': True},
+            {'header_1': 'e|f', 'header_2': [1, 2], 'header_3': None},
+            {'header_1': 'g', 'header_2': 3, 'header_3': False},
+        ]
+
+        table = tableToMarkdown('tableToMarkdown test with max rows', data, max_rows=2)
+        expected_table = (
+            '### tableToMarkdown test with max rows\n'
+            '|header_1|header_2|header_3|\n'
+            '|---|---|---|\n'
+            '| a<br>b<br>c\\`d\\` | 1 | true |\n'
+            '| e\\|f | 1,<br>2 |  |\n'
+            '\n'
+            '**Showing 2 out of 3 entries.**\n'
+        )
+        assert table == expected_table
+        assert tableToMarkdown('tableToMarkdown test with max rows', data, max_rows=3) == \
+            tableToMarkdown('tableToMarkdown test with max rows', data)
+
+    @staticmethod
+    @pytest.mark.parametrize('max_rows', [0, -1])
+    def test_max_rows_not_positive(max_rows):
+        """
+        Given:
+          - a non-empty list of objects.
+        When:
+          - calling tableToMarkdown with max_rows of 0 or less.
+        Then:
+          - return no rows, only the note about the truncated rows.
+        """
+        data = [{'header_1': 'a'}, {'header_1': 'b'}]
+
+        assert tableToMarkdown('tableToMarkdown test with max rows', data, max_rows=max_rows) == (
+            '### tableToMarkdown test with max rows\n'
+            '**Showing 0 out of 2 entries.**\n'
+        )
+
     @staticmethod
     def test_url():
         """
@@ -2866,6 +2916,189 @@ class TestBaseClient:
         response.status_code = 400
         assert not self.client._is_status_code_valid(response)
 
+    def test_reuse_session(self, mocker, requests_mock):
+        """
+            Given
+            - Clients with reuse_session, some of them with the same connection settings
+
+            When
+            - Creating the clients and sending requests
+
+            Then
+            -  Clients with the same settings share a session, which is not closed when a client is deleted
+            -  Clients with different settings or without reuse_session have their own sessions
+        """
+        from CommonServerPython import BaseClient, SESSION_REGISTRY
+        mocker.patch.object(SESSION_REGISTRY, '_sessions', {})
+        requests_mock.get('http://example.com/api/v2/event', text=json.dumps(self.text))
+
+        client = BaseClient('http://example.com/api/v2/', reuse_session=True)
+        same_client = BaseClient('http://example.com/api/v2/', reuse_session=True, session_pool_size=20)
+        other_client = BaseClient('http://example.com/api/v2/', verify=False, reuse_session=True)
+        own_session_client = BaseClient('http://example.com/api/v2/')
+
+        assert client._session is same_client._session
+        assert client._session is not other_client._session
+        assert client._session is not own_session_client._session
+        assert len(SESSION_REGISTRY._sessions) == 2
+
+        close_session = mocker.patch.object(client._session, 'close')
+        del same_client
+        assert not close_session.called
+        assert client._http_request('get', 'event') == self.text
+
+    def test_session_registry_evicts_idle_sessions(self, mocker):
+        """
+            Given
+            - A session registry with a session which was not used for more than max_idle_time
+
+            When
+            - Getting a session from the registry
+
+            Then
+            -  The idle session is closed and evicted, and a new session is created for its key
+        """
+        from CommonServerPython import SessionRegistry
+        registry = SessionRegistry(max_idle_time=60)
+        mocker.patch.object(CommonServerPython.time, 'time', return_value=1000)
+        idle_session = registry.get_session(('http://example.com', True, False, None))
+        close_session = mocker.patch.object(idle_session, 'close')
+
+        CommonServerPython.time.time.return_value = 1030
+        registry.touch(('http://example.com', True, False, None))
+        CommonServerPython.time.time.return_value = 1080
+        assert registry.get_session(('http://example.com', True, False, None)) is idle_session
+
+        CommonServerPython.time.time.return_value = 1200
+        other_session = registry.get_session(('http://other.com', True, False, None))
+        assert close_session.called
+        assert list(registry._sessions) == [('http://other.com', True, False, None)]
+        assert registry.get_session(('http://example.com', True, False, None)) is not idle_session
+        assert registry.get_session(('http://other.com', True, False, None)) is other_session
+
+    def test_response_cache(self, mocker, requests_mock):
+        """
+            Given
+            - A client with a response cache
+
+            When
+            - Sending the same GET request again, before and after the cache ttl passed
+
+            Then
+            -  The cached response is returned without a request while it is fresh
+            -  A stale response is revalidated with If-None-Match, and is returned again on 304
+            -  POST requests and requests with use_cache=False are not cached
+        """
+        from CommonServerPython import BaseClient, ResponseCache
+        mocker.patch.object(CommonServerPython.time, 'time', return_value=1000)
+        get_mock = requests_mock.get('http://example.com/api/v2/event', [
+            {'json': self.text, 'headers': {'ETag': '"v1"'}},
+            {'status_code': 304},
+        ])
+        post_mock = requests_mock.post('http://example.com/api/v2/event', json=self.text)
+        client = BaseClient('http://example.com/api/v2/', response_cache=ResponseCache(ttl=60))
+
+        assert client._http_request('get', 'event') == self.text
+        assert client._http_request('get', 'event') == self.text
+        assert get_mock.call_count == 1
+
+        CommonServerPython.time.time.return_value = 1100
+        assert client._http_request('get', 'event') == self.text
+        assert get_mock.call_count == 2
+        assert get_mock.last_request.headers['If-None-Match'] == '"v1"'
+        assert client._http_request('get', 'event') == self.text
+        assert get_mock.call_count == 2
+
+        client._http_request('post', 'event')
+        client._http_request('post', 'event')
+        assert post_mock.call_count == 2
+
+        requests_mock.get('http://example.com/api/v2/event', json={'status': 'new'})
+        assert client._http_request('get', 'event', use_cache=False) == {'status': 'new'}
+
+    def test_response_cache_lru_and_integration_context(self, mocker, requests_mock):
+        """
+            Given
+            - A response cache with max_size 2, saved in the integration context
+
+            When
+            - Caching the responses of three requests
+
+            Then
+            -  The least recently used response is evicted
+            -  The cache is saved in the integration context only when it is flushed
+            -  A new cache loads the cached responses from the integration context
+        """
+        from CommonServerPython import BaseClient, ResponseCache
+        integration_context = {}
+        mocker.patch.object(CommonServerPython, 'get_integration_context', side_effect=lambda: integration_context)
+        set_context_mock = mocker.patch.object(CommonServerPython, 'set_integration_context',
+                                               side_effect=integration_context.update)
+        for i in range(3):
+            requests_mock.get('http://example.com/api/v2/event/{}'.format(i), json={'id': i})
+
+        client = BaseClient('http://example.com/api/v2/',
+                            response_cache=ResponseCache(max_size=2, use_integration_context=True))
+        client._http_request('get', 'event/0')
+        client._http_request('get', 'event/1')
+        client._http_request('get', 'event/0')
+        client._http_request('get', 'event/2')
+        assert not set_context_mock.called
+        client.flush_response_cache()
+        client.flush_response_cache()
+        assert set_context_mock.call_count == 1
+        assert len(integration_context[ResponseCache.INTEGRATION_CONTEXT_KEY]) == 2
+
+        client = BaseClient('http://example.com/api/v2/',
+                            response_cache=ResponseCache(max_size=2, use_integration_context=True))
+        call_count = requests_mock.call_count
+        assert client._http_request('get', 'event/0') == {'id': 0}
+        assert client._http_request('get', 'event/2') == {'id': 2}
+        assert requests_mock.call_count == call_count
+        assert client._http_request('get', 'event/1') == {'id': 1}
+        assert requests_mock.call_count == call_count + 1
+
+    def test_response_cache_key_and_size_limits(self, mocker, requests_mock):
+        """
+            Given
+            - A response cache with a body size limit and a saved bytes budget, saved in the integration context
+
+            When
+            - Sending the same request with other credentials, and caching responses of several sizes
+
+            Then
+            -  A response is not served to a request with another Authorization header or auth
+            -  Responses larger than max_entry_bytes are not cached
+            -  Only the most recently used responses which fit in max_saved_bytes are saved
+        """
+        from CommonServerPython import BaseClient, ResponseCache
+        integration_context = {}
+        mocker.patch.object(CommonServerPython, 'get_integration_context', side_effect=lambda: integration_context)
+        mocker.patch.object(CommonServerPython, 'set_integration_context', side_effect=integration_context.update)
+        event_mock = requests_mock.get('http://example.com/api/v2/event', json={'id': 0})
+        large_mock = requests_mock.get('http://example.com/api/v2/large', text='a' * 100)
+        for i in range(3):
+            requests_mock.get('http://example.com/api/v2/event/{}'.format(i), text=str(i) * 30)
+        response_cache = ResponseCache(use_integration_context=True, max_entry_bytes=50, max_saved_bytes=100)
+        client = BaseClient('http://example.com/api/v2/', response_cache=response_cache)
+
+        client._http_request('get', 'event', headers={'Authorization': 'token1'})
+        client._http_request('get', 'event', headers={'Authorization': 'token1'})
+        client._http_request('get', 'event', headers={'Authorization': 'token2'})
+        client._http_request('get', 'event', auth=('user', 'pass'))
+        client._http_request('get', 'event', auth=('user', 'other'))
+        assert event_mock.call_count == 4
+
+        client._http_request('get', 'large', resp_type='text')
+        client._http_request('get', 'large', resp_type='text')
+        assert large_mock.call_count == 2
+
+        for i in range(3):
+            client._http_request('get', 'event/{}'.format(i), resp_type='text')
+        client.flush_response_cache()
+        saved = integration_context[ResponseCache.INTEGRATION_CONTEXT_KEY]
+        assert [base64.b64decode(entry['content']) for _, entry in saved] == [b'1' * 30, b'2' * 30]
+
 
 def test_parse_date_string():
     # test unconverted data remains: Z
@@ -3170,6 +3403,34 @@ def test_batch(iterable, sz, expected):
         assert expected[i] == item
 
 
+@pytest.mark.parametrize('iterable, sz, expected', batch_params)
+def test_batch_generator(iterable, sz, expected):
+    assert list(batch((item for item in iterable), sz)) == expected
+
+
+@pytest.mark.parametrize('indicators_count, is_version_ge_65, expected_calls', [
+    (5, True, [([{'value': 0}, {'value': 1}], {'noUpdate': True}), ([{'value': 2}, {'value': 3}], {'noUpdate': True}),
+               ([{'value': 4}], {'noUpdate': True})]),
+    (0, True, [([], {'noUpdate': True})]),
+    (3, False, [([{'value': 0}, {'value': 1}], {}), ([{'value': 2}], {})]),
+])
+def test_create_indicators_in_batches(mocker, indicators_count, is_version_ge_65, expected_calls):
+    """
+    Given:
+        - A generator of indicators.
+    When:
+        - Creating the indicators with create_indicators_in_batches.
+    Then:
+        - Ensure createIndicators is called per batch (or once with no indicators), with noUpdate only on 6.5.0+.
+    """
+    mocker.patch.object(CommonServerPython, 'is_demisto_version_ge', return_value=is_version_ge_65)
+    create_indicators = mocker.patch.object(demisto, 'createIndicators')
+
+    indicators = ({'value': i} for i in range(indicators_count))
+    assert create_indicators_in_batches(indicators, batch_size=2, no_update=True) == indicators_count
+    assert [(call.args[0], call.kwargs) for call in create_indicators.call_args_list] == expected_calls
+
+
 regexes_test = [
     (ipv4Regex, '192.168.1.1', True),
     (ipv4Regex, '192.168.1.1/24', False),
@@ -3399,6 +3660,31 @@ def test_auto_detect_indicator_type(indicator_value, indicatory_type):
                              " use a docker image with it installed such as: demisto/jmespath"
 
 
+def test_auto_detect_indicator_types(mocker):
+    """
+        Given
+            - Indicator values, some of them repeating
+
+        When
+        - Trying to detect the types of the indicators in a batch.
+
+        Then
+        -  Run the auto_detect_indicator_types and validate that the indicator types the function returns are as
+           expected, by the indicators order.
+        -  Validate that the type of a repeating indicator value is detected once.
+    """
+    if sys.version_info.major == 3 and sys.version_info.minor >= 8:
+        from CommonServerPython import auto_detect_indicator_types
+        mocker.patch.object(CommonServerPython, '_AUTO_DETECT_INDICATOR_TYPE_CACHE', CommonServerPython.OrderedDict())
+        detect_indicator_type = mocker.spy(CommonServerPython, '_detect_indicator_type')
+        indicator_values = [indicator_value for indicator_value, _ in INDICATOR_VALUE_AND_TYPE]
+        indicator_types = [indicator_type for _, indicator_type in INDICATOR_VALUE_AND_TYPE]
+
+        assert auto_detect_indicator_types(indicator_values * 2) == indicator_types * 2
+        assert auto_detect_indicator_types(indicator_values) == indicator_types
+        assert detect_indicator_type.call_count == len(set(indicator_values))
+
+
 def test_auto_detect_indicator_type_tldextract(mocker):
     """
         Given
@@ -5501,6 +5787,93 @@ class TestIndicatorsSearcher:
             results.append(res)
         assert len(results) == 1
 
+    @pytest.mark.parametrize('can_use_search_after', [True, False])
+    def test_iterator__prefetch(self, mocker, can_use_search_after):
+        """
+        Given:
+          - Searching indicators with prefetch
+        When:
+          - Searching indicators using iterator
+        Then:
+          - Get the same pages as without prefetch, in the same order
+          - The next page is searched while the current page is processed
+          - The searcher state is updated only when the prefetched page is returned
+        """
+        from CommonServerPython import IndicatorsSearcher
+        mocker.patch.object(demisto, 'searchIndicators', side_effect=self.mock_search_after_output)
+        search_indicators = IndicatorsSearcher(page=1, size=1)
+        search_indicators._can_use_search_after = can_use_search_after
+        expected_results = list(search_indicators)
+
+        search_indicators_mock = mocker.patch.object(demisto, 'searchIndicators',
+                                                     side_effect=self.mock_search_after_output)
+        search_indicators = IndicatorsSearcher(page=1, size=1, prefetch=True)
+        search_indicators._can_use_search_after = can_use_search_after
+        results = []
+        for res in search_indicators:
+            if not results:
+                search_indicators._prefetched_page[0].join()
+                assert search_indicators_mock.call_count == 2
+                assert search_indicators.page == 2
+            results.append(res)
+
+        assert results == expected_results
+        assert search_indicators.is_search_done() is True
+
+    def test_prefetch_support_multithreading(self, mocker):
+        """
+        Given:
+          - Running in an integration which does not support multithreading yet
+        When:
+          - Creating searchers with and without prefetch
+        Then:
+          - Multithreading support is added only for the searcher with prefetch
+        """
+        from CommonServerPython import IndicatorsSearcher
+        mocker.patch.object(demisto, '_Demisto__do', create=True)
+        support_multithreading_mock = mocker.patch.object(CommonServerPython, 'support_multithreading')
+        IndicatorsSearcher()
+        assert not support_multithreading_mock.called
+        IndicatorsSearcher(prefetch=True)
+        assert support_multithreading_mock.call_count == 1
+
+    def test_iterator__prefetch_research_flow(self, mocker):
+        """
+        Given:
+          - Searching indicators with prefetch and a limit of 2
+        When:
+          - Searching indicators using iterator, and then raising the limit
+        Then:
+          - The page prefetched after reaching the limit is returned after the limit is raised
+        """
+        from CommonServerPython import IndicatorsSearcher
+        mocker.patch.object(demisto, 'searchIndicators', side_effect=self.mock_search_indicators_search_after)
+        search_indicators = IndicatorsSearcher(limit=1, prefetch=True)
+        search_indicators._can_use_search_after = True
+        results = [res['iocs'][0]['value'] for res in search_indicators]
+        search_indicators.limit = 1
+        results += [res['iocs'][0]['value'] for res in search_indicators]
+        assert results == ['mock0']
+        search_indicators.limit = 10
+        results += [res['iocs'][0]['value'] for res in search_indicators]
+        assert results == ['mock0', 'mock1', 'mock2', 'mock3']
+
+    def test_iter_indicators(self, mocker):
+        """
+        Given:
+          - Searching indicators with a limit of 5
+        When:
+          - Iterating over the indicators with iter_indicators
+        Then:
+          - Get the first 5 indicators one by one
+        """
+        from CommonServerPython import IndicatorsSearcher
+        mocker.patch.object(demisto, 'searchIndicators', return_value={
+            'iocs': [{'value': 'mock{}'.format(i)} for i in range(3)], 'total': 9, 'searchAfter': 'next'})
+        search_indicators = IndicatorsSearcher(size=3, limit=5, prefetch=True)
+        assert [ioc['value'] for ioc in search_indicators.iter_indicators()] == \
+            ['mock0', 'mock1', 'mock2', 'mock0', 'mock1']
+
 
 class TestAutoFocusKeyRetriever:
     def test_instantiate_class_with_param_key(self, mocker, clear_version_cache):
@@ -1,4 +1,6 @@
+import mmap
 import tempfile
+import threading
 
 import demistomock as demisto
 from CommonServerPython import *
@@ -8,15 +10,22 @@ import re
 
 from base64 import b64decode
 from flask import Flask, Response, request
-from netaddr import IPSet
-from typing import Any, Dict, cast, Iterable, Callable, IO
+from netaddr import IPNetwork, IPSet
+from typing import Any, Dict, cast, Iterable, Iterator, Callable, IO, Tuple
 from math import ceil
+from functools import partial
+from itertools import compress, islice
 import urllib3
 import dateparser
 import hashlib
 import json
 import ipaddress
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
 # Disable insecure warnings
 urllib3.disable_warnings()
 
@@ -39,6 +48,10 @@ EDL_NO_URLS_IN_PROXYSG_FORMAT = 'ProxySG format only outputs URLs - no URLs foun
 EDL_ON_DEMAND_KEY: str = 'UpdateEDL'
 EDL_ON_DEMAND_CACHE_PATH: str = ''
 EDL_SEARCH_LOOP_LIMIT: int = 10
+EDL_SNAPSHOT_CHUNK_SIZE: int = 1024 * 1024
+EDL_CACHE_MAX_VARIANTS: int = 50
+EDL_CACHE_MAX_SIZE: int = 1024 ** 3  # the maximal total size (in bytes) of the cached snapshot files
+EDL_CACHE_MAX_IDLE_REFRESHES: int = 3  # the number of refreshes after which a variant which was not requested is evicted
 
 ''' REFORMATTING REGEXES '''
 _PROTOCOL_REMOVAL = re.compile('^(?:[a-z]+:)*//')
@@ -68,6 +81,7 @@ FORMAT_PROXYSG: str = "Symantec ProxySG"
 MWG_TYPE_OPTIONS = ["string", "applcontrol", "dimension", "category", "ip", "mediatype", "number", "regex"]
 
 INCREASE_LIMIT = 1.1
+IPV4_MAX_LEN = len('255.255.255.255/32')
 '''Request Arguments Class'''
 
 
@@ -177,6 +191,34 @@ class RequestArguments:
             )
         )
 
+    def get_cache_key(self) -> str:
+        """
+        Returns a key of the EDL of the request arguments: request arguments which produce the same EDL (for
+        example, which differ only in options of other formats) have the same key.
+        """
+        canonical_args = {
+            'query': self.query,
+            'out_format': self.out_format,
+            'limit': self.limit,
+            'offset': self.offset,
+            'fields_to_present': self.fields_to_present,
+            'url_port_stripping': bool(self.url_port_stripping),
+            'url_protocol_stripping': bool(self.url_protocol_stripping),
+            'url_truncate': bool(self.url_truncate),
+            'add_comment_if_empty': bool(self.add_comment_if_empty),
+        }
+        if self.out_format == FORMAT_TEXT:
+            canonical_args['drop_invalids'] = bool(self.drop_invalids)
+            canonical_args['collapse_ips'] = self.collapse_ips
+        elif self.out_format == FORMAT_CSV:
+            canonical_args['csv_text'] = bool(self.csv_text)
+        elif self.out_format == FORMAT_MWG:
+            canonical_args['mwg_type'] = self.mwg_type
+        elif self.out_format == FORMAT_PROXYSG:
+            canonical_args['category_default'] = self.category_default
+            canonical_args['category_attribute'] = sorted(self.category_attribute)
+        return json.dumps(canonical_args, sort_keys=True)
+
     def get_fields_to_present(self, fields_to_present: str) -> str:
         # based on func ToIoC https://github.com/demisto/server/blob/master/domain/insight.go
 
@@ -205,6 +247,112 @@ class RequestArguments:
         return fields_for_format.get(self.out_format, self.FILTER_FIELDS_ON_FORMAT_TEXT)
 
 
+class EDLSnapshot:
+    """An EDL which was built to a file, with the metadata of its response"""
+
+    def __init__(self, request_args: RequestArguments, path: str, etag: str, created: datetime, query_time: float,
+                 edl_size: int, content_length: int, ttl: Optional[int] = None):
+        self.request_args = request_args
+        self.path = path
+        self.etag = etag
+        self.created = created
+        self.query_time = query_time
+        self.edl_size = edl_size
+        self.content_length = content_length
+        self.ttl = ttl
+        self.last_access = time.time()
+
+    def is_expired(self) -> bool:
+        return self.ttl is not None and (datetime.now(timezone.utc) - self.created).total_seconds() > self.ttl
+
+    def delete(self):
+        try:
+            os.remove(self.path)
+        except OSError as e:
+            demisto.debug(f'Failed deleting the EDL snapshot file {self.path}: {e}')
+
+
+class EDLSnapshotCache:
+    """
+    A bounded LRU cache of EDL snapshots, keyed by the cache key of their request arguments.
+    The least recently used snapshots are evicted when there are more than max_variants snapshots, or when the total
+    size of the snapshot files is more than max_size bytes.
+    """
+
+    def __init__(self, max_variants: int = EDL_CACHE_MAX_VARIANTS, max_size: int = EDL_CACHE_MAX_SIZE):
+        self.max_variants = max_variants
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._snapshots: OrderedDict = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    def snapshots(self) -> List[EDLSnapshot]:
+        with self._lock:
+            return list(self._snapshots.values())
+
+    def open(self, key: str) -> Optional[Tuple[EDLSnapshot, IO[bytes]]]:
+        """
+        Gets the snapshot of the key if it is cached and not expired, and opens its file.
+        The file is opened while holding the lock, so the snapshot can not be deleted before it is opened.
+        """
+        opened_snapshot = None
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot and not snapshot.is_expired():
+                self._snapshots.move_to_end(key)
+                snapshot.last_access = time.time()
+                opened_snapshot = snapshot, open(snapshot.path, 'rb')
+                self.hits += 1
+            else:
+                self.misses += 1
+        demisto.debug(f'EDL cache {"hit" if opened_snapshot else "miss"} for the request arguments: {key}.'
+                      f' hits: {self.hits}, misses: {self.misses}, cached variants: {len(self._snapshots)}')
+        return opened_snapshot
+
+    def put(self, key: str, snapshot: EDLSnapshot, last_access: Optional[float] = None):
+        """
+        Caches the snapshot, replacing the previous snapshot of the key, and evicts the least recently used snapshots
+        if the cache is full. Responses which already opened a deleted snapshot file can still read it.
+        """
+        with self._lock:
+            prev_snapshot = self._snapshots.pop(key, None)
+            if prev_snapshot:
+                snapshot.last_access = last_access or prev_snapshot.last_access
+                self._remove(prev_snapshot)
+            self._snapshots[key] = snapshot
+            self._size += snapshot.content_length
+            while len(self._snapshots) > 1 and (len(self._snapshots) > self.max_variants or self._size > self.max_size):
+                evicted_key, evicted_snapshot = self._snapshots.popitem(last=False)
+                demisto.debug(f'Evicting the EDL snapshot of the request arguments: {evicted_key}')
+                self._remove(evicted_snapshot)
+
+    def evict_idle(self, max_idle: float):
+        """Evicts the snapshots which were not requested in the last max_idle seconds"""
+        with self._lock:
+            for key, snapshot in list(self._snapshots.items()):
+                if time.time() - snapshot.last_access > max_idle:
+                    demisto.debug(f'Evicting the idle EDL snapshot of the request arguments: {key}')
+                    self._remove(self._snapshots.pop(key))
+
+    def clear(self):
+        with self._lock:
+            for snapshot in self._snapshots.values():
+                self._remove(snapshot)
+            self._snapshots.clear()
+
+    def _remove(self, snapshot: EDLSnapshot):
+        self._size -= snapshot.content_length
+        snapshot.delete()
+
+
+EDL_SNAPSHOTS = EDLSnapshotCache()
+
+
 ''' HELPER FUNCTIONS '''
 
 
@@ -222,14 +370,32 @@ def iterable_to_str(iterable: Iterable, delimiter: str = '\n') -> str:
     return str_res
 
 
-def create_new_edl(request_args: RequestArguments) -> str:
+def iter_chunks(lines: Iterable[str], chunk_size: int = EDL_SNAPSHOT_CHUNK_SIZE) -> Iterator[str]:
     """
-    Gets indicators from XSOAR server using IndicatorsSearcher and formats them
+    Joins the lines to chunks of about chunk_size characters
+    """
+    chunk: List[str] = []
+    size = 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield ''.join(chunk)
+
+
+def iter_new_edl(request_args: RequestArguments) -> Iterator[str]:
+    """
+    Gets indicators from XSOAR server using IndicatorsSearcher and formats them, without holding the whole EDL in
+    memory
 
     Parameters:
         request_args: Request arguments
 
-    Returns: Formatted indicators to display in EDL
+    Returns: Chunks of the formatted indicators to display in EDL
     """
     limit = request_args.offset + request_args.limit
     indicator_searcher = IndicatorsSearcher(
@@ -238,27 +404,34 @@ def create_new_edl(request_args: RequestArguments) -> str:
         size=PAGE_SIZE,
         limit=limit
     )
-    formatted_indicators = ''
     if request_args.out_format == FORMAT_TEXT:
         if request_args.drop_invalids or request_args.collapse_ips != "Don't Collapse":
             # Because there may be illegal indicators or they may turn into cider, the limit is increased
             indicator_searcher.limit = int(limit * INCREASE_LIMIT)
         new_iocs_file = get_indicators_to_format(indicator_searcher, request_args)
-        # we collect first all indicators because we ned all ips to collapse_ips
-        new_iocs_file = create_text_out_format(new_iocs_file, request_args)
         new_iocs_file.seek(0)
-        for count, line in enumerate(new_iocs_file):
-            # continue searching iocs if 1) iocs was truncated or 2) got all available iocs
-            if count + 1 > limit:
-                break
-            else:
-                formatted_indicators += line
+        # continue searching iocs if 1) iocs was truncated or 2) got all available iocs
+        edl_chunks = iter_chunks(islice(new_iocs_file, limit))
     else:
         new_iocs_file = get_indicators_to_format(indicator_searcher, request_args)
         new_iocs_file.seek(0)
-        formatted_indicators = new_iocs_file.read()
-    new_iocs_file.close()
-    return formatted_indicators
+        edl_chunks = iter(partial(new_iocs_file.read, EDL_SNAPSHOT_CHUNK_SIZE), '')
+    try:
+        yield from edl_chunks
+    finally:
+        new_iocs_file.close()
+
+
+def create_new_edl(request_args: RequestArguments) -> str:
+    """
+    Gets indicators from XSOAR server using IndicatorsSearcher and formats them
+
+    Parameters:
+        request_args: Request arguments
+
+    Returns: Formatted indicators to display in EDL
+    """
+    return ''.join(iter_new_edl(request_args))
 
 
 def replace_field_name_to_output_format(fields: str):
@@ -290,6 +463,8 @@ def get_indicators_to_format(indicator_searcher: IndicatorsSearcher, request_arg
     list_fields = replace_field_name_to_output_format(request_args.fields_to_present)
     headers_was_writen = False
     files_by_category = {}  # type:Dict
+    ipv4_indicators = set()  # type:Set[str]
+    ipv6_indicators = set()  # type:Set[str]
     ioc_counter = 0
     try:
         for ioc_res in indicator_searcher:
@@ -308,9 +483,12 @@ def get_indicators_to_format(indicator_searcher: IndicatorsSearcher, request_arg
                     headers_was_writen = True
 
                 elif request_args.out_format == FORMAT_TEXT:
-                    # save only the value and type of each indicator
-                    f.write(str(json.dumps({"value": ioc.get("value"),
-                                            "indicator_type": ioc.get("indicator_type")})) + "\n")
+                    # IPs to collapse are kept aside, as all of them are needed to collapse them
+                    formatted_indicator = create_text_out_format(ioc, request_args, ipv4_indicators,
+                                                                 ipv6_indicators, headers_was_writen)
+                    if formatted_indicator:
+                        f.write(formatted_indicator)
+                        headers_was_writen = True
 
                 elif request_args.out_format == FORMAT_CSV:
                     f.write(create_csv_out_format(headers_was_writen, list_fields, ioc, request_args))
@@ -323,6 +501,12 @@ def get_indicators_to_format(indicator_searcher: IndicatorsSearcher, request_arg
 
     if request_args.out_format == FORMAT_JSON:
         f.write(']')
+    elif request_args.out_format == FORMAT_TEXT:
+        for ip_indicators in (ipv4_indicators, ipv6_indicators):
+            collapsed_ips = create_collapsed_ips_out_format(ip_indicators, request_args, headers_was_writen)
+            if collapsed_ips:
+                f.write(collapsed_ips)
+                headers_was_writen = True
     elif request_args.out_format == FORMAT_PROXYSG:
         f = create_proxysg_all_category_out_format(f, files_by_category)
     return f
@@ -523,18 +707,193 @@ def ip_groups_to_ranges(ip_range_groups: Iterable):
     return ip_ranges
 
 
+def parse_ipv4_cidrs(ips: List[str]) -> Tuple[Any, Any, List[str]]:
+    """Parses IPv4 addresses and CIDRs in dotted decimal notation to arrays, in bulk.
+
+    Args:
+        ips (List[str]): a list of IP strings.
+
+    Returns:
+        Tuple. the addresses and the prefix lengths (32 for addresses), and the IPs which were not parsed (like IPv6
+        addresses, invalid IPs, or IPs with leading zeros), which should be parsed one by one.
+    """
+    lengths = np.fromiter(map(len, ips), np.int64, len(ips))
+    candidates = lengths <= IPV4_MAX_LEN
+    candidate_ips = list(compress(ips, candidates))
+    try:
+        chars = np.array(candidate_ips, dtype=f'S{IPV4_MAX_LEN}').view(np.uint8).reshape(-1, IPV4_MAX_LEN)
+    except UnicodeEncodeError:
+        candidates[candidates] = [ip.isascii() for ip in candidate_ips]
+        candidate_ips = list(compress(ips, candidates))
+        chars = np.array(candidate_ips, dtype=f'S{IPV4_MAX_LEN}').view(np.uint8).reshape(-1, IPV4_MAX_LEN)
+
+    count = len(candidate_ips)
+    valid = np.ones(count, dtype=bool)
+    done = np.zeros(count, dtype=bool)
+    addresses = np.zeros(count, dtype=np.int64)
+    prefixes = np.full(count, 32, dtype=np.int64)
+    part = np.zeros(count, dtype=np.int64)  # the value of the current octet (or of the prefix length)
+    part_digits = np.zeros(count, dtype=np.int64)
+    part_leading_zero = np.zeros(count, dtype=bool)
+    separators = np.zeros(count, dtype=np.int64)  # the number of dots, plus 4 after the slash
+    # parse the strings column by column, the padding after the end of a string is 0
+    for column in range(IPV4_MAX_LEN + 1):
+        char = chars[:, column] if column < IPV4_MAX_LEN else np.zeros(count, dtype=np.uint8)
+        is_digit = (char >= ord('0')) & (char <= ord('9')) & ~done
+        is_dot = (char == ord('.')) & ~done
+        is_slash = (char == ord('/')) & ~done
+        is_end = (char == 0) & ~done
+        valid &= is_digit | is_dot | is_slash | is_end | done
+        # octets and prefix lengths with leading zeros are parsed one by one
+        part_leading_zero |= is_digit & (part_digits == 1) & (part == 0)
+        part = np.where(is_digit, part * 10 + char - ord('0'), part)
+        part_digits += is_digit
+
+        ends_part = is_dot | is_slash | is_end
+        valid &= ~ends_part | ((part_digits > 0) & (part_digits <= 3) & ~part_leading_zero)
+        is_octet = ends_part & (separators < 4)
+        valid &= ~is_octet | (part <= 255)
+        addresses = np.where(is_octet, addresses * 256 + part, addresses)
+        is_prefix = is_end & (separators > 4)
+        valid &= ~is_prefix | (part <= 32)
+        prefixes = np.where(is_prefix, part, prefixes)
+        valid &= ~(is_dot & (separators >= 3)) & ~(is_slash & (separators != 3)) & ~(is_end & (separators < 3))
+        separators += is_dot + 4 * is_slash
+        part = np.where(ends_part, 0, part)
+        part_digits = np.where(ends_part, 0, part_digits)
+        part_leading_zero &= ~ends_part
+        done |= is_end
+
+    candidates[candidates] = valid
+    return addresses[valid], prefixes[valid], list(compress(ips, ~candidates))
+
+
+def collapse_ipv4_ranges(first_addresses: Any, last_addresses: Any) -> Tuple[Any, Any, Any]:
+    """Merges overlapping and adjacent IPv4 ranges.
+
+    Args:
+        first_addresses (np.ndarray): the first addresses of the ranges.
+        last_addresses (np.ndarray): the last addresses of the ranges.
+
+    Returns:
+        Tuple. the first and last addresses of the merged ranges (sorted), and for each merged range the index of
+        its range if it was not merged with other ranges (-1 otherwise).
+    """
+    order = np.argsort(first_addresses, kind='stable')
+    first_addresses = first_addresses[order]
+    max_last_addresses = np.maximum.accumulate(last_addresses[order])
+    # a range starts a new merged range if it starts after all the previous ranges end
+    starts_range = np.ones(len(first_addresses), dtype=bool)
+    starts_range[1:] = first_addresses[1:] > max_last_addresses[:-1] + 1
+    range_starts = np.flatnonzero(starts_range)
+    range_ends = np.append(range_starts[1:] - 1, len(first_addresses) - 1)
+    unmerged_ranges = np.where(range_starts == range_ends, order[range_starts], -1)
+    return first_addresses[range_starts], max_last_addresses[range_ends], unmerged_ranges
+
+
+def ipv4_ranges_to_cidrs(first_addresses: Any, last_addresses: Any) -> Tuple[Any, Any, Any]:
+    """Splits IPv4 ranges to the minimal lists of CIDRs which cover them.
+
+    Args:
+        first_addresses (np.ndarray): the first addresses of the ranges.
+        last_addresses (np.ndarray): the last addresses of the ranges.
+
+    Returns:
+        Tuple. the network addresses and the prefix lengths of the CIDRs, and the index of the range of each CIDR.
+    """
+    range_indices = np.arange(len(first_addresses))
+    networks = []
+    prefixes = []
+    cidr_ranges = []
+    while len(first_addresses):
+        # the largest block which is aligned to the first address and fits in the range
+        alignment = np.where(first_addresses == 0, np.int64(1) << 32, first_addresses & -first_addresses)
+        _, range_size_bits = np.frexp((last_addresses - first_addresses + 1).astype(np.float64))
+        block_size = np.minimum(alignment, np.int64(1) << (range_size_bits - 1).astype(np.int64))
+        _, block_size_bits = np.frexp(block_size.astype(np.float64))
+        networks.append(first_addresses)
+        prefixes.append(33 - block_size_bits.astype(np.int64))
+        cidr_ranges.append(range_indices)
+        first_addresses = first_addresses + block_size
+        remaining = first_addresses <= last_addresses
+        first_addresses, last_addresses = first_addresses[remaining], last_addresses[remaining]
+        range_indices = range_indices[remaining]
+    if not networks:
+        return first_addresses, first_addresses, range_indices
+    return np.concatenate(networks), np.concatenate(prefixes), np.concatenate(cidr_ranges)
+
+
+def ipv4_to_str(addresses: Any) -> List[str]:
+    """Formats IPv4 addresses in dotted decimal notation, in bulk.
+
+    Args:
+        addresses (np.ndarray): the addresses.
+
+    Returns:
+        List. the formatted addresses.
+    """
+    if not len(addresses):
+        return []
+    octets = addresses.astype('>u4').view(np.uint8).reshape(-1, 4).astype(np.int64)
+    # each octet is written as 3 digits and a separator, and the leading zeros are dropped
+    chars = np.empty((len(addresses), 4, 4), dtype=np.uint8)
+    keep = np.ones((len(addresses), 4, 4), dtype=bool)
+    chars[:, :, 0] = octets // 100 + ord('0')
+    keep[:, :, 0] = octets >= 100
+    chars[:, :, 1] = octets // 10 % 10 + ord('0')
+    keep[:, :, 1] = octets >= 10
+    chars[:, :, 2] = octets % 10 + ord('0')
+    chars[:, :, 3] = ord('.')
+    chars[:, 3, 3] = ord('\n')
+    return chars[keep].tobytes().decode().split('\n')[:-1]
+
+
+def ipv4_cidrs_to_ranges(addresses: Any, prefixes: Any, collapse_ips: str) -> List[str]:
+    """Collapse IPv4 CIDRs to Ranges or CIDRs, like netaddr.IPSet.
+
+    Args:
+        addresses (np.ndarray): the addresses of the CIDRs (which may have host bits).
+        prefixes (np.ndarray): the prefix lengths of the CIDRs.
+        collapse_ips (str): Whether to collapse to Ranges or CIDRs.
+
+    Returns:
+        List. a list of Ranges or CIDRs.
+    """
+    host_bits = (np.int64(1) << (32 - prefixes)) - 1
+    first_addresses, last_addresses, unmerged_ranges = collapse_ipv4_ranges(addresses & ~host_bits, addresses | host_bits)
+    if collapse_ips == COLLAPSE_TO_RANGES:
+        # single IPs are written without a range
+        return [first if first == last else f'{first}-{last}'
+                for first, last in zip(ipv4_to_str(first_addresses), ipv4_to_str(last_addresses))]
+
+    networks, cidr_prefixes, cidr_ranges = ipv4_ranges_to_cidrs(first_addresses, last_addresses)
+    # like netaddr, a CIDR which was not merged is written as it was given, even if it has host bits
+    cidr_unmerged_ranges = unmerged_ranges[cidr_ranges]
+    is_unmerged = cidr_unmerged_ranges >= 0
+    networks[is_unmerged] = addresses[cidr_unmerged_ranges[is_unmerged]]
+    # CIDR with a single IP appears with "/32" suffix so handle them differently
+    return [network if prefix == 32 else f'{network}/{prefix}'
+            for network, prefix in zip(ipv4_to_str(networks), cidr_prefixes.tolist())]
+
+
 def ips_to_ranges(ips: Iterable, collapse_ips: str):
     """Collapse IPs to Ranges or CIDRs.
+    If NumPy is available, IPv4 addresses and CIDRs are collapsed in bulk.
 
     Args:
         ips (Iterable): a group of IP strings.
         collapse_ips (str): Whether to collapse to Ranges or CIDRs.
 
     Returns:
-        Set. a list to Ranges or CIDRs.
+        List. a list to Ranges or CIDRs.
     """
     invalid_ips = []
     valid_ips = []
+    collapsed_list = []
+
+    if np is not None:
+        ipv4_addresses, ipv4_prefixes, ips = parse_ipv4_cidrs(list(ips))
+        ipv4_cidrs = [(ipv4_addresses, ipv4_prefixes)]
 
     for ip_or_cidr in ips:
         if is_valid_cidr(ip_or_cidr) or is_valid_ip(ip_or_cidr):
@@ -542,14 +901,28 @@ def ips_to_ranges(ips: Iterable, collapse_ips: str):
         else:
             invalid_ips.append(ip_or_cidr)
 
+    if np is not None:
+        # the IPv4 addresses which were not parsed in bulk are collapsed with the parsed ones
+        ipv6_ips = []
+        for ip_or_cidr in valid_ips:
+            network = IPNetwork(ip_or_cidr)
+            if network.version == 4:
+                ipv4_cidrs.append((np.array([network.value]), np.array([network.prefixlen])))
+            else:
+                ipv6_ips.append(network)
+        valid_ips = ipv6_ips
+        ipv4_addresses, ipv4_prefixes = (np.concatenate(arrays).astype(np.int64) for arrays in zip(*ipv4_cidrs))
+        if len(ipv4_addresses):
+            collapsed_list.extend(ipv4_cidrs_to_ranges(ipv4_addresses, ipv4_prefixes, collapse_ips))
+
     if collapse_ips == COLLAPSE_TO_RANGES:
         ips_range_groups = IPSet(valid_ips).iter_ipranges()
-        collapsed_list = ip_groups_to_ranges(ips_range_groups)
+        collapsed_list.extend(ip_groups_to_ranges(ips_range_groups))
     else:
         cidrs = IPSet(valid_ips).iter_cidrs()
-        collapsed_list = ip_groups_to_cidrs(cidrs)
+        collapsed_list.extend(ip_groups_to_cidrs(cidrs))
 
-    collapsed_list.update(invalid_ips)
+    collapsed_list.extend(invalid_ips)
     return collapsed_list
 
 
@@ -602,11 +975,12 @@ def list_to_str(inp_list: list, delimiter: str = ',', map_func: Callable = str)
     return str_res
 
 
-def create_text_out_format(iocs: IO, request_args: RequestArguments) -> Union[IO, IO[str]]:
+def create_text_out_format(ioc: dict, request_args: RequestArguments, ipv4_indicators: Set[str],
+                           ipv6_indicators: Set[str], not_first_call: bool = True) -> str:
     """
-    Create a list in new file of formatted_indicators
+    Formats a single indicator to text format, while the indicators are being fetched
      * IP / CIDR:
-         1) if collapse_ips, collapse IPs/CIDRs
+         1) if collapse_ips, add the IP/CIDR to ipv4_indicators/ipv6_indicators, to be collapsed at the end
      * URL:
         1) if drop_invalids, drop invalids (length > 254 or has invalid chars)
         2) if port_stripping, strip ports
@@ -615,66 +989,60 @@ def create_text_out_format(iocs: IO, request_args: RequestArguments) -> Union[IO
     * Other indicator types:
         1) if drop_invalids, drop invalids (has invalid chars)
         2) if port_stripping, strip ports
-    """
-    ipv4_formatted_indicators = set()
-    ipv6_formatted_indicators = set()
-    iocs.seek(0)
-    formatted_indicators = tempfile.TemporaryFile(mode='w+t')
-    new_line = ''  # For the first time he will not add a new line
-    for str_ioc in iocs:
-        ioc = json.loads(str_ioc.rstrip())
-        indicator = ioc.get('value')
-        if not indicator:
-            continue
-        ioc_type = ioc.get('indicator_type')
-
-        if ioc_type not in [FeedIndicatorType.IP, FeedIndicatorType.IPv6,
-                            FeedIndicatorType.CIDR, FeedIndicatorType.IPv6CIDR]:
 
-            indicator = url_handler(indicator, request_args.url_protocol_stripping,
-                                    request_args.url_port_stripping, request_args.url_truncate)
-
-            if request_args.drop_invalids:
-                if indicator != _PORT_REMOVAL.sub(_URL_WITHOUT_PORT, indicator) or\
-                        indicator != _INVALID_TOKEN_REMOVAL.sub('*', indicator):
-                    # check if the indicator held invalid tokens or port
-                    continue
+    Returns: the formatted lines of the indicator, or an empty string if it was dropped or kept to be collapsed
+    """
+    indicator = ioc.get('value')
+    if not indicator:
+        return ''
+    ioc_type = ioc.get('indicator_type')
+    formatted_lines = []
+
+    if ioc_type not in [FeedIndicatorType.IP, FeedIndicatorType.IPv6,
+                        FeedIndicatorType.CIDR, FeedIndicatorType.IPv6CIDR]:
+
+        indicator = url_handler(indicator, request_args.url_protocol_stripping,
+                                request_args.url_port_stripping, request_args.url_truncate)
+
+        if request_args.drop_invalids:
+            if indicator != _PORT_REMOVAL.sub(_URL_WITHOUT_PORT, indicator) or\
+                    indicator != _INVALID_TOKEN_REMOVAL.sub('*', indicator):
+                # check if the indicator held invalid tokens or port
+                return ''
 
-                if ioc_type == FeedIndicatorType.URL and len(indicator) >= PAN_OS_MAX_URL_LEN:
-                    # URL indicator exceeds allowed length - ignore the indicator
-                    continue
+            if ioc_type == FeedIndicatorType.URL and len(indicator) >= PAN_OS_MAX_URL_LEN:
+                # URL indicator exceeds allowed length - ignore the indicator
+                return ''
 
-            # for PAN-OS *.domain.com does not match domain.com
-            # we should provide both
-            # this could generate more than num entries according to PAGE_SIZE
-            if indicator.startswith('*.'):
-                formatted_indicators.write(new_line + str(indicator.lstrip('*.')))
-                new_line = '\n'
+        # for PAN-OS *.domain.com does not match domain.com
+        # we should provide both
+        # this could generate more than num entries according to PAGE_SIZE
+        if indicator.startswith('*.'):
+            formatted_lines.append(str(indicator.lstrip('*.')))
 
-        if request_args.collapse_ips != DONT_COLLAPSE and ioc_type in (FeedIndicatorType.IP, FeedIndicatorType.CIDR):
-            ipv4_formatted_indicators.add(indicator)
+    if request_args.collapse_ips != DONT_COLLAPSE and ioc_type in (FeedIndicatorType.IP, FeedIndicatorType.CIDR):
+        ipv4_indicators.add(indicator)
 
-        elif request_args.collapse_ips != DONT_COLLAPSE and ioc_type == FeedIndicatorType.IPv6:
-            ipv6_formatted_indicators.add(indicator)
+    elif request_args.collapse_ips != DONT_COLLAPSE and ioc_type == FeedIndicatorType.IPv6:
+        ipv6_indicators.add(indicator)
 
-        else:
-            formatted_indicators.write(new_line + str(indicator))
-            new_line = '\n'
-    iocs.close()
+    else:
+        formatted_lines.append(str(indicator))
 
-    if len(ipv4_formatted_indicators) > 0:
-        ipv4_formatted_indicators = ips_to_ranges(ipv4_formatted_indicators, request_args.collapse_ips)
-        for ip in ipv4_formatted_indicators:
-            formatted_indicators.write(new_line + str(ip))
-            new_line = '\n'
+    if not formatted_lines:
+        return ''
+    return ('\n' if not_first_call else '') + '\n'.join(formatted_lines)
 
-    if len(ipv6_formatted_indicators) > 0:
-        ipv6_formatted_indicators = ips_to_ranges(ipv6_formatted_indicators, request_args.collapse_ips)
-        for ip in ipv6_formatted_indicators:
-            formatted_indicators.write(new_line + str(ip))
-            new_line = '\n'
 
-    return formatted_indicators
+def create_collapsed_ips_out_format(ip_indicators: Set[str], request_args: RequestArguments,
+                                    not_first_call: bool = True) -> str:
+    """
+    Collapses the IPs which were kept aside by create_text_out_format, and formats them to text format
+    """
+    collapsed_ips = ips_to_ranges(ip_indicators, request_args.collapse_ips)
+    if not collapsed_ips:
+        return ''
+    return ('\n' if not_first_call else '') + '\n'.join(map(str, collapsed_ips))
 
 
 def url_handler(indicator: str, url_protocol_stripping: bool, url_port_stripping: bool, url_truncate: bool) -> str:
@@ -711,23 +1079,173 @@ def get_outbound_mimetype(request_args: RequestArguments) -> str:
         return MIMETYPE_TEXT
 
 
+def update_edl_on_demand() -> bool:
+    """
+    If the EDL was requested to update, builds it to the on-demand cache file (and clears the cached EDLs of other
+    request arguments).
+    Returns: Whether the EDL was updated.
+    """
+    ctx = get_integration_context()
+    if EDL_ON_DEMAND_KEY not in ctx:
+        return False
+    ctx.pop(EDL_ON_DEMAND_KEY, None)
+    EDL_SNAPSHOTS.clear()
+    request_args = RequestArguments.from_context_json(ctx)
+    with open(EDL_ON_DEMAND_CACHE_PATH, 'w') as file:
+        file.writelines(iter_new_edl(request_args))
+    set_integration_context(ctx)
+    return True
+
+
 def get_edl_on_demand():
     """
     Use the local file system to store the on-demand result, using a lock to
     limit access to the file from multiple threads.
     """
-    ctx = get_integration_context()
-    if EDL_ON_DEMAND_KEY in ctx:
-        ctx.pop(EDL_ON_DEMAND_KEY, None)
-        request_args = RequestArguments.from_context_json(ctx)
-        edl = create_new_edl(request_args)
-        with open(EDL_ON_DEMAND_CACHE_PATH, 'w') as file:
-            file.write(edl)
-        set_integration_context(ctx)
-    else:
-        with open(EDL_ON_DEMAND_CACHE_PATH, 'r') as file:
-            edl = file.read()
-    return edl
+    update_edl_on_demand()
+    with open(EDL_ON_DEMAND_CACHE_PATH, 'r') as file:
+        return file.read()
+
+
+def iter_formatted_edl(edl_chunks: Iterable[str], request_args: RequestArguments, params: dict) -> Iterator[str]:
+    """
+    Adds the empty list comment, or the strings to prepend and append (for text format), to the chunks of the EDL
+    """
+    edl_chunks = iter(edl_chunks)
+    head = ''
+    # read the first chunks, until it is known whether the EDL is empty
+    for chunk in edl_chunks:
+        head += chunk
+        if len(head) > 1:
+            break
+    if request_args.add_comment_if_empty and head in ('', ']'):
+        yield '# Empty List'
+        return
+    # if the case there are strings to add to the EDL, add them if the output type is text
+    is_text = request_args.out_format == FORMAT_TEXT
+    prepend_str = params.get("prepend_string")
+    if is_text and prepend_str:
+        yield prepend_str.replace("\\n", "\n") + '\n'
+    yield head
+    yield from edl_chunks
+    append_str = params.get("append_string")
+    if is_text and append_str:
+        yield append_str.replace("\\n", "\n")
+
+
+def iter_text_file(path: str) -> Iterator[str]:
+    with open(path, 'r') as file:
+        yield from iter(partial(file.read, EDL_SNAPSHOT_CHUNK_SIZE), '')
+
+
+def create_edl_snapshot(request_args: RequestArguments, params: dict, ttl: Optional[int] = None,
+                        edl_path: Optional[str] = None) -> EDLSnapshot:
+    """
+    Builds the EDL of the request arguments into a new snapshot file, chunk by chunk.
+    If edl_path is given, the snapshot is built from the EDL in the file instead of querying the server.
+    """
+    created = datetime.now(timezone.utc)
+    etag_hash = hashlib.sha1()  # guardrails-disable-line
+    line_breaks = 0
+    is_blank = True
+
+    def hash_edl_chunks(edl_chunks: Iterable[str]) -> Iterator[str]:
+        nonlocal line_breaks, is_blank
+        for edl_chunk in edl_chunks:
+            etag_hash.update(edl_chunk.encode())
+            line_breaks += edl_chunk.count('\n')
+            is_blank = is_blank and not edl_chunk.strip()
+            yield edl_chunk
+
+    edl_chunks = iter_text_file(edl_path) if edl_path else iter_new_edl(request_args)
+    content_length = 0
+    with tempfile.NamedTemporaryFile(mode='wb', prefix='edl_snapshot_', delete=False) as snapshot_file:
+        for chunk in iter_formatted_edl(hash_edl_chunks(edl_chunks), request_args, params):
+            content = chunk.encode()
+            snapshot_file.write(content)
+            content_length += len(content)
+    query_time = (datetime.now(timezone.utc) - created).total_seconds()
+    edl_size = 0 if is_blank else line_breaks + 1  # add 1 as last line doesn't have a \n
+    return EDLSnapshot(request_args, snapshot_file.name, f'"{etag_hash.hexdigest()}"', created, query_time,
+                       edl_size, content_length, ttl)
+
+
+def open_edl_snapshot(request_args: RequestArguments, params: dict, ttl: Optional[int] = None,
+                      edl_path: Optional[str] = None) -> Tuple[EDLSnapshot, IO[bytes]]:
+    """
+    Gets the cached snapshot of the request arguments (and builds it if it is not cached), and opens its file.
+    If edl_path is given, the snapshot of the EDL in the file is cached by its path instead.
+    """
+    key = edl_path or request_args.get_cache_key()
+    opened_snapshot = EDL_SNAPSHOTS.open(key)
+    while not opened_snapshot:
+        EDL_SNAPSHOTS.put(key, create_edl_snapshot(request_args, params, ttl, edl_path))
+        # the snapshot may be evicted by a concurrent put before it is opened
+        opened_snapshot = EDL_SNAPSHOTS.open(key)
+    return opened_snapshot
+
+
+def iter_edl_snapshot(snapshot: EDLSnapshot, snapshot_file: IO[bytes]) -> Iterator[bytes]:
+    """
+    Reads the opened snapshot file in chunks through a memory map, and closes it
+    """
+    try:
+        if snapshot.content_length:
+            with mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as snapshot_map:
+                for offset in range(0, len(snapshot_map), EDL_SNAPSHOT_CHUNK_SIZE):
+                    yield snapshot_map[offset:offset + EDL_SNAPSHOT_CHUNK_SIZE]
+    finally:
+        snapshot_file.close()
+
+
+def refresh_edl_snapshots(params: dict, ttl: Optional[int] = None, max_idle: Optional[float] = None):
+    """
+    Rebuilds the cached snapshots, and the snapshot of the default request arguments.
+    Snapshots which were not requested in the last max_idle seconds are evicted instead.
+    """
+    if max_idle is not None:
+        EDL_SNAPSHOTS.evict_idle(max_idle)
+    snapshots_args = {snapshot.request_args.get_cache_key(): snapshot.request_args
+                      for snapshot in EDL_SNAPSHOTS.snapshots()}
+    default_request_args = get_request_args({}, params)
+    snapshots_args.setdefault(default_request_args.get_cache_key(), default_request_args)
+    for key, request_args in snapshots_args.items():
+        try:
+            EDL_SNAPSHOTS.put(key, create_edl_snapshot(request_args, params, ttl))
+        except Exception as e:
+            demisto.error(f'Failed refreshing the EDL snapshot of the request arguments {key}: {e}')
+
+
+def get_refresh_interval(cache_refresh_rate: str) -> int:
+    """
+    Returns the refresh rate in seconds
+    """
+    return ceil((datetime.now() - dateparser.parse(cache_refresh_rate)).total_seconds())  # type: ignore[operator]
+
+
+def get_snapshot_ttl(refresh_interval: int) -> int:
+    # snapshots are refreshed in the background, the ttl only makes requests rebuild snapshots which failed refreshing
+    return 2 * refresh_interval
+
+
+def refresh_edl_snapshots_loop(params: dict):
+    """
+    Refreshes the EDL snapshots every refresh interval, so requests are served without building the EDL
+    """
+    refresh_interval = get_refresh_interval(params.get('cache_refresh_rate') or '5 minutes')
+    while True:
+        refresh_start = time.time()
+        refresh_edl_snapshots(params, ttl=get_snapshot_ttl(refresh_interval),
+                              max_idle=refresh_interval * EDL_CACHE_MAX_IDLE_REFRESHES)
+        demisto.debug(f'Refreshed the EDL snapshots in {time.time() - refresh_start:.3f} seconds')
+        time.sleep(max(refresh_interval - (time.time() - refresh_start), 0))
+
+
+def start_edl_snapshots_refresh(params: dict):
+    # the refresh thread calls the server while requests are handled
+    support_multithreading()
+    refresh_thread = threading.Thread(target=refresh_edl_snapshots_loop, args=(params,), daemon=True)
+    refresh_thread.start()
 
 
 def validate_basic_authentication(headers: dict, username: str, password: str) -> bool:
@@ -781,36 +1299,33 @@ def route_edl() -> Response:
             ])
 
     request_args = get_request_args(request.args, params)
-    on_demand = params.get('on_demand')
-    created = datetime.now(timezone.utc)
-    edl = get_edl_on_demand() if on_demand else create_new_edl(request_args)
-    etag = f'"{hashlib.sha1(edl.encode()).hexdigest()}"'  # guardrails-disable-line
-    query_time = (datetime.now(timezone.utc) - created).total_seconds()
-    edl_size = 0
-    if edl.strip():
-        edl_size = edl.count('\n') + 1  # add 1 as last line doesn't have a \n
-    if len(edl) == 0 and request_args.add_comment_if_empty or edl == ']' and request_args.add_comment_if_empty:
-        edl = '# Empty List'
-    # if the case there are strings to add to the EDL, add them if the output type is text
-    elif request_args.out_format == FORMAT_TEXT:
-        append_str = params.get("append_string")
-        prepend_str = params.get("prepend_string")
-        if append_str:
-            append_str = append_str.replace("\\n", "\n")
-            edl = f"{edl}{append_str}"
-        if prepend_str:
-            prepend_str = prepend_str.replace("\\n", "\n")
-            edl = f"{prepend_str}\n{edl}"
-    mimetype = get_outbound_mimetype(request_args)
-    max_age = ceil((datetime.now() - dateparser.parse(cache_refresh_rate)).total_seconds())  # type: ignore[operator]
-    demisto.debug(f'Returning edl of size: [{edl_size}], created: [{created}], query time seconds: [{query_time}],'
-                  f' max age: [{max_age}], etag: [{etag}]')
-    resp = Response(edl, status=200, mimetype=mimetype, headers=[
-        ('X-EDL-Created', created.isoformat()),
-        ('X-EDL-Query-Time-Secs', "{:.3f}".format(query_time)),
-        ('X-EDL-Size', str(edl_size)),
-        ('ETag', etag),
-    ])
+    max_age = get_refresh_interval(cache_refresh_rate)
+    if not params.get('on_demand'):
+        return create_edl_snapshot_response(request_args, max_age, params, ttl=get_snapshot_ttl(max_age))
+    # the EDL of the request arguments is cached until the next on-demand update
+    update_edl_on_demand()
+    # without request arguments, the EDL of the last on-demand update is returned
+    edl_path = None if request.args else EDL_ON_DEMAND_CACHE_PATH
+    return create_edl_snapshot_response(request_args, max_age, params, edl_path=edl_path)
+
+
+def create_edl_snapshot_response(request_args: RequestArguments, max_age: int, params: dict,
+                                 ttl: Optional[int] = None, edl_path: Optional[str] = None) -> Response:
+    """
+    Creates a response which streams the EDL snapshot of the request arguments, or a 304 (Not Modified) response
+    if the client already has the snapshot
+    """
+    snapshot, snapshot_file = open_edl_snapshot(request_args, params, ttl, edl_path)
+    demisto.debug(f'Returning edl of size: [{snapshot.edl_size}], created: [{snapshot.created}], query time'
+                  f' seconds: [{snapshot.query_time}], max age: [{max_age}], etag: [{snapshot.etag}]')
+    headers = [
+        ('X-EDL-Created', snapshot.created.isoformat()),
+        ('X-EDL-Query-Time-Secs', "{:.3f}".format(snapshot.query_time)),
+        ('X-EDL-Size', str(snapshot.edl_size)),
+    ]
+    resp = create_streaming_response(iter_edl_snapshot(snapshot, snapshot_file), snapshot.etag,
+                                     mimetype=get_outbound_mimetype(request_args), headers=headers,
+                                     content_length=snapshot.content_length, close=snapshot_file.close)
     resp.cache_control.max_age = max_age
     resp.cache_control[
         'stale-if-error'] = '600'  # number of seconds we are willing to serve stale content when there is an error
@@ -1053,6 +1568,8 @@ def main():
     try:
         initialize_edl_context(params)
         if command == 'long-running-execution':
+            if not params.get('on_demand'):
+                start_edl_snapshots_refresh(params)
             run_long_running(params)
         elif command in commands:
             readable_output, outputs, raw_response = commands[command](demisto.args(), params)
@@ -1,6 +1,7 @@
 """Imports"""
 import json
 import tempfile
+import time
 
 import pytest
 import os
@@ -115,7 +116,7 @@ class TestHelperFunctions:
         tmp_dir = mkdtemp()
         edl.EDL_ON_DEMAND_CACHE_PATH = os.path.join(tmp_dir, 'cache')
         mocker.patch.object(edl, 'get_integration_context', return_value=ctx)
-        mocker.patch.object(edl, 'create_new_edl', return_value=expected_edl)
+        mocker.patch.object(edl, 'iter_new_edl', return_value=iter([expected_edl]))
         actual_edl = edl.get_edl_on_demand()
         with open(edl.EDL_ON_DEMAND_CACHE_PATH, 'r') as f:
             cached_edl = f.read()
@@ -159,16 +160,14 @@ class TestHelperFunctions:
     def test_create_new_edl(self, mocker):
         """Sanity"""
         import EDL as edl
-        f = tempfile.TemporaryFile(mode='w+t')
-        f.write('{"value": "https://google.com", "indicator_type": "URL"}\n'
-                '{"value": "demisto.com:7000", "indicator_type": "URL"}\n'
-                '{"value": "demisto.com/qwertqwertyuioplkjhgfdsazxqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyu'
-                'iopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopyuioplkjhgfdsa'
-                'zxqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwert'
-                'yuiopqwertyuiopqwertyuiopqwertyuiop", "indicator_type": "URL"}\n'
-                '{"value": "demisto.com", "indicator_type": "URL"}')
-
-        mocker.patch.object(edl, 'get_indicators_to_format', return_value=f)
+        mocker.patch.object(demisto, 'searchIndicators', return_value={'iocs': [
+            {"value": "https://google.com", "indicator_type": "URL"},
+            {"value": "demisto.com:7000", "indicator_type": "URL"},
+            {"value": 'demisto.com/qwertqwertyuioplkjhgfdsazxqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyu'
+                      'iopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopyuioplkjhgfdsa'
+                      'zxqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwert'
+                      'yuiopqwertyuiopqwertyuiopqwertyuiop', "indicator_type": "URL"},
+            {"value": "demisto.com", "indicator_type": "URL"}], 'total': 4})
         request_args = edl.RequestArguments(query='', limit=3, url_port_stripping=True, url_protocol_stripping=True,
                                             url_truncate=True)
         edl_vals = edl.create_new_edl(request_args)
@@ -176,7 +175,7 @@ class TestHelperFunctions:
         assert edl_vals == 'google.com\ndemisto.com\ndemisto.com/qwertqwertyuioplkjhgfdsazxqwertyuiopqwertyuiopq' \
                            'wertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwert' \
                            'yuiopqwertyuiopqwertyuiopyuioplkjhgfdsazxqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwe' \
-                           'rtyuiopqwertyuiopqwertyuiop\n'
+                           'rtyuiopqwertyuiopqwertyuiop'
         f = tempfile.TemporaryFile(mode='w+t')
         f.write('{"value": "https://google.com", "indicator_type": "URL"}\n'
                 '{"value": "demisto.com:7000", "indicator_type": "URL"}\n'
@@ -385,6 +384,27 @@ class TestHelperFunctions:
         assert "1.1.1.1" in ip_range_list
         assert "doesntwork/oh" in ip_range_list
 
+    @pytest.mark.parametrize('collapse_ips', ['To Ranges', 'To CIDRS'])
+    def test_ips_to_ranges_without_numpy(self, mocker, collapse_ips):
+        """
+        Given:
+          - IPv4 and IPv6 addresses and CIDRs, CIDRs with host bits, IPs with leading zeros, and invalid IPs
+        When:
+          - collapsing the IPs with NumPy, and without NumPy (with netaddr only)
+        Then:
+          - the IPs are collapsed the same way
+        """
+        import EDL as edl
+        ip_list = ["1.1.1.1", "1.1.1.2", "1.1.1.3", "10.0.0.1/8", "1.2.3.4/24", "1.2.3.0/255.255.255.0",
+                   "01.2.3.4", "255.255.255.255", "255.255.255.254/31", "0.0.0.0", "2001:db8::/127", "2001:db8::2",
+                   "::1", "1.1.1.1/33", "doesntwork/oh"]
+        ip_list += [f'2.2.{i // 256}.{i % 256}' for i in range(0, 2000, 3)] + [f'3.3.{i}.0/25' for i in range(200)]
+        collapsed_list = edl.ips_to_ranges(ip_list, collapse_ips)
+        mocker.patch.object(edl, 'np', None)
+
+        assert sorted(collapsed_list) == sorted(edl.ips_to_ranges(ip_list, collapse_ips))
+        assert ("10.0.0.1/8" in collapsed_list) == (collapse_ips == edl.COLLAPSE_TO_CIDR)
+
     def test_is_valid_ip_ipv4(self):
         from EDL import is_valid_ip
         ip = '1.1.1.1'
@@ -677,8 +697,262 @@ def test_get_indicators_to_format_text():
     request_args = edl.RequestArguments(out_format='PAN-OS (text)', query='', limit=3, url_port_stripping=True,
                                         url_protocol_stripping=True, url_truncate=True)
     f = get_indicators_to_format(indicator_searcher, request_args)
-    f = edl.create_text_out_format(f, request_args)
-
     f.seek(0)
     indicators = f.read()
     assert indicators == 'google.com\ndemisto.com\ndemisto.com/qwertqwer\ndemisto.com'
+
+
+def test_get_indicators_to_format_text_collapse_ips(mocker):
+    """
+    Given:
+      - IndicatorsSearcher with IPs, and with indicators which are dropped or duplicated
+      - request_args with collapse_ips and drop_invalids
+    When:
+      - request indicators on text format
+    Then:
+      - assert the indicators are formatted in a single pass, and the IPs are collapsed at the end
+    """
+    import EDL as edl
+    indicator_searcher = IndicatorsSearcher(3)
+    indicator_searcher.ioc = [{'iocs': [{"value": "1.1.1.1", "indicator_type": "IP"},
+                                        {"value": "*.demisto.com", "indicator_type": "Domain"}]},
+                              {'iocs': [{"value": "1.1.1.2", "indicator_type": "IP"},
+                                        {"value": "demisto.com:7000", "indicator_type": "URL"}]},
+                              {'iocs': [{"value": "", "indicator_type": "URL"},
+                                        {"value": "2001:db8::1", "indicator_type": "IPv6"}]}]
+    mocker.patch.object(IndicatorsSearcher, 'limit', 6)
+    request_args = edl.RequestArguments(query='', limit=6, drop_invalids=True, collapse_ips=edl.COLLAPSE_TO_RANGES)
+    f = get_indicators_to_format(indicator_searcher, request_args)
+    f.seek(0)
+    indicators = f.read()
+    assert indicators == 'demisto.com\n*.demisto.com\n1.1.1.1-1.1.1.2\n2001:db8::1'
+
+
+def test_create_collapsed_ips_out_format_empty():
+    """
+    Given:
+      - No IPs to collapse
+    When:
+      - formatting the collapsed IPs after other indicators were written
+    Then:
+      - nothing is written, not even the new line separator
+    """
+    import EDL as edl
+    request_args = edl.RequestArguments(query='', collapse_ips=edl.COLLAPSE_TO_RANGES)
+    assert edl.create_collapsed_ips_out_format(set(), request_args, not_first_call=True) == ''
+
+
+def test_route_edl_serves_snapshot(mocker):
+    """
+    Given:
+      - EDL requests with the same request arguments, and with different request arguments
+    When:
+      - calling the EDL route
+    Then:
+      - the EDL of each request arguments is built once, and served from its snapshot
+      - a request with the ETag of the snapshot gets a 304 (Not Modified) response
+    """
+    import EDL as edl
+    mocker.patch.object(edl, 'EDL_SNAPSHOTS', edl.EDLSnapshotCache())
+    mocker.patch.object(demisto, 'params', return_value={'cache_refresh_rate': '5 minutes', 'edl_size': 10,
+                                                         'prepend_string': '# list'})
+    iter_new_edl = mocker.patch.object(edl, 'iter_new_edl', side_effect=[iter(['1.1.1.1\n', '2.2.2.2']),
+                                                                         iter(['1.1.1.1'])])
+    with edl.APP.test_client() as client:
+        first_response = client.get('/')
+        second_response = client.get('/')
+        other_args_response = client.get('/?n=1')
+        not_modified_response = client.get('/', headers={'If-None-Match': first_response.headers['ETag']})
+
+    assert first_response.status_code == second_response.status_code == 200
+    assert first_response.data == second_response.data == b'# list\n1.1.1.1\n2.2.2.2'
+    assert first_response.headers['X-EDL-Size'] == '2'
+    assert first_response.headers['ETag'] == second_response.headers['ETag']
+    assert other_args_response.data == b'# list\n1.1.1.1'
+    assert not_modified_response.status_code == 304
+    assert not_modified_response.data == b''
+    assert iter_new_edl.call_count == 2
+    assert len(edl.EDL_SNAPSHOTS) == 2
+    edl.EDL_SNAPSHOTS.clear()
+
+
+def test_refresh_edl_snapshots(mocker):
+    """
+    Given:
+      - A snapshot of request arguments which were requested
+    When:
+      - refreshing the EDL snapshots
+    Then:
+      - the snapshot, and the snapshot of the default request arguments, are rebuilt
+      - the previous snapshot file is deleted
+    """
+    import EDL as edl
+    mocker.patch.object(edl, 'EDL_SNAPSHOTS', edl.EDLSnapshotCache())
+    params = {'edl_size': 10}
+    request_args = edl.get_request_args({'n': 1}, params)
+    mocker.patch.object(edl, 'iter_new_edl', return_value=iter(['1.1.1.1']))
+    snapshot, snapshot_file = edl.open_edl_snapshot(request_args, params)
+    snapshot_file.close()
+
+    edl.iter_new_edl.side_effect = lambda request_args: iter(['2.2.2.2'])
+    edl.refresh_edl_snapshots(params)
+
+    assert not os.path.exists(snapshot.path)
+    assert len(edl.EDL_SNAPSHOTS) == 2
+    for new_snapshot in edl.EDL_SNAPSHOTS.snapshots():
+        with open(new_snapshot.path) as f:
+            assert f.read() == '2.2.2.2'
+    edl.EDL_SNAPSHOTS.clear()
+
+
+def test_get_cache_key():
+    """
+    Given:
+      - request arguments which differ only in options of another format, or in the values of flags
+      - request arguments with a different limit
+    When:
+      - getting the cache keys of the request arguments
+    Then:
+      - the keys of the request arguments which produce the same EDL are equal
+    """
+    from EDL import RequestArguments, FORMAT_CSV
+    request_args = RequestArguments(query='type:IP', mwg_type='string', drop_invalids=True, csv_text=False)
+    same_request_args = RequestArguments(query='type:IP', mwg_type='ip', drop_invalids='true', csv_text=True)
+    other_request_args = RequestArguments(query='type:IP', limit=5, drop_invalids=True)
+    csv_request_args = RequestArguments(query='type:IP', out_format=FORMAT_CSV, drop_invalids=True)
+    other_csv_request_args = RequestArguments(query='type:IP', out_format=FORMAT_CSV, drop_invalids=False)
+
+    assert request_args.get_cache_key() == same_request_args.get_cache_key()
+    assert request_args.get_cache_key() != other_request_args.get_cache_key()
+    assert request_args.get_cache_key() != csv_request_args.get_cache_key()
+    assert csv_request_args.get_cache_key() == other_csv_request_args.get_cache_key()
+
+
+def test_edl_snapshot_cache_eviction(mocker):
+    """
+    Given:
+      - an EDL snapshot cache with at most 2 variants and 10 bytes
+    When:
+      - caching and requesting snapshots
+    Then:
+      - the least recently used snapshots are evicted when there are too many variants or bytes
+      - expired snapshots are misses, and idle snapshots are evicted
+      - the hits and misses are counted
+    """
+    import EDL as edl
+    cache = edl.EDLSnapshotCache(max_variants=2, max_size=10)
+    mocker.patch.object(edl, 'iter_new_edl', side_effect=lambda request_args: iter([request_args.query]))
+
+    def put(key, ttl=None):
+        cache.put(key, edl.create_edl_snapshot(edl.RequestArguments(query=key), {}, ttl))
+
+    def is_cached(key):
+        opened_snapshot = cache.open(key)
+        if opened_snapshot:
+            opened_snapshot[1].close()
+        return bool(opened_snapshot)
+
+    put('aaa')
+    put('bbb')
+    assert is_cached('aaa')
+    put('ccc')
+    assert not is_cached('bbb')
+    assert is_cached('aaa') and is_cached('ccc')
+    put('dddddddd')
+    assert len(cache) == 1 and is_cached('dddddddd')
+    put('eee', ttl=-1)
+    assert not is_cached('eee')
+    assert (cache.hits, cache.misses) == (4, 2)
+
+    mocker.patch.object(edl.time, 'time', return_value=time.time() + 100)
+    cache.evict_idle(50)
+    assert len(cache) == 0
+
+
+def test_route_edl_on_demand_with_request_args(mocker):
+    """
+    Given:
+      - The EDL is updated on demand only
+    When:
+      - requesting the EDL with request arguments, before and after an on-demand update
+    Then:
+      - the EDL of the request arguments is built once, and is built again after the on-demand update
+      - a request without request arguments gets the EDL of the on-demand update
+    """
+    import EDL as edl
+    mocker.patch.object(edl, 'EDL_SNAPSHOTS', edl.EDLSnapshotCache())
+    mocker.patch.object(edl, 'EDL_ON_DEMAND_CACHE_PATH', os.path.join(mkdtemp(), 'cache'))
+    mocker.patch.object(demisto, 'params', return_value={'cache_refresh_rate': '5 minutes', 'on_demand': True})
+    integration_context = {edl.RequestArguments.CTX_QUERY_KEY: '*'}
+
+    def set_integration_context(ctx):
+        integration_context.clear()
+        integration_context.update(ctx)
+
+    mocker.patch.object(edl, 'get_integration_context', side_effect=lambda: dict(integration_context))
+    mocker.patch.object(edl, 'set_integration_context', side_effect=set_integration_context)
+    iter_new_edl = mocker.patch.object(edl, 'iter_new_edl', side_effect=[iter(['1.1.1.1']), iter(['2.2.2.2']),
+                                                                         iter(['3.3.3.3'])])
+    with edl.APP.test_client() as client:
+        assert client.get('/?n=1').data == b'1.1.1.1'
+        assert client.get('/?n=1').data == b'1.1.1.1'
+        integration_context[edl.EDL_ON_DEMAND_KEY] = True
+        assert client.get('/?n=1').data == b'3.3.3.3'
+        assert client.get('/').data == b'2.2.2.2'
+
+    assert iter_new_edl.call_count == 3
+    edl.EDL_SNAPSHOTS.clear()
+
+
+@pytest.mark.parametrize('edl_chunks, request_args, expected_edl', [
+    ([], {}, '# Empty List'),
+    (['', ']'], {'out_format': 'JSON'}, '# Empty List'),
+    ([], {'add_comment_if_empty': False}, '# list\n\n# end'),
+    (['1.1.1.1\n', '2.2.2.2'], {}, '# list\n1.1.1.1\n2.2.2.2\n# end'),
+    (['[', ']'], {'out_format': 'JSON'}, '[]'),
+])
+def test_iter_formatted_edl(edl_chunks, request_args, expected_edl):
+    """
+    Given:
+      - chunks of an empty EDL, and of EDLs with indicators
+    When:
+      - formatting the EDL chunks, with strings to prepend and append
+    Then:
+      - the empty list comment is returned for an empty EDL, and the strings are added to a text EDL
+    """
+    from EDL import iter_formatted_edl, RequestArguments
+    params = {'prepend_string': '# list', 'append_string': '\\n# end'}
+    edl = ''.join(iter_formatted_edl(edl_chunks, RequestArguments(query='*', **request_args), params))
+    assert edl == expected_edl
+
+
+def test_route_edl_gzip(mocker):
+    """
+    Given:
+      - An EDL request of a client which accepts gzip
+    When:
+      - calling the EDL route
+    Then:
+      - the EDL is streamed compressed with gzip, and has an ETag of its own
+      - a request with the ETag of the compressed EDL gets a 304 (Not Modified) response
+    """
+    import gzip
+    import EDL as edl
+    mocker.patch.object(edl, 'EDL_SNAPSHOTS', edl.EDLSnapshotCache())
+    mocker.patch.object(edl, 'EDL_SNAPSHOT_CHUNK_SIZE', 4)
+    mocker.patch.object(demisto, 'params', return_value={'cache_refresh_rate': '5 minutes', 'edl_size': 10})
+    mocker.patch.object(edl, 'iter_new_edl', return_value=iter(['1.1.1.1\n', '2.2.2.2']))
+    with edl.APP.test_client() as client:
+        response = client.get('/')
+        gzip_response = client.get('/', headers={'Accept-Encoding': 'gzip, deflate'})
+        not_modified_response = client.get('/', headers={'Accept-Encoding': 'gzip',
+                                                         'If-None-Match': gzip_response.headers['ETag']})
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['Content-Length'] == '15'
+    assert gzip_response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in gzip_response.headers
+    assert gzip.decompress(gzip_response.data) == response.data == b'1.1.1.1\n2.2.2.2'
+    assert gzip_response.headers['ETag'] == response.headers['ETag'][:-1] + '-gzip"'
+    assert not_modified_response.status_code == 304
+    edl.EDL_SNAPSHOTS.clear()
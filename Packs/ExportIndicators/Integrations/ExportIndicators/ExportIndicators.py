@@ -7,9 +7,10 @@ import re
 from base64 import b64decode
 from flask import Flask, Response, request
 from netaddr import IPAddress, IPSet
-from typing import Callable, Any, cast, Dict, Tuple
+from typing import Callable, Any, cast, Dict, Iterable, Iterator, Tuple
 from math import ceil
 import dateparser
+import hashlib
 
 ''' GLOBAL VARIABLES '''
 INTEGRATION_NAME: str = 'Export Indicators Service'
@@ -18,6 +19,7 @@ APP: Flask = Flask('demisto-export_iocs')
 CTX_VALUES_KEY: str = 'dmst_export_iocs_values'
 CTX_MIMETYPE_KEY: str = 'dmst_export_iocs_mimetype'
 SEARCH_LOOP_LIMIT: int = 10
+STREAM_CHUNK_SIZE: int = 1024 * 1024
 
 FORMAT_CSV: str = 'csv'
 FORMAT_TEXT: str = 'text'
@@ -180,9 +182,19 @@ def refresh_outbound_context(request_args: RequestArguments, on_demand: bool = F
     Update integration cache only in case of running on demand
     Returns: List(IoCs in output format)
     """
+    return list_to_str(refresh_outbound_lines(request_args, on_demand=on_demand), '\n')
+
+
+def refresh_outbound_lines(request_args: RequestArguments, on_demand: bool = False) -> List[str]:
+    """
+    Refresh the values and format using an indicator_query to call demisto.searchIndicators
+    Update integration cache only in case of running on demand
+    Returns: The lines of the list (IoCs in output format), which are joined only to update the integration cache
+    """
     now = datetime.now()
     # poll indicators into list from demisto
     iocs = []
+    lines: List[str] = []
     out_dict: dict = {}
     limit = request_args.offset + request_args.limit
     indicator_searcher = IndicatorsSearcher(
@@ -198,7 +210,7 @@ def refresh_outbound_context(request_args: RequestArguments, on_demand: bool = F
         iocs += new_iocs
         iocs = sort_iocs(request_args, iocs)
         # reformat the output
-        out_dict, actual_indicator_amount = create_values_for_returned_dict(iocs[request_args.offset:], request_args)
+        lines, actual_indicator_amount = format_indicators(iocs[request_args.offset:], request_args)
         if request_args.out_format in [FORMAT_CSV, FORMAT_XSOAR_CSV]:
             actual_indicator_amount = actual_indicator_amount - 1
         # advance search window with gap size
@@ -222,6 +234,7 @@ def refresh_outbound_context(request_args: RequestArguments, on_demand: bool = F
         out_dict[CTX_MIMETYPE_KEY] = MIMETYPE_TEXT
 
     if on_demand:
+        out_dict[CTX_VALUES_KEY] = list_to_str(lines, '\n')
         set_integration_context({
             "last_output": out_dict,
             'last_run': date_to_timestamp(now),
@@ -240,7 +253,7 @@ def refresh_outbound_context(request_args: RequestArguments, on_demand: bool = F
             'sort_field': request_args.sort_field,
             'sort_order': request_args.sort_order,
         })
-    return out_dict[CTX_VALUES_KEY] if CTX_VALUES_KEY in out_dict else []
+    return lines
 
 
 def find_indicators_with_limit(indicator_searcher: IndicatorsSearcher) -> list:
@@ -318,6 +331,11 @@ def ips_to_ranges(ips: list, collapse_ips: str):
 
 
 def panos_url_formatting(iocs: list, drop_invalids: bool, strip_port: bool):
+    formatted_indicators = format_panos_urls(iocs, drop_invalids, strip_port)
+    return {CTX_VALUES_KEY: list_to_str(formatted_indicators, '\n')}, len(formatted_indicators)
+
+
+def format_panos_urls(iocs: list, drop_invalids: bool, strip_port: bool) -> List[str]:
     formatted_indicators = []  # type:List
     for indicator_data in iocs:
         # only format URLs and Domains
@@ -362,7 +380,7 @@ def panos_url_formatting(iocs: list, drop_invalids: bool, strip_port: bool):
                 formatted_indicators.append(indicator[2:])
 
         formatted_indicators.append(indicator)
-    return {CTX_VALUES_KEY: list_to_str(formatted_indicators, '\n')}, len(formatted_indicators)
+    return formatted_indicators
 
 
 def create_json_out_format(iocs: list):
@@ -458,21 +476,34 @@ def create_values_for_returned_dict(iocs: list, request_args: RequestArguments)
     Create a dictionary for output values using the selected format (json, json-seq, text, csv, McAfee Web Gateway,
     Symantec ProxySG, panosurl)
     """
+    formatted_indicators, num_of_returned_indicators = format_indicators(iocs, request_args)
+    return {CTX_VALUES_KEY: list_to_str(formatted_indicators, '\n')}, num_of_returned_indicators
+
+
+def format_indicators(iocs: list, request_args: RequestArguments) -> Tuple[List[str], int]:
+    """
+    Formats the IoCs using the selected format, into the lines of the list.
+    Formats which are not line based (json, McAfee Web Gateway and Symantec ProxySG) are returned as a single line.
+    Returns: The lines of the list, and the number of returned indicators
+    """
     if request_args.out_format == FORMAT_PANOSURL:
-        return panos_url_formatting(iocs, request_args.drop_invalids, request_args.strip_port)
+        formatted_indicators = format_panos_urls(iocs, request_args.drop_invalids, request_args.strip_port)
+        return formatted_indicators, len(formatted_indicators)
 
     if request_args.out_format == FORMAT_PROXYSG:
-        return create_proxysg_out_format(iocs, request_args.category_attribute, request_args.category_default)
+        returned_dict, num_of_returned_indicators = create_proxysg_out_format(iocs, request_args.category_attribute,
+                                                                              request_args.category_default)
+        return [returned_dict[CTX_VALUES_KEY]], num_of_returned_indicators
 
     if request_args.out_format == FORMAT_MWG:
-        return create_mwg_out_format(iocs, request_args.mwg_type), len(iocs)
+        return [create_mwg_out_format(iocs, request_args.mwg_type)[CTX_VALUES_KEY]], len(iocs)
 
     if request_args.out_format == FORMAT_JSON:
-        return create_json_out_format(iocs), len(iocs)
+        return [create_json_out_format(iocs)[CTX_VALUES_KEY]], len(iocs)
 
     if request_args.out_format == FORMAT_XSOAR_JSON:
         iocs_list = [ioc for ioc in iocs]
-        return {CTX_VALUES_KEY: json.dumps(iocs_list)}, len(iocs)
+        return [json.dumps(iocs_list)], len(iocs)
 
     else:
         ipv4_formatted_indicators = []
@@ -519,7 +550,7 @@ def create_values_for_returned_dict(iocs: list, request_args: RequestArguments)
             ipv6_formatted_indicators = ips_to_ranges(ipv6_formatted_indicators, request_args.collapse_ips)
             formatted_indicators.extend(ipv6_formatted_indicators)
 
-    return {CTX_VALUES_KEY: list_to_str(formatted_indicators, '\n')}, len(formatted_indicators)
+    return formatted_indicators, len(formatted_indicators)
 
 
 def get_outbound_mimetype() -> str:
@@ -529,9 +560,10 @@ def get_outbound_mimetype() -> str:
 
 
 def get_outbound_ioc_values(on_demand, request_args: RequestArguments,
-                            last_update_data=None, cache_refresh_rate=None) -> str:
+                            last_update_data=None, cache_refresh_rate=None) -> List[str]:
     """
-    Get the ioc list to return in the list
+    Get the lines of the ioc list to return in the list.
+    A list which is kept in the integration context is returned as a single line.
     """
     if last_update_data is None:
         last_update_data = {}
@@ -554,13 +586,13 @@ def get_outbound_ioc_values(on_demand, request_args: RequestArguments,
             cache_time, _ = parse_date_range(cache_refresh_rate, to_timestamp=True)
             if last_update <= cache_time or request_args.is_request_change(last_update_data) or \
                     request_args.query != last_query:
-                values_str = refresh_outbound_context(request_args=request_args)
+                return refresh_outbound_lines(request_args=request_args)
             else:
                 values_str = get_ioc_values_str_from_context(request_args=request_args)
         else:
-            values_str = refresh_outbound_context(request_args)
+            return refresh_outbound_lines(request_args)
 
-    return values_str
+    return [values_str] if values_str else []
 
 
 def get_ioc_values_str_from_context(request_args: RequestArguments, iocs=None) -> str:
@@ -583,6 +615,41 @@ def get_ioc_values_str_from_context(request_args: RequestArguments, iocs=None) -
     return returned_dict.get(CTX_VALUES_KEY, '')
 
 
+def iter_encoded_chunks(lines: Iterable[str], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Joins the lines of the list with new lines and encodes them in chunks of about chunk_size characters,
+    so the whole list is never joined or encoded at once. Lines longer than a chunk are sliced.
+    """
+    chunk: List[str] = []
+    chunk_len = 0
+    for index, line in enumerate(lines):
+        if index:
+            chunk.append('\n')
+            chunk_len += 1
+        for offset in range(0, len(line), chunk_size):
+            part = line[offset:offset + chunk_size] if len(line) > chunk_size else line
+            chunk.append(part)
+            chunk_len += len(part)
+            if chunk_len >= chunk_size:
+                yield ''.join(chunk).encode()
+                chunk = []
+                chunk_len = 0
+    if chunk:
+        yield ''.join(chunk).encode()
+
+
+def get_list_etag(chunks: Iterable[bytes]) -> Tuple[str, int]:
+    """
+    Computes the ETag, and the length, of the encoded list chunk by chunk
+    """
+    etag_hash = hashlib.sha1()  # guardrails-disable-line
+    content_length = 0
+    for chunk in chunks:
+        etag_hash.update(chunk)
+        content_length += len(chunk)
+    return f'"{etag_hash.hexdigest()}"', content_length
+
+
 def try_parse_integer(int_to_parse: Any, err_msg: str) -> int:
     """
     Tries to parse an integer, and if fails will throw DemistoException with given err_msg
@@ -718,7 +785,7 @@ def route_list_values() -> Response:
         created = datetime.now(timezone.utc)
         cache_refresh_rate = params.get('cache_refresh_rate')
 
-        values = get_outbound_ioc_values(
+        lines = get_outbound_ioc_values(
             on_demand=params.get('on_demand'),
             last_update_data=get_integration_context(),
             cache_refresh_rate=cache_refresh_rate,
@@ -727,36 +794,44 @@ def route_list_values() -> Response:
         query_time = (datetime.now(timezone.utc) - created).total_seconds()
 
         if not get_integration_context() and params.get('on_demand'):
-            values = 'You are running in On-Demand mode - please run !eis-update command to initialize the ' \
-                     'export process'
+            lines = ['You are running in On-Demand mode - please run !eis-update command to initialize the '
+                     'export process']
 
-        elif not values:
-            values = "No Results Found For the Query"
+        elif not lines:
+            lines = ["No Results Found For the Query"]
 
         # if the case there are strings to add to the EDL, add them if the output type is text
+        append_str = ''
         if request_args.out_format == FORMAT_TEXT:
-            append_str = params.get("append_string")
+            append_str = params.get("append_string") or ''
             prepend_str = params.get("prepend_string")
             if append_str:
                 append_str = append_str.replace("\\n", "\n")
-                values = f"{values}{append_str}"
             if prepend_str:
                 prepend_str = prepend_str.replace("\\n", "\n")
-                values = f"{prepend_str}\n{values}"
+                lines = [prepend_str] + lines
+
+        def iter_list_chunks() -> Iterator[bytes]:
+            # the chunks are encoded from the lines as they are sent, instead of from the whole list
+            yield from iter_encoded_chunks(lines, STREAM_CHUNK_SIZE)
+            if append_str:
+                yield append_str.encode()
 
         mimetype = get_outbound_mimetype()
 
         list_size = 0
-        if values.strip():
-            list_size = values.count('\n') + 1  # add 1 as last line doesn't have a \n
+        if append_str and not append_str.isspace() or any(line and not line.isspace() for line in lines):
+            # add 1 for each line, as the lines are joined with a \n
+            list_size = sum(line.count('\n') + 1 for line in lines) + append_str.count('\n')
+        etag, content_length = get_list_etag(iter_list_chunks())
         max_age = ceil((datetime.now() - dateparser.parse(cache_refresh_rate)).total_seconds())  # type: ignore[operator]
         demisto.debug(f'Returning exported indicators list of size: [{list_size}], created: [{created}], '
-                      f'query time seconds: [{query_time}], max age: [{max_age}]')
-        resp = Response(values, status=200, mimetype=mimetype, headers=[
+                      f'query time seconds: [{query_time}], max age: [{max_age}], etag: [{etag}]')
+        resp = create_streaming_response(iter_list_chunks(), etag, mimetype=mimetype, headers=[
             ('X-ExportIndicators-Created', created.isoformat()),
             ('X-ExportIndicators-Query-Time-Secs', "{:.3f}".format(query_time)),
             ('X-ExportIndicators-Size', str(list_size))
-        ])
+        ], content_length=content_length)
         resp.cache_control.max_age = max_age
         resp.cache_control[
             'stale-if-error'] = '600'  # number of seconds we are willing to serve stale content when there is an error
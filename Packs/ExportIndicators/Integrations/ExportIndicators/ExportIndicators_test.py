@@ -32,7 +32,7 @@ class TestHelperFunctions:
         with open('ExportIndicators_test/TestHelperFunctions/iocs_cache_values_text.json', 'r') as iocs_text_values_f:
             iocs_text_dict = json.loads(iocs_text_values_f.read())
             mocker.patch.object(demisto, 'getIntegrationContext', return_value={"last_output": iocs_text_dict})
-            mocker.patch.object(ei, 'refresh_outbound_context', return_value=iocs_text_dict)
+            mocker.patch.object(ei, 'refresh_outbound_lines', return_value=iocs_text_dict)
             mocker.patch.object(demisto, 'getLastRun', return_value={'last_run': 1578383898000})
             request_args = ei.RequestArguments(query='', out_format='text', limit=50, offset=0)
             ioc_list = ei.get_outbound_ioc_values(
@@ -51,7 +51,7 @@ class TestHelperFunctions:
         with open('ExportIndicators_test/TestHelperFunctions/iocs_cache_values_text.json', 'r') as iocs_text_values_f:
             iocs_text_dict = json.loads(iocs_text_values_f.read())
             mocker.patch.object(demisto, 'getIntegrationContext', return_value={"last_output": iocs_text_dict})
-            mocker.patch.object(ei, 'refresh_outbound_context', return_value=iocs_text_dict)
+            mocker.patch.object(ei, 'refresh_outbound_lines', return_value=iocs_text_dict)
             mocker.patch.object(demisto, 'getLastRun', return_value={'last_run': 1578383898000})
             request_args = ei.RequestArguments(query='', out_format='text', limit=50, offset=0)
             ioc_list = ei.get_outbound_ioc_values(
@@ -73,7 +73,7 @@ class TestHelperFunctions:
                                                                                 "last_limit": 1, "last_offset": 0,
                                                                                 "last_query": "type:ip",
                                                                                 "last_format": "text"})
-            mocker.patch.object(ei, 'refresh_outbound_context', return_value=iocs_text_dict)
+            mocker.patch.object(ei, 'refresh_outbound_lines', return_value=iocs_text_dict)
             mocker.patch.object(demisto, 'getLastRun', return_value={'last_run': 1578383898000})
             request_args = ei.RequestArguments(query='type:ip', out_format='text', limit=50, offset=0)
             ioc_list = ei.get_outbound_ioc_values(
@@ -95,7 +95,7 @@ class TestHelperFunctions:
                                                                                 "last_limit": 50, "last_offset": 1,
                                                                                 "last_query": "type:ip",
                                                                                 "last_format": "text"})
-            mocker.patch.object(ei, 'refresh_outbound_context', return_value=iocs_text_dict)
+            mocker.patch.object(ei, 'refresh_outbound_lines', return_value=iocs_text_dict)
             mocker.patch.object(demisto, 'getLastRun', return_value={'last_run': 1578383898000})
             request_args = ei.RequestArguments(query='type:ip', out_format='text', limit=50, offset=0)
             ioc_list = ei.get_outbound_ioc_values(
@@ -117,7 +117,7 @@ class TestHelperFunctions:
                                                                                 "last_limit": 50, "last_offset": 0,
                                                                                 "last_query": "type:URL",
                                                                                 "last_format": "text"})
-            mocker.patch.object(ei, 'refresh_outbound_context', return_value=iocs_text_dict)
+            mocker.patch.object(ei, 'refresh_outbound_lines', return_value=iocs_text_dict)
             mocker.patch.object(demisto, 'getLastRun', return_value={'last_run': 1578383898000})
             request_args = ei.RequestArguments(query='type:ip', out_format='text', limit=50, offset=0)
             ioc_list = ei.get_outbound_ioc_values(
@@ -555,3 +555,70 @@ class TestHelperFunctions:
             debug_list = [call[0][0] for call in demisto.debug.call_args_list]
             assert 'ExportIndicators - Could not sort IoCs, please verify that you entered the correct field name.\n' \
                    'Field used: invalid_field_name' in debug_list
+
+    def test_route_list_values_streaming(self, mocker):
+        """
+        Given:
+          - A list in the integration context, and strings to prepend and append
+        When:
+          - requesting the list, with and without accepting gzip
+        Then:
+          - the list is streamed in chunks, with its size and ETag, and is compressed with gzip if accepted
+        """
+        import gzip
+        import ExportIndicators as ei
+        mocker.patch.object(ei, 'STREAM_CHUNK_SIZE', 4)
+        mocker.patch.object(demisto, 'params', return_value={'cache_refresh_rate': '1 minute', 'indicators_query': '*',
+                                                             'on_demand': True, 'prepend_string': '# list',
+                                                             'append_string': '\\n# end'})
+        mocker.patch.object(demisto, 'getIntegrationContext',
+                            return_value={'last_output': {ei.CTX_VALUES_KEY: '1.1.1.1\n2.2.2.2'}})
+        with ei.APP.test_client() as client:
+            response = client.get('/')
+            gzip_response = client.get('/', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.data == b'# list\n1.1.1.1\n2.2.2.2\n# end'
+        assert response.headers['X-ExportIndicators-Size'] == '4'
+        assert response.headers['Content-Length'] == str(len(response.data))
+        assert gzip.decompress(gzip_response.data) == response.data
+        assert gzip_response.headers['ETag'] == response.headers['ETag'][:-1] + '-gzip"'
+
+    def test_route_list_values_streaming_from_lines(self, mocker):
+        """
+        Given:
+          - Formatted indicators which are not in the integration context
+        When:
+          - requesting the list
+        Then:
+          - the chunks are encoded from the formatted lines, without joining the whole list
+        """
+        import ExportIndicators as ei
+        mocker.patch.object(ei, 'STREAM_CHUNK_SIZE', 8)
+        mocker.patch.object(demisto, 'params', return_value={'cache_refresh_rate': '1 minute', 'indicators_query': '*'})
+        mocker.patch.object(demisto, 'getIntegrationContext', return_value={})
+        mocker.patch.object(ei, 'refresh_outbound_lines', return_value=['1.1.1.1', '2.2.2.2', '3.3.3.3'])
+        list_to_str = mocker.spy(ei, 'list_to_str')
+        with ei.APP.test_client() as client:
+            response = client.get('/')
+
+        assert response.data == b'1.1.1.1\n2.2.2.2\n3.3.3.3'
+        assert response.headers['X-ExportIndicators-Size'] == '3'
+        assert response.headers['Content-Length'] == str(len(response.data))
+        assert list_to_str.call_count == 0
+
+    @pytest.mark.parametrize('lines, chunk_size, expected_chunks', [
+        (['1.1.1.1', '2.2.2.2', '3.3.3.3'], 8, [b'1.1.1.1\n2.2.2.2', b'\n3.3.3.3']),
+        (['1.1.1.1\n2.2.2.2'], 4, [b'1.1.', b'1.1\n', b'2.2.', b'2.2']),
+        ([], 4, []),
+    ])
+    def test_iter_encoded_chunks(self, lines, chunk_size, expected_chunks):
+        """
+        Given:
+          - The lines of a list, and a chunk size
+        When:
+          - encoding the list in chunks
+        Then:
+          - the lines are joined with new lines, and long lines are sliced to the chunk size
+        """
+        from ExportIndicators import iter_encoded_chunks
+        assert list(iter_encoded_chunks(lines, chunk_size)) == expected_chunks
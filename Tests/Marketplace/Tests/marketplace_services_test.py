@@ -21,7 +21,7 @@ from typing import List, Dict, Optional, Tuple, Any
 from Tests.Marketplace.marketplace_services import Pack, input_to_list, get_valid_bool, convert_price, \
     get_updated_server_version, load_json, \
     store_successful_and_failed_packs_in_ci_artifacts, is_ignored_pack_file, \
-    is_the_only_rn_in_block
+    is_the_only_rn_in_block, ContentItemsCache, StorageTransferExecutor
 from Tests.Marketplace.marketplace_constants import PackStatus, PackFolders, Metadata, GCPConfig, BucketUploadFlow, \
     PACKS_FOLDER, PackTags, BASE_PACK_DEPENDENCY_DICT
 
@@ -1141,7 +1141,7 @@ class TestImagesUpload:
        """
         dummy_build_bucket = mocker.MagicMock()
         dummy_prod_bucket = mocker.MagicMock()
-        blob_name = "content/packs/TestPack/IntegrationName_image.png"
+        blob_name = os.path.join(GCPConfig.BUILD_BASE_PATH, "TestPack", "IntegrationName_image.png")
         dummy_build_bucket.list_blobs.return_value = [Blob(blob_name, dummy_build_bucket)]
         mocker.patch("Tests.Marketplace.marketplace_services.logging")
         dummy_build_bucket.copy_blob.return_value = Blob('copied_blob', dummy_prod_bucket)
@@ -1150,6 +1150,30 @@ class TestImagesUpload:
                                                          GCPConfig.CONTENT_PACKS_PATH, GCPConfig.BUILD_BASE_PATH)
         assert task_status
 
+    def test_copy_integration_images_not_in_build_bucket(self, mocker, dummy_pack):
+        """
+           Given:
+               - Integration images, one of them is missing from the build bucket.
+           When:
+               - Performing copy and upload of all the pack's integration images
+           Then:
+               - Validate that the build bucket is listed once, the existing image is copied and the task fails
+       """
+        dummy_build_bucket = mocker.MagicMock()
+        dummy_prod_bucket = mocker.MagicMock()
+        blob_name = os.path.join(GCPConfig.BUILD_BASE_PATH, "TestPack", "IntegrationName_image.png")
+        dummy_build_bucket.list_blobs.return_value = [Blob(blob_name, dummy_build_bucket)]
+        mocker.patch("Tests.Marketplace.marketplace_services.logging")
+        dummy_build_bucket.copy_blob.return_value = Blob('copied_blob', dummy_prod_bucket)
+        images_data = {"TestPack": {BucketUploadFlow.INTEGRATIONS: [os.path.basename(blob_name),
+                                                                    "MissingName_image.png"]}}
+        task_status = dummy_pack.copy_integration_images(dummy_prod_bucket, dummy_build_bucket, images_data,
+                                                         GCPConfig.CONTENT_PACKS_PATH, GCPConfig.BUILD_BASE_PATH,
+                                                         StorageTransferExecutor(max_workers=2))
+        assert not task_status
+        assert dummy_build_bucket.list_blobs.call_count == 1
+        assert dummy_build_bucket.copy_blob.call_count == 1
+
     def test_copy_author_image(self, mocker, dummy_pack):
         """
            Given:
@@ -2400,3 +2424,167 @@ def create_rn_config_file(rn_dir: str, version: str, data: Dict):
 def create_rn_file(rn_dir: str, version: str, text: str):
     with open(f'{rn_dir}/{version}.md', 'w') as f:
         f.write(text)
+
+
+class TestCollectContentItems:
+    """ Test class for collecting the content items of a pack.
+    """
+
+    @staticmethod
+    def create_pack(pack_path):
+        integrations_path = os.path.join(pack_path, PackFolders.INTEGRATIONS.value)
+        incident_fields_path = os.path.join(pack_path, PackFolders.INCIDENT_FIELDS.value)
+        os.makedirs(integrations_path)
+        os.makedirs(incident_fields_path)
+        with open(os.path.join(integrations_path, 'integration-Test.yml'), 'w') as integration_file:
+            integration_file.write('commonfields:\n  id: Test\ndisplay: Test Integration\ndescription: desc\n'
+                                   'category: Utilities\nfromversion: 6.0.0\nscript:\n  feed: true\n'
+                                   '  script: print("test")\n  commands:\n  - name: test-command\n'
+                                   '    description: command desc\n')
+        with open(os.path.join(incident_fields_path, 'incidentfield-Test.json'), 'w') as incident_field_file:
+            json.dump({'id': 'incident_test', 'name': 'Test', 'type': 'shortText', 'description': 'field desc'},
+                      incident_field_file)
+        return Pack('TestPack', pack_path)
+
+    expected_content_items = {
+        'integration': [{'id': 'Test', 'name': 'Test Integration', 'description': 'desc', 'category': 'Utilities',
+                         'commands': [{'name': 'test-command', 'description': 'command desc'}]}],
+        'incidentfield': [{'id': 'incident_test', 'name': 'Test', 'type': 'shortText', 'description': 'field desc'}],
+    }
+
+    def test_collect_content_items(self, tmp_path):
+        """
+           Given:
+               - A pack with an integration and an incident field.
+           When:
+               - Collecting the content items of the pack.
+           Then:
+               - Ensure the content items, the server min version and the feed flag are collected.
+       """
+        pack = self.create_pack(str(tmp_path / 'TestPack'))
+
+        assert pack.collect_content_items()
+        assert pack._content_items == self.expected_content_items
+        assert pack._server_min_version == '6.0.0'
+        assert pack.is_feed
+
+    @pytest.mark.parametrize('max_workers', [1, 2])
+    def test_collect_content_items_with_cache(self, tmp_path, mocker, max_workers):
+        """
+           Given:
+               - A pack with an integration and an incident field.
+           When:
+               - Collecting the content items of the pack from a content items cache.
+               - Collecting the content items again from a new content items cache with the same cache file.
+           Then:
+               - Ensure the content items are collected as without a cache.
+               - Ensure the content items are not parsed again.
+       """
+        from Tests.Marketplace import marketplace_services
+        cache_path = str(tmp_path / 'content_items_cache.pickle')
+        pack = self.create_pack(str(tmp_path / 'TestPack'))
+
+        content_items_cache = ContentItemsCache(cache_path)
+        content_items_cache.load(pack.get_content_items_files(), max_workers)
+        assert content_items_cache.save()
+        assert pack.collect_content_items(content_items_cache)
+        assert pack._content_items == self.expected_content_items
+
+        load_content_item = mocker.spy(marketplace_services, 'load_content_item')
+        content_items_cache = ContentItemsCache(cache_path)
+        content_items_cache.load(pack.get_content_items_files(), max_workers)
+        assert pack.collect_content_items(content_items_cache)
+        assert pack._content_items == self.expected_content_items
+        assert load_content_item.call_count == 0
+
+
+class TestStorageTransferExecutor:
+    """ Test class for the storage transfers executor.
+
+    """
+
+    class FakeBlob:
+        def __init__(self, name, bucket):
+            self.name = name
+            self.bucket = bucket
+            self.content_type = None
+
+        def upload_from_file(self, file_obj, size=None):
+            self.bucket.uploaded_blobs.append(self.name)
+            self.bucket.blobs[self.name] = file_obj.read(size)
+
+        def compose(self, sources):
+            self.bucket.blobs[self.name] = b''.join(self.bucket.blobs[source.name] for source in sources)
+
+    class FakeBucket:
+        def __init__(self):
+            self.blobs = {}
+            self.uploaded_blobs = []
+
+        def blob(self, name):
+            return TestStorageTransferExecutor.FakeBlob(name, self)
+
+        def delete_blobs(self, blobs, on_error=None):
+            for blob in blobs:
+                self.blobs.pop(blob.name)
+
+    @pytest.mark.parametrize('composite_part_size, expected_parts', [(1024, 10), (100, 32)])
+    def test_upload_file_as_parts(self, tmp_path, composite_part_size, expected_parts):
+        """
+           Given:
+               - A file which is larger than the composite upload threshold.
+           When:
+               - Uploading the file with more than one worker.
+           Then:
+               - Ensure the file is uploaded as parts, up to the number of parts the storage composes.
+               - Ensure the parts are composed into the blob, and deleted.
+       """
+        file_data = os.urandom(10 * 1024)
+        file_path = tmp_path / 'TestPack.zip'
+        file_path.write_bytes(file_data)
+        bucket = self.FakeBucket()
+
+        with StorageTransferExecutor(max_workers=2, composite_upload_threshold=1024,
+                                     composite_part_size=composite_part_size) as storage_executor:
+            uploaded_blob = storage_executor.upload_file(bucket.blob('TestPack/TestPack.zip'), str(file_path)).result()
+
+        assert bucket.blobs == {'TestPack/TestPack.zip': file_data}
+        assert len(bucket.uploaded_blobs) == expected_parts
+        assert uploaded_blob.content_type == 'application/octet-stream'
+
+    def test_upload_file_with_single_worker(self, tmp_path):
+        """
+           Given:
+               - A file which is larger than the composite upload threshold.
+           When:
+               - Uploading the file with a single worker.
+           Then:
+               - Ensure the file is uploaded in the calling thread as a single blob.
+       """
+        file_path = tmp_path / 'TestPack.zip'
+        file_path.write_bytes(b'pack zip')
+        bucket = self.FakeBucket()
+
+        uploaded_zip = StorageTransferExecutor(composite_upload_threshold=1).upload_file(
+            bucket.blob('TestPack/TestPack.zip'), str(file_path))
+
+        assert uploaded_zip.done()
+        assert bucket.blobs == {'TestPack/TestPack.zip': b'pack zip'}
+        assert bucket.uploaded_blobs == ['TestPack/TestPack.zip']
+
+    def test_submit_failure_with_single_worker(self):
+        """
+           Given:
+               - A transfer which fails.
+           When:
+               - Submitting the transfer with a single worker.
+           Then:
+               - Ensure the failure is raised from the result of the transfer, as with more than one worker.
+       """
+        def failing_transfer():
+            raise ValueError('transfer failed')
+
+        transfer = StorageTransferExecutor().submit(failing_transfer)
+
+        with pytest.raises(ValueError, match='transfer failed'):
+            transfer.result()
@@ -607,3 +607,261 @@ class TestUpdatedPrivatePacks:
         private_index_json.get("packs").append({"id": "new_private_pack", "contentCommitHash": "111"})
         mocker.patch('Tests.Marketplace.upload_packs.load_json', return_value=private_index_json)
         assert is_private_packs_updated(public_index_json, index_file_path)
+
+
+class TestProcessPacks:
+    @pytest.mark.parametrize('max_workers', [1, 4])
+    def test_process_packs(self, max_workers):
+        """
+        Scenario: as part of upload packs flow, the packs are prepared and uploaded serially or concurrently.
+
+        Given
+        - packs which are prepared successfully, a pack which fails to be prepared, and a pack which fails to upload.
+
+        When
+        - processing the packs with one worker, and with several workers.
+
+        Then
+        - Ensure the results are yielded by the order of the packs.
+        - Ensure a pack which failed to be prepared is not uploaded.
+        """
+        from Tests.Marketplace.upload_packs import process_packs
+        packs = [f'Pack{i}' for i in range(10)]
+        uploaded_packs = set()
+
+        def prepare_pack(pack):
+            return pack != 'Pack3', pack == 'Pack5'
+
+        def upload_pack(pack):
+            uploaded_packs.add(pack)
+            return pack != 'Pack7', pack == 'Pack8'
+
+        results = list(process_packs(packs, prepare_pack, upload_pack, max_workers))
+
+        assert [result[0] for result in results] == packs
+        assert results[3] == ('Pack3', False, False, False)
+        assert results[5] == ('Pack5', True, True, False)
+        assert results[7] == ('Pack7', False, False, False)
+        assert results[8] == ('Pack8', True, False, True)
+        assert uploaded_packs == set(packs) - {'Pack3'}
+
+
+class TestPreparePack:
+    def test_prepare_pack_metadata_has_images(self, mocker, tmp_path):
+        """
+        Scenario: as part of upload packs flow, the pack is prepared before its zip is uploaded.
+
+        Given
+        - a pack with an author image and an integration image.
+
+        When
+        - preparing the pack.
+
+        Then
+        - Ensure the formatted metadata has the storage paths of the author image and of the integration image.
+        """
+        from Tests.Marketplace import upload_packs
+        from Tests.Marketplace.marketplace_services import Pack
+        pack_path = tmp_path / 'TestPack'
+        pack_path.mkdir()
+        (pack_path / 'pack_metadata.json').write_text(json.dumps({
+            'name': 'Test Pack', 'description': 'description', 'support': 'xsoar', 'currentVersion': '1.0.0',
+            'author': 'Cortex XSOAR', 'categories': [], 'tags': [], 'useCases': [], 'keywords': []}))
+        (pack_path / 'Author_image.png').write_bytes(b'author image')
+        (pack_path / 'TestIntegration_image.png').write_bytes(b'integration image')
+        index_folder_path = tmp_path / 'index'
+        index_folder_path.mkdir()
+        mocker.patch.object(Pack, '_search_for_images', return_value=[{
+            'display_name': 'Test Integration', 'image_path': str(pack_path / 'TestIntegration_image.png'),
+            'integration_path_basename': 'integration-TestIntegration.yml'}])
+        mocker.patch.object(Pack, 'detect_modified', return_value=(True, []))
+        mocker.patch.object(Pack, 'prepare_release_notes', return_value=(True, False))
+        mocker.patch.object(upload_packs, 'sign_and_zip_pack', return_value=True)
+        mocker.patch('Tests.Marketplace.marketplace_services.logging')
+        pack = Pack('TestPack', str(pack_path))
+        assert pack.load_user_metadata()
+
+        task_status, _ = upload_packs.prepare_pack(
+            pack, mocker.MagicMock(), str(index_folder_path), 'current_commit', 'previous_commit', {}, '1',
+            mocker.MagicMock(), {'TestPack': pack}, 'xsoar', 'key', True, mocker.MagicMock(), 'content/packs', [])
+
+        assert task_status
+        with open(pack_path / 'metadata.json') as metadata_file:
+            metadata = json.load(metadata_file)
+        assert metadata['authorImage'].endswith('TestPack/Author_image.png')
+        assert [integration['name'] for integration in metadata['integrations']] == ['Test Integration']
+        assert metadata['integrations'][0]['imagePath'].endswith('TestPack/TestIntegration_image.png')
+
+
+class TestZipCache:
+    @staticmethod
+    def create_pack(pack_path, readme_content='readme', build_number='1'):
+        from Tests.Marketplace.marketplace_services import Pack
+        os.makedirs(os.path.join(pack_path, 'Integrations', 'TestIntegration'))
+        with open(os.path.join(pack_path, 'README.md'), 'w') as readme_file:
+            readme_file.write(readme_content)
+        with open(os.path.join(pack_path, 'Integrations', 'TestIntegration', 'TestIntegration.py'), 'w') as code_file:
+            code_file.write('print("test")')
+        with open(os.path.join(pack_path, Pack.METADATA), 'w') as metadata_file:
+            json.dump({'buildNumber': build_number}, metadata_file)
+        return Pack('TestPack', pack_path)
+
+    @staticmethod
+    def sign_pack(pack, signature_string=None):
+        from Tests.Marketplace.marketplace_services import Pack
+        with open(os.path.join(pack.path, Pack.SIGNATURES), 'w') as signatures_file:
+            signatures_file.write(signature_string)
+        return True
+
+    def test_sign_and_zip_pack_with_zip_cache(self, mocker, tmp_path):
+        """
+        Scenario: as part of upload packs flow, packs whose content was already zipped are not zipped again.
+
+        Given
+        - a pack which was signed and zipped into the zip cache.
+
+        When
+        - signing and zipping a pack with the same content, but with a different metadata or signature key.
+        - signing and zipping a pack with a different content.
+
+        Then
+        - Ensure the cached zip is used, and that only the current metadata and signatures are added to it.
+        - Ensure the pack is zipped again.
+        """
+        from zipfile import ZipFile
+        from Tests.Marketplace.marketplace_services import Pack
+        from Tests.Marketplace.upload_packs import sign_and_zip_pack
+        zip_cache_path = str(tmp_path / 'zip_cache')
+        sign_pack = mocker.patch.object(Pack, 'sign_pack', autospec=True, side_effect=self.sign_pack)
+        zip_pack = mocker.spy(Pack, 'zip_pack')
+
+        pack = self.create_pack(str(tmp_path / 'first' / 'TestPack'))
+        assert sign_and_zip_pack(pack, 'key', zip_cache_path=zip_cache_path)
+        assert sign_pack.call_count == zip_pack.call_count == 1
+        assert len(os.listdir(zip_cache_path)) == 1
+
+        same_pack = self.create_pack(str(tmp_path / 'second' / 'TestPack'), build_number='2')
+        assert sign_and_zip_pack(same_pack, 'other_key', zip_cache_path=zip_cache_path)
+        assert sign_pack.call_count == 2
+        assert zip_pack.call_count == 1
+        assert same_pack.zip_path == str(tmp_path / 'second' / 'TestPack.zip')
+        with ZipFile(pack.zip_path) as zip_file, ZipFile(same_pack.zip_path) as cached_zip_file:
+            assert sorted(zip_file.namelist()) == sorted(cached_zip_file.namelist())
+            assert json.loads(cached_zip_file.read(Pack.METADATA)) == {'buildNumber': '2'}
+            assert cached_zip_file.read(Pack.SIGNATURES) == b'other_key'
+            assert cached_zip_file.read('README.md') == zip_file.read('README.md')
+
+        modified_pack = self.create_pack(str(tmp_path / 'third' / 'TestPack'), readme_content='modified readme')
+        assert sign_and_zip_pack(modified_pack, 'key', zip_cache_path=zip_cache_path)
+        assert sign_pack.call_count == 3
+        assert zip_pack.call_count == 2
+        assert len(os.listdir(zip_cache_path)) == 2
+
+    def test_sign_and_zip_pack_without_zip_cache(self, mocker, tmp_path):
+        """
+        Given
+        - a pack which was already signed and zipped.
+
+        When
+        - signing and zipping the same pack without a zip cache.
+
+        Then
+        - Ensure the pack is signed and zipped again.
+        """
+        from Tests.Marketplace.marketplace_services import Pack
+        from Tests.Marketplace.upload_packs import sign_and_zip_pack
+        sign_pack = mocker.patch.object(Pack, 'sign_pack', return_value=True)
+        load_zip_from_cache = mocker.spy(Pack, 'load_zip_from_cache')
+
+        for pack_dir in ('first', 'second'):
+            assert sign_and_zip_pack(self.create_pack(str(tmp_path / pack_dir / 'TestPack')), 'key')
+
+        assert sign_pack.call_count == 2
+        assert load_zip_from_cache.call_count == 0
+
+
+class TestIndexCache:
+    @staticmethod
+    def create_index(extract_destination_path, index_files):
+        index_folder_path = os.path.join(extract_destination_path, 'index')
+        for file_path, file_content in index_files.items():
+            os.makedirs(os.path.dirname(os.path.join(index_folder_path, file_path)), exist_ok=True)
+            with open(os.path.join(index_folder_path, file_path), 'w') as index_file:
+                index_file.write(file_content)
+        return index_folder_path
+
+    def test_update_index_zip(self, mocker, tmp_path):
+        """
+        Scenario: as part of upload packs flow, the index zip is updated from the downloaded index zip.
+
+        Given
+        - an index zip, and its index folder with a modified file, an added pack, a removed pack, and a file which was
+          written again with the same content.
+
+        When
+        - updating the index zip from the index folder.
+
+        Then
+        - Ensure only the added and modified files are compressed.
+        - Ensure the index zip has the same entries and content as an index zip created from scratch.
+        """
+        import shutil
+        from zipfile import ZipFile
+        from Tests.Marketplace.upload_packs import update_index_zip
+        index_files = {'index.json': '{"revision": "1"}', 'PackA/metadata.json': '{"currentVersion": "1.0.0"}',
+                       'PackA/metadata-1.0.0.json': '{"currentVersion": "1.0.0"}',
+                       'PackB/metadata.json': '{"currentVersion": "2.0.0"}'}
+        index_folder_path = self.create_index(str(tmp_path / 'base'), index_files)
+        base_index_zip_path = shutil.make_archive(index_folder_path, 'zip', str(tmp_path / 'base'), 'index')
+
+        index_files.pop('PackB/metadata.json')
+        index_files.update({'index.json': '{"revision": "2"}', 'PackC/metadata.json': '{"currentVersion": "1.0.0"}'})
+        index_folder_path = self.create_index(str(tmp_path / 'updated'), index_files)
+        expected_index_zip_path = shutil.make_archive(str(tmp_path / 'expected'), 'zip', str(tmp_path / 'updated'),
+                                                      'index')
+        zip_write = mocker.spy(ZipFile, 'write')
+
+        index_zip_path = update_index_zip(index_folder_path, str(tmp_path / 'updated'), base_index_zip_path)
+
+        compressed_files = {os.path.relpath(call.args[1], index_folder_path) for call in zip_write.call_args_list
+                            if os.path.isfile(call.args[1])}
+        assert compressed_files == {'index.json', os.path.join('PackC', 'metadata.json')}
+        with ZipFile(index_zip_path) as index_zip, ZipFile(expected_index_zip_path) as expected_index_zip:
+            assert index_zip.testzip() is None
+            assert sorted(index_zip.namelist()) == sorted(expected_index_zip.namelist())
+            for entry_name in expected_index_zip.namelist():
+                assert index_zip.read(entry_name) == expected_index_zip.read(entry_name)
+
+    def test_download_and_extract_index_with_cache(self, mocker, tmp_path):
+        """
+        Scenario: as part of upload packs flow, the index zip is downloaded only if it is not in the index cache.
+
+        Given
+        - an index zip in the storage.
+
+        When
+        - downloading and extracting the index with an empty index cache.
+        - downloading and extracting the index again with the same index cache.
+
+        Then
+        - Ensure the index zip is downloaded and stored in the cache.
+        - Ensure the index zip is not downloaded again, and the cached index zip is extracted.
+        """
+        import shutil
+        from Tests.Marketplace.upload_packs import download_and_extract_index, calculate_file_md5_hash
+        self.create_index(str(tmp_path / 'storage'), {'index.json': '{}'})
+        index_zip_path = shutil.make_archive(str(tmp_path / 'storage' / 'index'), 'zip', str(tmp_path / 'storage'),
+                                             'index')
+        index_cache_path = str(tmp_path / 'index_cache')
+        storage_bucket = mocker.MagicMock()
+        index_blob = storage_bucket.blob.return_value
+        index_blob.md5_hash = calculate_file_md5_hash(index_zip_path)
+        index_blob.download_to_filename.side_effect = lambda path, **kwargs: shutil.copyfile(index_zip_path, path)
+
+        for extract_destination_path in (str(tmp_path / 'first'), str(tmp_path / 'second')):
+            index_folder_path, _, _ = download_and_extract_index(storage_bucket, extract_destination_path,
+                                                                 'content/packs', index_cache_path)
+            assert os.listdir(index_folder_path) == ['index.json']
+
+        assert index_blob.download_to_filename.call_count == 1
+        assert len(os.listdir(index_cache_path)) == 1
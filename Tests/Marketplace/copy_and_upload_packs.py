@@ -4,13 +4,15 @@ import sys
 import argparse
 import shutil
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from zipfile import ZipFile
 from google.cloud.storage import Blob, Bucket
 
 from Tests.scripts.utils.log_util import install_logging
 from Tests.Marketplace.marketplace_services import init_storage_client, Pack, \
     load_json, store_successful_and_failed_packs_in_ci_artifacts, \
-    get_upload_data
+    get_upload_data, StorageTransferExecutor
 from Tests.Marketplace.marketplace_constants import PackStatus, GCPConfig, BucketUploadFlow, PACKS_FOLDER, \
     PACKS_FULL_PATH, IGNORED_FILES
 from Tests.Marketplace.upload_packs import extract_packs_artifacts, print_packs_summary, get_packs_summary
@@ -277,6 +279,63 @@ def check_if_need_to_upload(pc_successful_packs_dict: dict, pc_failed_packs_dict
         sys.exit(0)
 
 
+def copy_pack(pack: Pack, production_bucket: Bucket, build_bucket: Bucket, production_base_path: str,
+              build_bucket_base_path: str, pc_successful_packs_dict: dict, pc_failed_packs_dict: dict,
+              pc_uploaded_images: dict, storage_executor: StorageTransferExecutor):
+    """
+    Copies the pack images and the pack zip from the build bucket to the production bucket, and sets the pack status.
+
+    Args:
+        pack (Pack): The pack to copy.
+        production_bucket (Bucket): The production bucket.
+        build_bucket (Bucket): The build bucket.
+        production_base_path (str): The target destination of the copy in the production bucket.
+        build_bucket_base_path (str): The path of the build bucket in gcp.
+        pc_successful_packs_dict (dict): The successful packs dict from Prepare Content step.
+        pc_failed_packs_dict (dict): The failed packs dict from Prepare Content step.
+        pc_uploaded_images (dict): The images data dict from Prepare Content step.
+        storage_executor (StorageTransferExecutor): Runs the copies of the blobs.
+
+    """
+    # Indicates whether a pack has failed to upload on Prepare Content step
+    task_status, pack_status = pack.is_failed_to_upload(pc_failed_packs_dict)
+    if task_status:
+        pack.status = pack_status
+        pack.cleanup()
+        return
+
+    task_status = pack.copy_integration_images(
+        production_bucket, build_bucket, pc_uploaded_images, production_base_path, build_bucket_base_path,
+        storage_executor)
+    if not task_status:
+        pack.status = PackStatus.FAILED_IMAGES_UPLOAD.name
+        pack.cleanup()
+        return
+
+    task_status = pack.copy_author_image(
+        production_bucket, build_bucket, pc_uploaded_images, production_base_path, build_bucket_base_path,
+        storage_executor)
+    if not task_status:
+        pack.status = PackStatus.FAILED_AUTHOR_IMAGE_UPLOAD.name
+        pack.cleanup()
+        return
+
+    task_status, skipped_pack_uploading = pack.copy_and_upload_to_storage(
+        production_bucket, build_bucket, pc_successful_packs_dict, production_base_path, build_bucket_base_path,
+        storage_executor)
+    if skipped_pack_uploading:
+        pack.status = PackStatus.PACK_ALREADY_EXISTS.name
+        pack.cleanup()
+        return
+
+    if not task_status:
+        pack.status = PackStatus.FAILED_UPLOADING_PACK.name
+        pack.cleanup()
+        return
+
+    pack.status = PackStatus.SUCCESS.name
+
+
 def options_handler():
     """ Validates and parses script arguments.
 
@@ -310,6 +369,9 @@ def options_handler():
     parser.add_argument('-pbp', '--production_base_path', help="Production base path of the directory to upload to.",
                         required=False)
     parser.add_argument('-mp', '--marketplace', help='marketplace version.', default='xsoar')
+    parser.add_argument('-w', '--max_workers', type=int, default=1,
+                        help="Number of packs which are copied concurrently, and of blobs which are copied "
+                             "concurrently. Default is 1 (serial).")
     # disable-secrets-detection-end
     return parser.parse_args()
 
@@ -327,6 +389,7 @@ def main():
     production_base_path = options.production_base_path
     target_packs = options.pack_names
     marketplace = options.marketplace
+    max_workers = options.max_workers
 
     # Google cloud storage client initialized
     storage_client = init_storage_client(service_account)
@@ -383,41 +446,20 @@ def main():
         packs_for_current_marketplace.append(pack)
 
     # Starting iteration over packs
-    for pack in packs_for_current_marketplace:
-        # Indicates whether a pack has failed to upload on Prepare Content step
-        task_status, pack_status = pack.is_failed_to_upload(pc_failed_packs_dict)
-        if task_status:
-            pack.status = pack_status
-            pack.cleanup()
-            continue
-
-        task_status = pack.copy_integration_images(
-            production_bucket, build_bucket, pc_uploaded_images, production_base_path, build_bucket_base_path)
-        if not task_status:
-            pack.status = PackStatus.FAILED_IMAGES_UPLOAD.name
-            pack.cleanup()
-            continue
-
-        task_status = pack.copy_author_image(
-            production_bucket, build_bucket, pc_uploaded_images, production_base_path, build_bucket_base_path)
-        if not task_status:
-            pack.status = PackStatus.FAILED_AUTHOR_IMAGE_UPLOAD.name
-            pack.cleanup()
-            continue
-
-        task_status, skipped_pack_uploading = pack.copy_and_upload_to_storage(
-            production_bucket, build_bucket, pc_successful_packs_dict, production_base_path, build_bucket_base_path)
-        if skipped_pack_uploading:
-            pack.status = PackStatus.PACK_ALREADY_EXISTS.name
-            pack.cleanup()
-            continue
-
-        if not task_status:
-            pack.status = PackStatus.FAILED_UPLOADING_PACK.name
-            pack.cleanup()
-            continue
-
-        pack.status = PackStatus.SUCCESS.name
+    copy_pack_func = partial(copy_pack, production_bucket=production_bucket, build_bucket=build_bucket,
+                             production_base_path=production_base_path,
+                             build_bucket_base_path=build_bucket_base_path,
+                             pc_successful_packs_dict=pc_successful_packs_dict,
+                             pc_failed_packs_dict=pc_failed_packs_dict, pc_uploaded_images=pc_uploaded_images)
+    with StorageTransferExecutor(max_workers) as storage_executor:
+        if max_workers <= 1:
+            for pack in packs_for_current_marketplace:
+                copy_pack_func(pack, storage_executor=storage_executor)
+        else:
+            logging.info(f"Copying {len(packs_for_current_marketplace)} packs with {max_workers} workers")
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='copy_pack') as pack_executor:
+                list(pack_executor.map(partial(copy_pack_func, storage_executor=storage_executor),
+                                       packs_for_current_marketplace))
 
     # upload core packs json to bucket
     upload_core_packs_config(production_bucket, build_number, extract_destination_path, build_bucket,
@@ -1,20 +1,24 @@
 import base64
 import fnmatch
 import glob
+import hashlib
 import json
 import os
+import pickle
 import re
 import shutil
 import stat
 import subprocess
+import threading
 import urllib.parse
 import warnings
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from distutils.util import strtobool
 
 from packaging.version import Version
 from pathlib import Path
-from typing import Tuple, Any, Union, List, Dict, Optional
+from typing import Tuple, Any, Callable, Union, List, Dict, Optional
 from zipfile import ZipFile, ZIP_DEFLATED
 
 import git
@@ -29,6 +33,10 @@ from Tests.Marketplace.marketplace_constants import PackFolders, Metadata, GCPCo
 from Utils.release_notes_generator import aggregate_release_notes_for_marketplace
 from Tests.scripts.utils import logging_wrapper as logging
 
+SIGNATURE_KEYFILE_LOCK = threading.Lock()
+# the libyaml based loader is used when PyYAML was built with libyaml, as it is much faster than the python loader
+YAML_SAFE_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 
 class Pack(object):
     """ Class that manipulates and manages the upload of pack's artifact and metadata to cloud storage.
@@ -43,6 +51,8 @@ class Pack(object):
         README (str): pack's readme file name.
         METADATA (str): pack's metadata file name, the one that will be deployed to cloud storage.
         USER_METADATA (str); user metadata file name, the one that located in content repo.
+        SIGNATURES (str): pack's signatures file name, created when the pack is signed.
+        ZIP_CACHE_EXCLUDED_FILES (tuple): files which are left out of the cached pack zips, as they change per build.
         EXCLUDE_DIRECTORIES (list): list of directories to excluded before uploading pack zip to storage.
         AUTHOR_IMAGE_NAME (str): author image file name.
         RELEASE_NOTES (str): release notes folder name.
@@ -53,6 +63,8 @@ class Pack(object):
     README = "README.md"
     USER_METADATA = "pack_metadata.json"
     METADATA = "metadata.json"
+    SIGNATURES = "signatures.sf"
+    ZIP_CACHE_EXCLUDED_FILES = (METADATA, SIGNATURES)
     AUTHOR_IMAGE_NAME = "Author_image.png"
     EXCLUDE_DIRECTORIES = [PackFolders.TEST_PLAYBOOKS.value]
     RELEASE_NOTES = "ReleaseNotes"
@@ -779,8 +791,11 @@ class Pack(object):
 
         try:
             if signature_string:
-                with open("keyfile", "wb") as keyfile:
-                    keyfile.write(signature_string.encode())
+                with SIGNATURE_KEYFILE_LOCK:
+                    # packs may be signed concurrently, so the keyfile is not rewritten while it's being read
+                    if not os.path.isfile("keyfile") or Path("keyfile").read_bytes() != signature_string.encode():
+                        with open("keyfile", "wb") as keyfile:
+                            keyfile.write(signature_string.encode())
                 arg = f'./signDirectory {self._pack_path} keyfile base64'
                 signing_process = subprocess.Popen(arg, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
                 output, err = signing_process.communicate()
@@ -799,13 +814,14 @@ class Pack(object):
             return task_status
 
     @staticmethod
-    def zip_folder_items(source_path, source_name, zip_pack_path):
+    def zip_folder_items(source_path, source_name, zip_pack_path, excluded_files=()):
         """
         Zips the source_path
         Args:
             source_path (str): The source path of the folder the items are in.
             zip_pack_path (str): The path to the zip folder.
             source_name (str): The name of the source that should be zipped.
+            excluded_files (Collection[str]): Paths of files, relative to the source_path, which are not zipped.
         """
         task_status = False
         try:
@@ -814,6 +830,8 @@ class Pack(object):
                     for f in files:
                         full_file_path = os.path.join(root, f)
                         relative_file_path = os.path.relpath(full_file_path, source_path)
+                        if relative_file_path in excluded_files:
+                            continue
                         pack_zip.write(filename=full_file_path, arcname=relative_file_path)
 
             task_status = True
@@ -917,7 +935,7 @@ class Pack(object):
         return self.decrypt_pack(encrypted_zip_pack_path, decryption_key)
 
     def zip_pack(self, extract_destination_path="", encryption_key="",
-                 private_artifacts_dir='private_artifacts', secondary_encryption_key=""):
+                 private_artifacts_dir='private_artifacts', secondary_encryption_key="", excluded_files=()):
         """ Zips pack folder.
 
         Returns:
@@ -927,7 +945,7 @@ class Pack(object):
         self._zip_path = f"{self._pack_path}.zip" if not encryption_key else f"{self._pack_path}_not_encrypted.zip"
         source_path = self._pack_path
         source_name = self._pack_name
-        task_status = self.zip_folder_items(source_path, source_name, self._zip_path)
+        task_status = self.zip_folder_items(source_path, source_name, self._zip_path, excluded_files)
         # if failed to zip, skip encryption
         if task_status and encryption_key:
             try:
@@ -940,6 +958,98 @@ class Pack(object):
         final_path_to_zipped_pack = f"{source_path}.zip"
         return task_status, final_path_to_zipped_pack
 
+    def get_zip_cache_key(self, delete_test_playbooks=False):
+        """ Calculates the key of the pack zip in the zip cache.
+
+        The cached zip holds the pack content without the pack metadata, which has build specific fields (build number,
+        commit, download counts), and without the pack signatures. The metadata and the signatures are added to the
+        pack zip on every build, see add_files_to_zip.
+        The key is built from the merkle hash of the pack folder without these files, and the test playbooks flag, so
+        any change in the pack content results in a new key.
+
+        Args:
+            delete_test_playbooks (bool): Whether the test playbooks folder is deleted from the pack.
+
+        Returns:
+            str: the zip cache key of the pack.
+        """
+        cache_key_parts = [calculate_directory_hash(self._pack_path, excluded_files=Pack.ZIP_CACHE_EXCLUDED_FILES),
+                           str(bool(delete_test_playbooks))]
+        return hashlib.sha256('\n'.join(cache_key_parts).encode()).hexdigest()
+
+    def add_files_to_zip(self):
+        """ Adds the pack files which are not in the pack zip yet (such as the metadata and the signatures of a pack zip
+        loaded from the zip cache) to the pack zip.
+
+        Returns:
+            bool: whether the operation succeeded.
+        """
+        task_status = False
+
+        try:
+            with ZipFile(self.zip_path, 'a', ZIP_DEFLATED) as pack_zip:
+                zipped_files = set(pack_zip.namelist())
+                for root, dirs, files in os.walk(self._pack_path, topdown=True):
+                    for f in files:
+                        full_file_path = os.path.join(root, f)
+                        relative_file_path = os.path.relpath(full_file_path, self._pack_path)
+                        if relative_file_path not in zipped_files:
+                            pack_zip.write(filename=full_file_path, arcname=relative_file_path)
+            task_status = True
+        except Exception:
+            logging.exception(f"Failed adding files to {self._pack_name} pack zip")
+        finally:
+            return task_status
+
+    def load_zip_from_cache(self, zip_cache_path, cache_key):
+        """ Copies the cached pack zip to the pack zip path, instead of signing and zipping the pack.
+
+        Args:
+            zip_cache_path (str): full path to the zip cache folder.
+            cache_key (str): the zip cache key of the pack, see get_zip_cache_key.
+
+        Returns:
+            bool: whether the pack zip was found in the cache.
+        """
+        cached_zip_path = os.path.join(zip_cache_path, f"{cache_key}.zip")
+        if not os.path.isfile(cached_zip_path):
+            return False
+
+        try:
+            zip_path = f"{self._pack_path}.zip"
+            shutil.copy(cached_zip_path, zip_path)
+            self._zip_path = zip_path
+            logging.info(f"Loaded {self._pack_name} pack zip from cache")
+            return True
+        except Exception:
+            logging.exception(f"Failed loading {self._pack_name} pack zip from cache")
+            return False
+
+    def save_zip_to_cache(self, zip_cache_path, cache_key):
+        """ Stores the pack zip in the zip cache.
+
+        Args:
+            zip_cache_path (str): full path to the zip cache folder.
+            cache_key (str): the zip cache key of the pack, see get_zip_cache_key.
+
+        Returns:
+            bool: whether the operation succeeded.
+        """
+        task_status = False
+
+        try:
+            os.makedirs(zip_cache_path, exist_ok=True)
+            cached_zip_path = os.path.join(zip_cache_path, f"{cache_key}.zip")
+            # the zip is copied under a temporary name first, so a concurrent reader never sees a partial zip
+            temp_zip_path = f"{cached_zip_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            shutil.copy(self._zip_path, temp_zip_path)
+            os.replace(temp_zip_path, cached_zip_path)
+            task_status = True
+        except Exception:
+            logging.exception(f"Failed saving {self._pack_name} pack zip to cache")
+        finally:
+            return task_status
+
     def detect_modified(self, content_repo, index_folder_path, current_commit_hash, previous_commit_hash):
         """ Detects pack modified files.
 
@@ -1003,7 +1113,8 @@ class Pack(object):
             return task_status, modified_rn_files_paths
 
     def upload_to_storage(self, zip_pack_path, latest_version, storage_bucket, override_pack, storage_base_path,
-                          private_content=False, pack_artifacts_path=None, overridden_upload_path=None):
+                          private_content=False, pack_artifacts_path=None, overridden_upload_path=None,
+                          storage_executor=None):
         """ Manages the upload of pack zip artifact to correct path in cloud storage.
         The zip pack will be uploaded by defaualt to following path: /content/packs/pack_name/pack_latest_version.
         In case that zip pack artifact already exist at constructed path, the upload will be skipped.
@@ -1021,6 +1132,7 @@ class Pack(object):
 
             pack_artifacts_path (str): Path to where we are saving pack artifacts.
             overridden_upload_path (str): If provided, will override version_pack_path calculation and will use this path instead
+            storage_executor (StorageTransferExecutor): Runs the uploads, they run one by one if not given.
 
         Returns:
             bool: whether the operation succeeded.
@@ -1029,6 +1141,7 @@ class Pack(object):
 
         """
         task_status = True
+        storage_executor = storage_executor or StorageTransferExecutor()
 
         try:
             if overridden_upload_path:
@@ -1052,9 +1165,8 @@ class Pack(object):
                 zip_to_upload_full_path = os.path.join(version_pack_path, f"{self._pack_name}.zip")
             blob = storage_bucket.blob(zip_to_upload_full_path)
             blob.cache_control = "no-cache,max-age=0"  # disabling caching for pack blob
+            uploaded_zips = [storage_executor.upload_file(blob, zip_pack_path)]
 
-            with open(zip_pack_path, "rb") as pack_zip:
-                blob.upload_from_file(pack_zip)
             if private_content:
                 secondary_encryption_key_pack_name = f"{self._pack_name}.enc2.zip"
                 secondary_encryption_key_bucket_path = os.path.join(version_pack_path,
@@ -1071,8 +1183,7 @@ class Pack(object):
 
                 blob = storage_bucket.blob(secondary_encryption_key_bucket_path)
                 blob.cache_control = "no-cache,max-age=0"  # disabling caching for pack blob
-                with open(secondary_encryption_key_artifacts_path, "rb") as pack_zip:
-                    blob.upload_from_file(pack_zip)
+                uploaded_zips.append(storage_executor.upload_file(blob, secondary_encryption_key_artifacts_path))
 
                 print(
                     f"Copying {secondary_encryption_key_artifacts_path} to {_pack_artifacts_path}/"
@@ -1080,6 +1191,8 @@ class Pack(object):
                 shutil.copy(secondary_encryption_key_artifacts_path,
                             f'{_pack_artifacts_path}/packs/{self._pack_name}.zip')
 
+            for uploaded_zip in uploaded_zips:
+                uploaded_zip.result()
             self.public_storage_path = blob.public_url
             logging.success(f"Uploaded {self._pack_name} pack to {zip_to_upload_full_path} path.")
 
@@ -1090,7 +1203,7 @@ class Pack(object):
             return task_status, True, None
 
     def copy_and_upload_to_storage(self, production_bucket, build_bucket, successful_packs_dict, storage_base_path,
-                                   build_bucket_base_path):
+                                   build_bucket_base_path, storage_executor=None):
         """ Manages the copy of pack zip artifact from the build bucket to the production bucket.
         The zip pack will be copied to following path: /content/packs/pack_name/pack_latest_version if
         the pack exists in the successful_packs_dict from Prepare content step in Create Instances job.
@@ -1101,6 +1214,7 @@ class Pack(object):
             successful_packs_dict (dict): the dict of all packs were uploaded in prepare content step
             storage_base_path (str): The target destination of the upload in the target bucket.
             build_bucket_base_path (str): The path of the build bucket in gcp.
+            storage_executor (StorageTransferExecutor): Runs the copies, they run in the calling thread if not given.
         Returns:
             bool: Status - whether the operation succeeded.
             bool: Skipped pack - true in case of pack existence at the targeted path and the copy process was skipped,
@@ -1115,6 +1229,7 @@ class Pack(object):
 
         latest_version = successful_packs_dict[self._pack_name][BucketUploadFlow.LATEST_VERSION]
         self._latest_version = latest_version
+        storage_executor = storage_executor or StorageTransferExecutor()
 
         build_version_pack_path = os.path.join(build_bucket_base_path, self._pack_name, latest_version)
 
@@ -1132,12 +1247,13 @@ class Pack(object):
         build_pack_zip_blob = build_bucket.blob(build_pack_zip_path)
 
         try:
-            copied_blob = build_bucket.copy_blob(
-                blob=build_pack_zip_blob, destination_bucket=production_bucket, new_name=prod_pack_zip_path
-            )
-            copied_blob.cache_control = "no-cache,max-age=0"  # disabling caching for pack blob
-            self.public_storage_path = copied_blob.public_url
-            task_status = copied_blob.exists()
+            copied_blob = storage_executor.copy_blob(
+                build_bucket, build_pack_zip_blob, production_bucket, prod_pack_zip_path
+            ).result()
+            task_status = copied_blob is not None
+            if task_status:
+                copied_blob.cache_control = "no-cache,max-age=0"  # disabling caching for pack blob
+                self.public_storage_path = copied_blob.public_url
         except Exception as e:
             pack_suffix = os.path.join(self._pack_name, latest_version, f'{self._pack_name}.zip')
             logging.exception(f"Failed copying {pack_suffix}. Additional Info: {str(e)}")
@@ -1160,13 +1276,14 @@ class Pack(object):
             build_bucket,
             build_bucket_base_path,
             production_bucket,
-            storage_base_path
+            storage_base_path,
+            storage_executor
         )
 
         return task_status, False
 
     def copy_and_upload_dependencies_zip_to_storage(self, build_bucket, build_bucket_base_path, production_bucket,
-                                                    storage_base_path):
+                                                    storage_base_path, storage_executor=None):
         pack_with_deps_name = f'{self._pack_name}_with_dependencies.zip'
         build_pack_with_deps_path = os.path.join(build_bucket_base_path, self._pack_name, pack_with_deps_name)
         existing_bucket_deps_files = [f.name for f in build_bucket.list_blobs(prefix=build_pack_with_deps_path)]
@@ -1176,17 +1293,19 @@ class Pack(object):
             # We upload the pack dependencies zip object taken from the build bucket into the production bucket
             prod_version_pack_deps_zip_path = os.path.join(storage_base_path, self._pack_name, pack_with_deps_name)
             build_pack_deps_zip_blob = build_bucket.blob(build_pack_with_deps_path)
+            storage_executor = storage_executor or StorageTransferExecutor()
 
             try:
-                copied_blob = build_bucket.copy_blob(
-                    blob=build_pack_deps_zip_blob,
-                    destination_bucket=production_bucket,
-                    new_name=prod_version_pack_deps_zip_path
-                )
-                copied_blob.cache_control = "no-cache,max-age=0"  # disabling caching for pack blob
-                self.public_storage_path = copied_blob.public_url
-                dep_task_status = copied_blob.exists()
-                if not dep_task_status:
+                copied_blob = storage_executor.copy_blob(
+                    build_bucket,
+                    build_pack_deps_zip_blob,
+                    production_bucket,
+                    prod_version_pack_deps_zip_path
+                ).result()
+                if copied_blob:
+                    copied_blob.cache_control = "no-cache,max-age=0"  # disabling caching for pack blob
+                    self.public_storage_path = copied_blob.public_url
+                else:
                     logging.error(f"Failed in uploading {self._pack_name} pack with dependencies to production gcs.")
             except Exception as e:
                 pack_deps_zip_suffix = os.path.join(self._pack_name, pack_with_deps_name)
@@ -1554,9 +1673,52 @@ class Pack(object):
 
         return task_status and self.is_changelog_exists()
 
-    def collect_content_items(self):
+    def _iter_content_items_folders(self):
+        """ Iterates over the content items folders inside the pack.
+
+        Yields:
+            str: the content items folder name.
+            str: the parent folder name.
+            list: the name, path and whether it is a yml file, of each of the content items files in the folder.
+        """
+        for root, pack_dirs, pack_files_names in os.walk(self._pack_path, topdown=False):
+            current_directory = root.split(os.path.sep)[-1]
+            parent_directory = root.split(os.path.sep)[-2]
+
+            if parent_directory in [PackFolders.GENERIC_TYPES.value, PackFolders.GENERIC_FIELDS.value]:
+                current_directory = parent_directory
+            elif current_directory in [PackFolders.GENERIC_TYPES.value, PackFolders.GENERIC_FIELDS.value]:
+                continue
+
+            if current_directory in PackFolders.yml_supported_folders():
+                is_yml = True
+            elif current_directory in PackFolders.json_supported_folders():
+                is_yml = False
+            else:
+                yield current_directory, parent_directory, []
+                continue
+
+            content_items_files = [(pack_file_name, os.path.join(root, pack_file_name), is_yml)
+                                   for pack_file_name in pack_files_names
+                                   if pack_file_name.endswith(('.json', '.yml'))]
+            yield current_directory, parent_directory, content_items_files
+
+    def get_content_items_files(self):
+        """ Returns the content items files of the pack.
+
+        Returns:
+            list: the path and whether it is a yml file, of each of the content items files in the pack.
+        """
+        return [(pack_file_path, is_yml) for _, _, content_items_files in self._iter_content_items_folders()
+                for _, pack_file_path, is_yml in content_items_files]
+
+    def collect_content_items(self, content_items_cache=None):
         """ Iterates over content items folders inside pack and collects content items data.
 
+        Args:
+            content_items_cache (ContentItemsCache): the already parsed content items. If not given, the content
+                items are parsed by the pack.
+
         Returns:
             dict: Parsed content items
             .
@@ -1588,22 +1750,9 @@ class Pack(object):
                 PackFolders.JOBS.value: "job",
             }
 
-            for root, pack_dirs, pack_files_names in os.walk(self._pack_path, topdown=False):
-                current_directory = root.split(os.path.sep)[-1]
-                parent_directory = root.split(os.path.sep)[-2]
-
-                if parent_directory in [PackFolders.GENERIC_TYPES.value, PackFolders.GENERIC_FIELDS.value]:
-                    current_directory = parent_directory
-                elif current_directory in [PackFolders.GENERIC_TYPES.value, PackFolders.GENERIC_FIELDS.value]:
-                    continue
-
+            for current_directory, parent_directory, content_items_files in self._iter_content_items_folders():
                 folder_collected_items = []
-                for pack_file_name in pack_files_names:
-                    if not pack_file_name.endswith(('.json', '.yml')):
-                        continue
-
-                    pack_file_path = os.path.join(root, pack_file_name)
-
+                for pack_file_name, pack_file_path, is_yml in content_items_files:
                     # reputation in old format aren't supported in 6.0.0 server version
                     if current_directory == PackFolders.INDICATOR_TYPES.value \
                             and not fnmatch.fnmatch(pack_file_name, 'reputation-*.json'):
@@ -1611,13 +1760,10 @@ class Pack(object):
                         logging.info(f"Deleted pack {pack_file_name} reputation file for {self._pack_name} pack")
                         continue
 
-                    with open(pack_file_path, 'r') as pack_file:
-                        if current_directory in PackFolders.yml_supported_folders():
-                            content_item = yaml.safe_load(pack_file)
-                        elif current_directory in PackFolders.json_supported_folders():
-                            content_item = json.load(pack_file)
-                        else:
-                            continue
+                    if content_items_cache:
+                        content_item = content_items_cache.get(pack_file_path, is_yml)
+                    else:
+                        content_item = load_content_item(pack_file_path, is_yml)
 
                     # check if content item has to version
                     to_version = content_item.get('toversion') or content_item.get('toVersion')
@@ -2278,7 +2424,8 @@ class Pack(object):
             integration_path_basename in unified_integrations
         ])
 
-    def upload_integration_images(self, storage_bucket, storage_base_path, diff_files_list=None, detect_changes=False):
+    def upload_integration_images(self, storage_bucket, storage_base_path, diff_files_list=None, detect_changes=False,
+                                  storage_executor=None):
         """ Uploads pack integrations images to gcs.
 
         The returned result of integration section are defined in issue #19786.
@@ -2288,6 +2435,7 @@ class Pack(object):
             storage_base_path (str): The target destination of the upload in the target bucket.
             detect_changes (bool): Whether to detect changes or upload all images in any case.
             diff_files_list (list): The list of all modified/added files found in the diff
+            storage_executor (StorageTransferExecutor): Runs the uploads, they run one by one if not given.
         Returns:
             bool: whether the operation succeeded.
             list: list of dictionaries with uploaded pack integration images.
@@ -2297,6 +2445,8 @@ class Pack(object):
         integration_images = []
         integration_dirs = []
         unified_integrations = []
+        uploaded_images = []
+        storage_executor = storage_executor or StorageTransferExecutor()
 
         try:
             if detect_changes:
@@ -2330,9 +2480,7 @@ class Pack(object):
                     # upload the image if needed
                     logging.info(f"Uploading image: {image_name} of integration: {image_data.get('display_name')} "
                                  f"from pack: {self._pack_name}")
-                    with open(image_path, "rb") as image_file:
-                        pack_image_blob.upload_from_file(image_file)
-                    self._uploaded_integration_images.append(image_name)
+                    uploaded_images.append((image_name, storage_executor.upload_file(pack_image_blob, image_path)))
 
                 if GCPConfig.USE_GCS_RELATIVE_PATH:
                     image_gcs_path = urllib.parse.quote(
@@ -2350,6 +2498,10 @@ class Pack(object):
                     'imagePath': image_gcs_path
                 })
 
+            for image_name, uploaded_image in uploaded_images:
+                uploaded_image.result()
+                self._uploaded_integration_images.append(image_name)
+
             if self._uploaded_integration_images:
                 logging.info(f"Uploaded {len(self._uploaded_integration_images)} images for {self._pack_name} pack.")
         except Exception as e:
@@ -2360,7 +2512,7 @@ class Pack(object):
             return task_status
 
     def copy_integration_images(self, production_bucket, build_bucket, images_data, storage_base_path,
-                                build_bucket_base_path):
+                                build_bucket_base_path, storage_executor=None):
         """ Copies all pack's integration images from the build bucket to the production bucket
 
         Args:
@@ -2369,6 +2521,7 @@ class Pack(object):
             images_data (dict): The images data structure from Prepare Content step
             storage_base_path (str): The target destination of the upload in the target bucket.
             build_bucket_base_path (str): The path of the build bucket in gcp.
+            storage_executor (StorageTransferExecutor): Runs the copies, they run one by one if not given.
         Returns:
             bool: Whether the operation succeeded.
 
@@ -2377,44 +2530,56 @@ class Pack(object):
         num_copied_images = 0
         err_msg = f"Failed copying {self._pack_name} pack integrations images."
         pc_uploaded_integration_images = images_data.get(self._pack_name, {}).get(BucketUploadFlow.INTEGRATIONS, [])
+        storage_executor = storage_executor or StorageTransferExecutor()
+        build_bucket_pack_path = os.path.join(build_bucket_base_path, self._pack_name)
+        copied_images = []
+
+        if not pc_uploaded_integration_images:
+            logging.info(f"No added/modified integration images were detected in {self._pack_name} pack.")
+            return task_status
+
+        try:
+            # a single listing of the pack folder instead of checking the existence of each image in the build bucket
+            build_bucket_pack_blobs = {blob.name for blob in build_bucket.list_blobs(prefix=build_bucket_pack_path)}
+        except Exception as e:
+            logging.exception(f"{err_msg}. Additional Info: {str(e)}")
+            return False
 
         for image_name in pc_uploaded_integration_images:
-            build_bucket_image_path = os.path.join(build_bucket_base_path, self._pack_name, image_name)
-            build_bucket_image_blob = build_bucket.blob(build_bucket_image_path)
+            build_bucket_image_path = os.path.join(build_bucket_pack_path, image_name)
 
-            if not build_bucket_image_blob.exists():
+            if build_bucket_image_path not in build_bucket_pack_blobs:
                 logging.error(f"Found changed/added integration image {image_name} in content repo but "
                               f"{build_bucket_image_path} does not exist in build bucket")
                 task_status = False
             else:
                 logging.info(f"Copying {self._pack_name} pack integration image: {image_name}")
-                try:
-                    copied_blob = build_bucket.copy_blob(
-                        blob=build_bucket_image_blob, destination_bucket=production_bucket,
-                        new_name=os.path.join(storage_base_path, self._pack_name, image_name)
-                    )
-                    if not copied_blob.exists():
-                        logging.error(f"Copy {self._pack_name} integration image: {build_bucket_image_blob.name} "
-                                      f"blob to {copied_blob.name} blob failed.")
-                        task_status = False
-                    else:
-                        num_copied_images += 1
+                copied_images.append((build_bucket_image_path, storage_executor.copy_blob(
+                    build_bucket, build_bucket.blob(build_bucket_image_path), production_bucket,
+                    os.path.join(storage_base_path, self._pack_name, image_name))))
 
-                except Exception as e:
-                    logging.exception(f"{err_msg}. Additional Info: {str(e)}")
-                    return False
+        for build_bucket_image_path, copied_image in copied_images:
+            try:
+                if not copied_image.result():
+                    logging.error(f"Copy {self._pack_name} integration image: {build_bucket_image_path} "
+                                  f"blob to {production_bucket.name} bucket failed.")
+                    task_status = False
+                else:
+                    num_copied_images += 1
+
+            except Exception as e:
+                logging.exception(f"{err_msg}. Additional Info: {str(e)}")
+                task_status = False
 
         if not task_status:
             logging.error(err_msg)
         else:
-            if num_copied_images == 0:
-                logging.info(f"No added/modified integration images were detected in {self._pack_name} pack.")
-            else:
-                logging.success(f"Copied {num_copied_images} images for {self._pack_name} pack.")
+            logging.success(f"Copied {num_copied_images} images for {self._pack_name} pack.")
 
         return task_status
 
-    def upload_author_image(self, storage_bucket, storage_base_path, diff_files_list=None, detect_changes=False):
+    def upload_author_image(self, storage_bucket, storage_base_path, diff_files_list=None, detect_changes=False,
+                            storage_executor=None):
         """ Uploads pack author image to gcs.
 
         Searches for `Author_image.png` and uploads author image to gcs. In case no such image was found,
@@ -2425,6 +2590,7 @@ class Pack(object):
             storage_base_path (str): the path under the bucket to upload to.
             diff_files_list (list): The list of all modified/added files found in the diff
             detect_changes (bool): Whether to detect changes or upload the author image in any case.
+            storage_executor (StorageTransferExecutor): Runs the upload, it runs in the calling thread if not given.
 
         Returns:
             bool: whether the operation succeeded.
@@ -2433,6 +2599,7 @@ class Pack(object):
         """
         task_status = True
         author_image_storage_path = ""
+        storage_executor = storage_executor or StorageTransferExecutor()
 
         try:
             author_image_path = os.path.join(self._pack_path, Pack.AUTHOR_IMAGE_NAME)  # disable-secrets-detection
@@ -2444,8 +2611,7 @@ class Pack(object):
 
                 if not detect_changes or any(self.is_author_image(file.a_path) for file in diff_files_list):
                     # upload the image if needed
-                    with open(author_image_path, "rb") as author_image_file:
-                        pack_author_image_blob.upload_from_file(author_image_file)
+                    storage_executor.upload_file(pack_author_image_blob, author_image_path).result()
                     self._uploaded_author_image = True
                     logging.success(f"Uploaded successfully {self._pack_name} pack author image")
 
@@ -2478,7 +2644,8 @@ class Pack(object):
             self._author_image = author_image_storage_path
             return task_status
 
-    def copy_author_image(self, production_bucket, build_bucket, images_data, storage_base_path, build_bucket_base_path):
+    def copy_author_image(self, production_bucket, build_bucket, images_data, storage_base_path, build_bucket_base_path,
+                          storage_executor=None):
         """ Copies pack's author image from the build bucket to the production bucket
 
         Searches for `Author_image.png`, In case no such image was found, default Base pack image path is used and
@@ -2490,22 +2657,23 @@ class Pack(object):
             images_data (dict): The images data structure from Prepare Content step
             storage_base_path (str): The target destination of the upload in the target bucket.
             build_bucket_base_path (str): The path of the build bucket in gcp.
+            storage_executor (StorageTransferExecutor): Runs the copy, it runs in the calling thread if not given.
         Returns:
             bool: Whether the operation succeeded.
 
         """
         if images_data.get(self._pack_name, {}).get(BucketUploadFlow.AUTHOR, False):
+            storage_executor = storage_executor or StorageTransferExecutor()
 
             build_author_image_path = os.path.join(build_bucket_base_path, self._pack_name, Pack.AUTHOR_IMAGE_NAME)
             build_author_image_blob = build_bucket.blob(build_author_image_path)
 
             if build_author_image_blob.exists():
                 try:
-                    copied_blob = build_bucket.copy_blob(
-                        blob=build_author_image_blob, destination_bucket=production_bucket,
-                        new_name=os.path.join(storage_base_path, self._pack_name,
-                                              Pack.AUTHOR_IMAGE_NAME))
-                    if not copied_blob.exists():
+                    copied_blob = storage_executor.copy_blob(
+                        build_bucket, build_author_image_blob, production_bucket,
+                        os.path.join(storage_base_path, self._pack_name, Pack.AUTHOR_IMAGE_NAME)).result()
+                    if not copied_blob:
                         logging.error(f"Failed copying {self._pack_name} pack author image.")
                         return False
                     else:
@@ -2889,6 +3057,322 @@ def load_json(file_path: str) -> dict:
         return {}
 
 
+def calculate_directory_hash(directory_path: str, excluded_files: Tuple[str, ...] = ()) -> str:
+    """ Calculates a merkle hash of a directory.
+
+    Every file is hashed by its content, and every directory by the names and hashes of its entries in sorted order,
+    so the result depends only on the directory tree and not on the order of files on disk or their timestamps.
+
+    Args:
+        directory_path (str): full path to the directory.
+        excluded_files (tuple): names of files directly under the directory, which are left out of the hash.
+
+    Returns:
+        str: the sha256 hex digest of the directory tree.
+
+    """
+    directory_hash = hashlib.sha256()
+
+    for entry in sorted(os.scandir(directory_path), key=lambda dir_entry: dir_entry.name):
+        if entry.name in excluded_files:
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            entry_type, entry_hash = 'tree', calculate_directory_hash(entry.path)
+        else:
+            file_hash = hashlib.sha256()
+            with open(entry.path, 'rb') as entry_file:
+                for chunk in iter(lambda: entry_file.read(1024 * 1024), b''):
+                    file_hash.update(chunk)
+            entry_type, entry_hash = 'blob', file_hash.hexdigest()
+        directory_hash.update(f'{entry_type} {entry.name} {entry_hash}\n'.encode())
+
+    return directory_hash.hexdigest()
+
+
+def load_content_item(content_item_path: str, is_yml: bool) -> Any:
+    """ Loads a content item file, without the code of the integration or script.
+
+    The code is most of a unified integration or script file, and it is not used when collecting content items.
+
+    Args:
+        content_item_path (str): full path to the content item file.
+        is_yml (bool): whether the content item is a yml file, otherwise it is a json file.
+
+    Returns:
+        dict: the loaded content item.
+
+    """
+    with open(content_item_path, 'r') as content_item_file:
+        if is_yml:
+            content_item = yaml.load(content_item_file, Loader=YAML_SAFE_LOADER)
+        else:
+            content_item = json.load(content_item_file)
+
+    if isinstance(content_item, dict):
+        script = content_item.get('script')
+        if isinstance(script, dict):
+            script.pop('script', None)
+        elif isinstance(script, str):
+            del content_item['script']
+
+    return content_item
+
+
+def try_load_content_item(content_item_path: str, is_yml: bool) -> Any:
+    """ Loads a content item file, returns None if the file failed to load. """
+    try:
+        return load_content_item(content_item_path, is_yml)
+    except Exception:
+        return None
+
+
+class ContentItemsCache(object):
+    """ Content items which were parsed before their packs are processed.
+
+    The content items of all packs are parsed together by a pool of processes, and each pack gets its parsed content
+    items from the cache when collecting them. If a cache file is given, the parsed content items are stored in it by
+    the hash of their files, so unchanged content items are not parsed again in following runs.
+
+    Args:
+        cache_path (str): full path to the cache file, the content items are not stored if not given.
+
+    """
+
+    def __init__(self, cache_path: str = ''):
+        self._cache_path = cache_path
+        self._content_items: Dict[Tuple[str, bool], Any] = {}  # the parsed content items of this run by file
+        self._stored_content_items: Dict[str, Any] = {}  # the parsed content items by file hash
+
+        if cache_path and os.path.isfile(cache_path):
+            try:
+                with open(cache_path, 'rb') as cache_file:
+                    self._stored_content_items = pickle.load(cache_file)
+            except Exception:
+                logging.exception(f"Failed loading content items cache from {cache_path}, content items are parsed")
+
+    @staticmethod
+    def _get_file_hash(content_item_path: str, is_yml: bool) -> str:
+        with open(content_item_path, 'rb') as content_item_file:
+            file_hash = hashlib.sha256(content_item_file.read())
+        file_hash.update(b'yml' if is_yml else b'json')
+        return file_hash.hexdigest()
+
+    def load(self, content_items_files: List[Tuple[str, bool]], max_workers: int = 1):
+        """ Parses the given content items files, files which are in the cache file are not parsed again.
+
+        Args:
+            content_items_files (list): the path and whether it is a yml file, of each of the content items files.
+            max_workers (int): number of processes used to parse the files.
+
+        """
+        content_items_hashes = {}
+        files_to_parse = []
+        for content_item_file in content_items_files:
+            try:
+                file_hash = self._get_file_hash(*content_item_file)
+            except OSError:
+                continue  # the pack will fail reading the file when collecting its content items
+
+            content_items_hashes[content_item_file] = file_hash
+            if file_hash in self._stored_content_items:
+                self._content_items[content_item_file] = self._stored_content_items[file_hash]
+            else:
+                files_to_parse.append(content_item_file)
+
+        logging.info(f"Parsing {len(files_to_parse)} content items, "
+                     f"{len(content_items_hashes) - len(files_to_parse)} content items were found in cache")
+        if max_workers > 1 and len(files_to_parse) > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                parsed_content_items = list(executor.map(try_load_content_item, *zip(*files_to_parse),
+                                                         chunksize=max(len(files_to_parse) // (max_workers * 4), 1)))
+        else:
+            parsed_content_items = [try_load_content_item(*content_item_file) for content_item_file in files_to_parse]
+
+        for content_item_file, content_item in zip(files_to_parse, parsed_content_items):
+            # files which failed to be parsed are parsed again by their pack, so the pack fails as before
+            if content_item is not None:
+                self._content_items[content_item_file] = content_item
+
+        # only the content items of this run are kept in the cache file, so it does not grow with removed files
+        self._stored_content_items = {file_hash: self._content_items[content_item_file]
+                                      for content_item_file, file_hash in content_items_hashes.items()
+                                      if content_item_file in self._content_items}
+
+    def get(self, content_item_path: str, is_yml: bool) -> Any:
+        """ Returns the parsed content item, and parses it if it was not parsed already.
+
+        Args:
+            content_item_path (str): full path to the content item file.
+            is_yml (bool): whether the content item is a yml file, otherwise it is a json file.
+
+        Returns:
+            dict: the parsed content item.
+
+        """
+        content_item = self._content_items.pop((content_item_path, is_yml), None)
+        if content_item is None:
+            content_item = load_content_item(content_item_path, is_yml)
+        return content_item
+
+    def save(self):
+        """ Stores the parsed content items in the cache file.
+
+        Returns:
+            bool: whether the operation succeeded.
+
+        """
+        task_status = False
+
+        try:
+            if self._cache_path:
+                os.makedirs(os.path.dirname(os.path.abspath(self._cache_path)), exist_ok=True)
+                # the cache is written under a temporary name first, so a concurrent reader never loads a partial cache
+                temp_cache_path = f"{self._cache_path}.{os.getpid()}.tmp"
+                with open(temp_cache_path, 'wb') as cache_file:
+                    pickle.dump(self._stored_content_items, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_cache_path, self._cache_path)
+            task_status = True
+        except Exception:
+            logging.exception(f"Failed saving content items cache to {self._cache_path}")
+        finally:
+            return task_status
+
+
+class StorageTransferExecutor(object):
+    """ Runs uploads and copies of blobs in the storage on a bounded pool of threads.
+
+    With a single worker every transfer runs in the calling thread, one after the other. With more workers, files which
+    are larger than the composite upload threshold are uploaded as parts in parallel, and the parts are composed into
+    the target blob in the storage.
+
+    Args:
+        max_workers (int): number of transfers which run concurrently.
+        composite_upload_threshold (int): size in bytes from which files are uploaded as parts.
+        composite_part_size (int): minimal size in bytes of each uploaded part.
+
+    """
+    # the storage composes up to 32 blobs in a single request
+    MAX_COMPOSED_PARTS = 32
+    COMPOSITE_UPLOAD_THRESHOLD = 32 * 1024 * 1024
+    COMPOSITE_PART_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, max_workers: int = 1, composite_upload_threshold: int = COMPOSITE_UPLOAD_THRESHOLD,
+                 composite_part_size: int = COMPOSITE_PART_SIZE):
+        self._composite_upload_threshold = composite_upload_threshold
+        self._composite_part_size = composite_part_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._parts_executor: Optional[ThreadPoolExecutor] = None
+
+        if max_workers > 1:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='storage_transfer')
+            # the parts have a pool of their own, as a composite upload holds a transfer worker while waiting for them
+            self._parts_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='storage_part')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def shutdown(self):
+        """ Waits for the submitted transfers and releases the workers.
+
+        """
+        for executor in (self._executor, self._parts_executor):
+            if executor:
+                executor.shutdown(wait=True)
+
+    def submit(self, transfer_func: Callable, *args, **kwargs) -> Future:
+        """ Submits a transfer to the pool, or runs it right away when there is a single worker.
+
+        Args:
+            transfer_func (Callable): the function which transfers the blob.
+
+        Returns:
+            Future: the result of the transfer.
+
+        """
+        if self._executor:
+            return self._executor.submit(transfer_func, *args, **kwargs)
+
+        future: Future = Future()
+        try:
+            future.set_result(transfer_func(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def upload_file(self, blob: Any, file_path: str) -> Future:
+        """ Submits an upload of a local file to the given blob.
+
+        Args:
+            blob (google.cloud.storage.blob.Blob): the blob to upload the file to.
+            file_path (str): full path to the uploaded file.
+
+        Returns:
+            Future: the upload, which results with the uploaded blob.
+
+        """
+        return self.submit(self._upload_file, blob, file_path)
+
+    def copy_blob(self, source_bucket: Any, blob: Any, destination_bucket: Any, new_name: str) -> Future:
+        """ Submits a copy of a blob to another bucket, the copy is verified to exist in the destination bucket.
+
+        Args:
+            source_bucket (google.cloud.storage.bucket.Bucket): the bucket of the copied blob.
+            blob (google.cloud.storage.blob.Blob): the copied blob.
+            destination_bucket (google.cloud.storage.bucket.Bucket): the bucket to copy the blob to.
+            new_name (str): the name of the copied blob in the destination bucket.
+
+        Returns:
+            Future: the copy, which results with the copied blob, or None if it was not found after the copy.
+
+        """
+        return self.submit(self._copy_blob, source_bucket, blob, destination_bucket, new_name)
+
+    @staticmethod
+    def _copy_blob(source_bucket: Any, blob: Any, destination_bucket: Any, new_name: str) -> Any:
+        copied_blob = source_bucket.copy_blob(blob=blob, destination_bucket=destination_bucket, new_name=new_name)
+        return copied_blob if copied_blob.exists() else None
+
+    def _upload_file(self, blob: Any, file_path: str) -> Any:
+        if self._parts_executor:
+            file_size = os.path.getsize(file_path)
+            if file_size >= self._composite_upload_threshold:
+                return self._upload_composite_file(blob, file_path, file_size)
+
+        with open(file_path, 'rb') as upload_file:
+            blob.upload_from_file(upload_file)
+        return blob
+
+    def _upload_composite_file(self, blob: Any, file_path: str, file_size: int) -> Any:
+        part_size = max(self._composite_part_size, -(-file_size // self.MAX_COMPOSED_PARTS))
+        part_blobs = [blob.bucket.blob(f'{blob.name}.part{part_index}')
+                      for part_index in range(-(-file_size // part_size))]
+
+        try:
+            uploaded_parts = [self._parts_executor.submit(  # type: ignore[union-attr]
+                self._upload_file_part, part_blob, file_path, part_index * part_size,
+                min(part_size, file_size - part_index * part_size)) for part_index, part_blob in enumerate(part_blobs)]
+            for uploaded_part in uploaded_parts:
+                uploaded_part.result()
+
+            # the content type a single upload of the file would have got
+            blob.content_type = blob.content_type or 'application/octet-stream'
+            blob.compose(part_blobs)
+        finally:
+            blob.bucket.delete_blobs(part_blobs, on_error=lambda part_blob: None)
+
+        logging.debug(f"Uploaded {file_path} to {blob.name} as {len(part_blobs)} parts")
+        return blob
+
+    @staticmethod
+    def _upload_file_part(part_blob: Any, file_path: str, offset: int, part_size: int):
+        with open(file_path, 'rb') as upload_file:
+            upload_file.seek(offset)
+            part_blob.upload_from_file(upload_file, size=part_size)
+
+
 def json_write(file_path: str, data: Union[list, dict]):
     """ Writes given data to a json file
 
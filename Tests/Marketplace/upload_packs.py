@@ -1,5 +1,9 @@
+import base64
+import copy
+import hashlib
 import json
 import os
+import struct
 import sys
 import argparse
 import shutil
@@ -7,18 +11,23 @@ import uuid
 import prettytable
 import glob
 import requests
+import threading
+import zipfile
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from google.cloud.storage import Bucket
 from pathlib import Path
 
-from zipfile import ZipFile
-from typing import Any, Tuple, Union, Optional
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
+from typing import Any, Callable, Iterator, List, Tuple, Union, Optional
 
 from requests import Response
 
 from Tests.Marketplace.marketplace_services import init_storage_client, Pack, \
     load_json, get_content_git_client, get_recent_commits_data, store_successful_and_failed_packs_in_ci_artifacts, \
-    json_write
+    json_write, ContentItemsCache, StorageTransferExecutor
 from Tests.Marketplace.marketplace_statistics import StatisticsHandler
 from Tests.Marketplace.marketplace_constants import PackStatus, Metadata, GCPConfig, BucketUploadFlow, \
     CONTENT_ROOT_PATH, PACKS_FOLDER, PACKS_FULL_PATH, IGNORED_FILES, IGNORED_PATHS, LANDING_PAGE_SECTIONS_PATH
@@ -28,6 +37,11 @@ from Tests.scripts.utils.log_util import install_logging
 from Tests.scripts.utils import logging_wrapper as logging
 import traceback
 
+# the content repo object is not thread safe, so the packs detect their modified files one at a time
+CONTENT_REPO_LOCK = threading.Lock()
+# the cached index zips are named by the hex digest of their md5 hash
+CACHED_INDEX_ZIP_NAME = f'{GCPConfig.INDEX_NAME}_{{index_hash}}.zip'
+
 
 def get_packs_names(target_packs: str, previous_commit_hash: str = "HEAD^") -> set:
     """Detects and returns packs names to upload.
@@ -84,14 +98,18 @@ def extract_packs_artifacts(packs_artifacts_path: str, extract_destination_path:
     logging.info("Finished extracting packs artifacts")
 
 
-def download_and_extract_index(storage_bucket: Any, extract_destination_path: str, storage_base_path: str) \
-        -> Tuple[str, Any, int]:
+def download_and_extract_index(storage_bucket: Any, extract_destination_path: str, storage_base_path: str,
+                               index_cache_path: str = '') -> Tuple[str, Any, int]:
     """Downloads and extracts index zip from cloud storage.
 
+    If an index cache folder is given and it has the index zip which is in the storage, the cached index zip is
+    extracted instead of downloading it, and otherwise the downloaded index zip is stored in the cache.
+
     Args:
         storage_bucket (google.cloud.storage.bucket.Bucket): google storage bucket where index.zip is stored.
         extract_destination_path (str): the full path of extract folder.
         storage_base_path (str): the source path of the index in the target bucket.
+        index_cache_path (str): the full path of the index cache folder.
     Returns:
         str: extracted index folder full path.
         Blob: google cloud storage object that represents index.zip blob.
@@ -119,7 +137,15 @@ def download_and_extract_index(storage_bucket: Any, extract_destination_path: st
     index_blob.reload()
     index_generation = index_blob.generation
 
-    index_blob.download_to_filename(download_index_path, if_generation_match=index_generation)
+    cached_index_zip_path = get_cached_index_zip_path(index_cache_path, index_blob.md5_hash)
+    if cached_index_zip_path and os.path.isfile(cached_index_zip_path) and \
+            calculate_file_md5_hash(cached_index_zip_path) == index_blob.md5_hash:
+        shutil.copyfile(cached_index_zip_path, download_index_path)
+        logging.info(f"Using the cached {GCPConfig.INDEX_NAME}.zip of generation {index_generation}")
+    else:
+        index_blob.download_to_filename(download_index_path, if_generation_match=index_generation)
+        if index_cache_path:
+            store_index_zip_in_cache(download_index_path, index_cache_path)
 
     if os.path.exists(download_index_path):
         with ZipFile(download_index_path, 'r') as index_zip:
@@ -139,6 +165,157 @@ def download_and_extract_index(storage_bucket: Any, extract_destination_path: st
         sys.exit(1)
 
 
+def calculate_file_md5_hash(file_path: str) -> str:
+    """Calculates the md5 hash of a file, encoded as the storage encodes the md5 hash of blobs.
+
+    Args:
+        file_path (str): full path to the file.
+    Returns:
+        str: the base64 encoded md5 hash of the file.
+
+    """
+    file_hash = hashlib.md5()  # the storage keeps the md5 hash of blobs, it is not used for security
+    with open(file_path, 'rb') as hashed_file:
+        for chunk in iter(lambda: hashed_file.read(1024 * 1024), b''):
+            file_hash.update(chunk)
+    return base64.b64encode(file_hash.digest()).decode()
+
+
+def get_cached_index_zip_path(index_cache_path: str, index_md5_hash: Optional[str]) -> str:
+    """Returns the path of the index zip with the given md5 hash in the index cache folder.
+
+    Args:
+        index_cache_path (str): the full path of the index cache folder.
+        index_md5_hash (str): the base64 encoded md5 hash of the index zip.
+    Returns:
+        str: the cached index zip path, or an empty string if there is no index cache folder or md5 hash.
+
+    """
+    if not (index_cache_path and index_md5_hash):
+        return ''
+    return os.path.join(index_cache_path,
+                        CACHED_INDEX_ZIP_NAME.format(index_hash=base64.b64decode(index_md5_hash).hex()))
+
+
+def store_index_zip_in_cache(index_zip_path: str, index_cache_path: str):
+    """Stores the index zip in the index cache folder, instead of the previously cached index zips.
+
+    Args:
+        index_zip_path (str): full path to the index zip.
+        index_cache_path (str): the full path of the index cache folder.
+
+    """
+    try:
+        os.makedirs(index_cache_path, exist_ok=True)
+        cached_index_zip_path = get_cached_index_zip_path(index_cache_path, calculate_file_md5_hash(index_zip_path))
+        # the index zip is copied under a temporary name first, so a partial copy is never used
+        shutil.copyfile(index_zip_path, f'{cached_index_zip_path}.tmp')
+        os.replace(f'{cached_index_zip_path}.tmp', cached_index_zip_path)
+
+        for previous_index_zip_path in glob.glob(os.path.join(index_cache_path, CACHED_INDEX_ZIP_NAME.format(
+                index_hash='*'))):
+            if previous_index_zip_path != cached_index_zip_path:
+                os.remove(previous_index_zip_path)
+        logging.info(f"Stored {GCPConfig.INDEX_NAME}.zip in cache at {cached_index_zip_path}")
+    except Exception:
+        logging.exception(f"Failed storing {GCPConfig.INDEX_NAME}.zip in cache at {index_cache_path}")
+
+
+def copy_compressed_zip_entry(source_zip: ZipFile, entry: ZipInfo, target_zip: ZipFile):
+    """Copies an entry of a zip file to another zip file, as it is compressed in the source zip.
+
+    Args:
+        source_zip (ZipFile): the zip file to copy the entry from, opened for reading.
+        entry (ZipInfo): the copied entry of the source zip.
+        target_zip (ZipFile): the zip file to copy the entry to, opened for writing.
+
+    """
+    source_file: Any = source_zip.fp
+    target_file: Any = target_zip.fp
+
+    # the compressed data of the entry follows its local header, and the entry name and extra field of the header
+    source_file.seek(entry.header_offset)
+    _, _, _, _, _, _, _, _, _, _, name_length, extra_length = struct.unpack(
+        zipfile.structFileHeader, source_file.read(zipfile.sizeFileHeader))
+    source_file.seek(entry.header_offset + zipfile.sizeFileHeader + name_length + extra_length)
+    compressed_data = source_file.read(entry.compress_size)
+
+    copied_entry = copy.copy(entry)
+    copied_entry.flag_bits &= ~0x08  # the sizes and crc are written in the local header, not after the data
+    copied_entry.header_offset = target_file.tell()
+    target_file.write(copied_entry.FileHeader())
+    target_file.write(compressed_data)
+    target_zip.filelist.append(copied_entry)
+    target_zip.NameToInfo[copied_entry.filename] = copied_entry
+    target_zip.start_dir = target_file.tell()  # type: ignore[attr-defined]
+
+
+def update_index_zip(index_folder_path: str, extract_destination_path: str, base_index_zip_path: str) -> str:
+    """Creates the index zip of the index folder, based on the index zip the index folder was extracted from.
+
+    The files which have the same size and crc as in the base index zip are copied compressed from it, so only the
+    added and modified files are compressed. The entries of the created index zip are then verified against the crc of
+    the index folder files, and if it fails, the index zip is created from scratch.
+
+    Args:
+        index_folder_path (str): index folder full path.
+        extract_destination_path (str): extract folder full path, which has the index folder.
+        base_index_zip_path (str): full path to the index zip the index folder was extracted from.
+    Returns:
+        str: full path to the created index zip.
+
+    """
+    index_zip_path = f'{index_folder_path}.zip'
+    index_files_crc = {}
+    compressed_entries = 0
+
+    try:
+        with ZipFile(base_index_zip_path) as base_index_zip, \
+                ZipFile(index_zip_path, 'w', compression=ZIP_DEFLATED) as index_zip:
+            base_index_entries = {entry.filename: entry for entry in base_index_zip.infolist()}
+
+            # the entries are written in the same order as the index zip is created by shutil.make_archive
+            index_zip.write(index_folder_path, os.path.basename(index_folder_path))
+            for dir_path, dir_names, file_names in os.walk(index_folder_path):
+                for dir_name in sorted(dir_names):
+                    entry_path = os.path.join(dir_path, dir_name)
+                    index_zip.write(entry_path, os.path.relpath(entry_path, extract_destination_path))
+
+                for file_name in file_names:
+                    entry_path = os.path.join(dir_path, file_name)
+                    entry_name = os.path.relpath(entry_path, extract_destination_path)
+                    with open(entry_path, 'rb') as entry_file:
+                        entry_data = entry_file.read()
+                    index_files_crc[entry_name] = zlib.crc32(entry_data)
+
+                    base_entry = base_index_entries.get(entry_name)
+                    if base_entry and base_entry.compress_type == ZIP_DEFLATED and \
+                            base_entry.file_size == len(entry_data) and base_entry.CRC == index_files_crc[entry_name]:
+                        copy_compressed_zip_entry(base_index_zip, base_entry, index_zip)
+                    else:
+                        index_zip.write(entry_path, entry_name)
+                        compressed_entries += 1
+
+        # the index zip is verified by the crc and local header of its entries, without decompressing them
+        with ZipFile(index_zip_path) as index_zip:
+            index_zip_files = [entry for entry in index_zip.infolist() if not entry.is_dir()]
+            for entry in index_zip_files:
+                if index_files_crc.get(entry.filename) != entry.CRC:
+                    raise Exception(f"The crc of {entry.filename} does not match the {GCPConfig.INDEX_NAME} folder")
+                index_zip.open(entry).close()  # the local header is checked to match the entry
+            if len(index_zip_files) != len(index_files_crc):
+                raise Exception(f"The entries do not match the files of the {GCPConfig.INDEX_NAME} folder")
+
+        logging.info(f"Updated {GCPConfig.INDEX_NAME}.zip, compressed {compressed_entries} added and modified "
+                     f"files and copied {len(index_files_crc) - compressed_entries} files from the previous index")
+        return index_zip_path
+    except Exception:
+        logging.exception(f"Failed updating {GCPConfig.INDEX_NAME}.zip, creating it from the {GCPConfig.INDEX_NAME} "
+                          f"folder")
+        return shutil.make_archive(base_name=index_folder_path, format="zip", root_dir=extract_destination_path,
+                                   base_dir=os.path.basename(index_folder_path))
+
+
 def update_index_folder(index_folder_path: str, pack_name: str, pack_path: str, pack_version: str = '',
                         hidden_pack: bool = False) -> bool:
     """
@@ -268,6 +445,7 @@ def upload_index_to_storage(index_folder_path: str, extract_destination_path: st
                             previous_commit_hash: str = None, landing_page_sections: dict = None,
                             artifacts_dir: Optional[str] = None,
                             storage_bucket: Optional[Bucket] = None,
+                            index_cache_path: str = '',
                             ):
     """
     Upload updated index zip to cloud storage.
@@ -285,6 +463,8 @@ def upload_index_to_storage(index_folder_path: str, extract_destination_path: st
     :param landing_page_sections: landingPage sections.
     :param artifacts_dir: The CI artifacts directory to upload the index.json to.
     :param storage_bucket: The storage bucket object
+    :param index_cache_path: The index cache folder, which has the downloaded index zip to update instead of creating
+        the index zip from scratch.
     :returns None.
 
     """
@@ -315,9 +495,14 @@ def upload_index_to_storage(index_folder_path: str, extract_destination_path: st
         }
         json.dump(index, index_file, indent=4)
 
-    index_zip_name = os.path.basename(index_folder_path)
-    index_zip_path = shutil.make_archive(base_name=index_folder_path, format="zip",
-                                         root_dir=extract_destination_path, base_dir=index_zip_name)
+    # the index blob has the md5 hash of the downloaded index until it is reloaded
+    base_index_zip_path = get_cached_index_zip_path(index_cache_path, index_blob.md5_hash)
+    if base_index_zip_path and os.path.isfile(base_index_zip_path):
+        index_zip_path = update_index_zip(index_folder_path, extract_destination_path, base_index_zip_path)
+    else:
+        index_zip_name = os.path.basename(index_folder_path)
+        index_zip_path = shutil.make_archive(base_name=index_folder_path, format="zip",
+                                             root_dir=extract_destination_path, base_dir=index_zip_name)
     try:
         logging.info(f'index zip path: {index_zip_path}')
         index_blob.reload()
@@ -328,6 +513,8 @@ def upload_index_to_storage(index_folder_path: str, extract_destination_path: st
             # we upload both index.json and the index.zip to allow usage of index.json without having to unzip
             index_blob.upload_from_filename(index_zip_path)
             logging.success(f"Finished uploading {GCPConfig.INDEX_NAME}.zip to storage.")
+            if index_cache_path:
+                store_index_zip_in_cache(index_zip_path, index_cache_path)
         else:
             logging.critical(f"Failed in uploading {GCPConfig.INDEX_NAME}, mismatch in index file generation.")
             logging.critical(f"Downloaded index generation: {index_generation}")
@@ -891,13 +1078,16 @@ def get_images_data(packs_list: list):
     return images_data
 
 
-def sign_and_zip_pack(pack, signature_key, delete_test_playbooks=False):
+def sign_and_zip_pack(pack, signature_key, delete_test_playbooks=False, zip_cache_path=''):
     """
     Prepares the pack before zip, and then zips it.
     Args:
         pack (Pack): Pack to be zipped.
         signature_key (str): Base64 encoded string used to sign the pack.
         delete_test_playbooks (bool): Whether to delete test playbooks folder.
+        zip_cache_path (str): Full path to the pack zips cache folder. If the pack content was already zipped into this
+            folder, the cached zip is used instead of zipping the pack again, and only the pack metadata and signature
+            are added to it.
     Returns:
         (bool): Whether the zip was successful
     """
@@ -907,12 +1097,26 @@ def sign_and_zip_pack(pack, signature_key, delete_test_playbooks=False):
         pack.status = PackStatus.FAILED_REMOVING_PACK_SKIPPED_FOLDERS
         pack.cleanup()
         return False
+    cache_key = ''
+    if zip_cache_path:
+        # the metadata, which changes on every build, and the signatures are not cached, and are added after signing
+        cache_key = pack.get_zip_cache_key(delete_test_playbooks)
+        if not pack.load_zip_from_cache(zip_cache_path, cache_key):
+            task_status, _ = pack.zip_pack(excluded_files=Pack.ZIP_CACHE_EXCLUDED_FILES)
+            if not task_status:
+                pack.status = PackStatus.FAILED_ZIPPING_PACK_ARTIFACTS.name
+                pack.cleanup()
+                return False
+            pack.save_zip_to_cache(zip_cache_path, cache_key)
     task_status = pack.sign_pack(signature_key)
     if not task_status:
         pack.status = PackStatus.FAILED_SIGNING_PACKS.name
         pack.cleanup()
         return False
-    task_status, _ = pack.zip_pack()
+    if cache_key:
+        task_status = pack.add_files_to_zip()
+    else:
+        task_status, _ = pack.zip_pack()
     if not task_status:
         pack.status = PackStatus.FAILED_ZIPPING_PACK_ARTIFACTS.name
         pack.cleanup()
@@ -921,7 +1125,7 @@ def sign_and_zip_pack(pack, signature_key, delete_test_playbooks=False):
 
 
 def upload_packs_with_dependencies_zip(storage_bucket, storage_base_path, signature_key,
-                                       packs_for_current_marketplace_dict):
+                                       packs_for_current_marketplace_dict, zip_cache_path='', storage_executor=None):
     """
     Uploads packs with mandatory dependencies zip for all packs
     Args:
@@ -930,6 +1134,8 @@ def upload_packs_with_dependencies_zip(storage_bucket, storage_base_path, signat
                                  <some_path_in_the_target_bucket>/content/Packs).
         storage_bucket (google.cloud.storage.bucket.Bucket): google cloud storage bucket.
         packs_for_current_marketplace_dict (dict): Dict of packs relevant for current marketplace as {pack_name: pack_object}
+        zip_cache_path (str): Full path to the pack zips cache folder.
+        storage_executor (StorageTransferExecutor): Runs the uploads, they run one by one if not given.
 
     """
     logging.info("Starting to collect pack with dependencies zips")
@@ -941,7 +1147,7 @@ def upload_packs_with_dependencies_zip(storage_bucket, storage_base_path, signat
             upload_path = os.path.join(storage_base_path, pack_name, f"{pack_name}_with_dependencies.zip")
             Path(pack_with_dep_path).mkdir(parents=True, exist_ok=True)
             if not (pack.zip_path and os.path.isfile(pack.zip_path)):
-                task_status = sign_and_zip_pack(pack, signature_key)
+                task_status = sign_and_zip_pack(pack, signature_key, zip_cache_path=zip_cache_path)
                 if not task_status:
                     logging.warning(f"Skipping dependencies collection for {pack_name}. Failed zipping")
                     continue
@@ -949,7 +1155,7 @@ def upload_packs_with_dependencies_zip(storage_bucket, storage_base_path, signat
             for dep_name in pack.all_levels_dependencies:
                 dep_pack = packs_for_current_marketplace_dict.get(dep_name)
                 if not (dep_pack.zip_path and os.path.isfile(dep_pack.zip_path)):
-                    task_status = sign_and_zip_pack(dep_pack, signature_key)
+                    task_status = sign_and_zip_pack(dep_pack, signature_key, zip_cache_path=zip_cache_path)
                     if not task_status:
                         logging.error(f"Skipping dependency {pack_name}. Failed zipping")
                         continue
@@ -968,7 +1174,8 @@ def upload_packs_with_dependencies_zip(storage_bucket, storage_base_path, signat
                 storage_bucket=storage_bucket,
                 override_pack=True,
                 storage_base_path=storage_base_path,
-                overridden_upload_path=upload_path
+                overridden_upload_path=upload_path,
+                storage_executor=storage_executor
             )
             logging.info(f"{pack_name} with dependencies was{' not' if not task_status else ''} uploaded successfully")
             if not task_status:
@@ -979,6 +1186,205 @@ def upload_packs_with_dependencies_zip(storage_bucket, storage_base_path, signat
         logging.error(f"Failed uploading packs with dependencies: {e}")
 
 
+def prepare_pack(pack: Pack, content_repo: Any, index_folder_path: str, current_commit_hash: str,
+                 previous_commit_hash: str, packs_dependencies_mapping: dict, build_number: str,
+                 statistics_handler: StatisticsHandler, packs_for_current_marketplace_dict: dict, marketplace: str,
+                 signature_key: str, remove_test_playbooks: bool, storage_bucket: Any, storage_base_path: str,
+                 diff_files_list: list, zip_cache_path: str = '', content_items_cache: Optional[ContentItemsCache] = None,
+                 storage_executor: Optional[StorageTransferExecutor] = None) -> Tuple[bool, bool]:
+    """
+    Collects the pack content items, uploads its images, formats its metadata and release notes, and signs and zips
+    the pack. The images are uploaded before the metadata is formatted, as the metadata has their storage paths.
+    Args:
+        pack (Pack): The pack to prepare.
+        content_repo (git.repo.base.Repo): The content repo object.
+        index_folder_path (str): The downloaded index folder path.
+        current_commit_hash (str): The current commit hash.
+        previous_commit_hash (str): The previous commit hash to diff with.
+        packs_dependencies_mapping (dict): All packs dependencies lookup mapping.
+        build_number (str): The CI build number.
+        statistics_handler (StatisticsHandler): The marketplace statistics handler.
+        packs_for_current_marketplace_dict (dict): Dict of packs relevant for current marketplace.
+        marketplace (str): The marketplace this upload is for.
+        signature_key (str): Base64 encoded string used to sign the pack.
+        remove_test_playbooks (bool): Whether to delete test playbooks folder.
+        storage_bucket (google.cloud.storage.bucket.Bucket): The storage bucket to upload the images to.
+        storage_base_path (str): The upload destination in the target bucket for all packs.
+        diff_files_list (list): The files changed between the previous and the current commit.
+        zip_cache_path (str): Full path to the pack zips cache folder.
+        content_items_cache (ContentItemsCache): The already parsed content items of the packs.
+        storage_executor (StorageTransferExecutor): Runs the uploads, they run one by one if not given.
+    Returns:
+        (bool): Whether the pack was prepared successfully.
+        (bool): Whether the pack is missing dependencies in the index.
+    """
+    task_status = pack.collect_content_items(content_items_cache)
+    if not task_status:
+        pack.status = PackStatus.FAILED_COLLECT_ITEMS.name
+        pack.cleanup()
+        return False, False
+
+    task_status = pack.upload_integration_images(storage_bucket, storage_base_path, diff_files_list, True,
+                                                 storage_executor)
+    if not task_status:
+        pack.status = PackStatus.FAILED_IMAGES_UPLOAD.name
+        pack.cleanup()
+        return False, False
+
+    task_status = pack.upload_author_image(storage_bucket, storage_base_path, diff_files_list, True, storage_executor)
+    if not task_status:
+        pack.status = PackStatus.FAILED_AUTHOR_IMAGE_UPLOAD.name
+        pack.cleanup()
+        return False, False
+
+    # detect if the pack is modified and return modified RN files
+    with CONTENT_REPO_LOCK:
+        task_status, modified_rn_files_paths = pack.detect_modified(content_repo, index_folder_path,
+                                                                    current_commit_hash, previous_commit_hash)
+
+    if not task_status:
+        pack.status = PackStatus.FAILED_DETECTING_MODIFIED_FILES.name
+        pack.cleanup()
+        return False, False
+
+    task_status, is_missing_dependencies = pack.format_metadata(index_folder_path,
+                                                                packs_dependencies_mapping, build_number,
+                                                                current_commit_hash,
+                                                                statistics_handler,
+                                                                packs_for_current_marketplace_dict, marketplace)
+
+    if not task_status:
+        pack.status = PackStatus.FAILED_METADATA_PARSING.name
+        pack.cleanup()
+        return False, is_missing_dependencies
+
+    task_status, not_updated_build = pack.prepare_release_notes(index_folder_path, build_number,
+                                                                modified_rn_files_paths)
+    if not task_status:
+        pack.status = PackStatus.FAILED_RELEASE_NOTES.name
+        pack.cleanup()
+        return False, is_missing_dependencies
+
+    if not_updated_build:
+        pack.status = PackStatus.PACK_IS_NOT_UPDATED_IN_RUNNING_BUILD.name
+        pack.cleanup()
+        return False, is_missing_dependencies
+
+    sign_and_zip_pack(pack, signature_key, remove_test_playbooks, zip_cache_path)
+    return True, is_missing_dependencies
+
+
+def upload_pack(pack: Pack, storage_bucket: Any, storage_base_path: str, override_all_packs: bool,
+                storage_executor: Optional[StorageTransferExecutor] = None) -> Tuple[bool, bool]:
+    """
+    Uploads the pack zip to the storage.
+    Args:
+        pack (Pack): The prepared pack to upload.
+        storage_bucket (google.cloud.storage.bucket.Bucket): The storage bucket to upload to.
+        storage_base_path (str): The upload destination in the target bucket for all packs.
+        override_all_packs (bool): Whether to override the pack even if it was not modified.
+        storage_executor (StorageTransferExecutor): Runs the uploads, they run one by one if not given.
+    Returns:
+        (bool): Whether the pack was uploaded successfully.
+        (bool): Whether the pack upload was skipped, as it already exists in the storage.
+    """
+    task_status, skipped_upload, _ = pack.upload_to_storage(pack.zip_path, pack.latest_version, storage_bucket,
+                                                            override_all_packs or pack.is_modified,
+                                                            storage_base_path, storage_executor=storage_executor)
+    if not task_status:
+        pack.status = PackStatus.FAILED_UPLOADING_PACK.name
+        pack.cleanup()
+        return False, False
+
+    return True, skipped_upload
+
+
+def update_pack_in_index(pack: Pack, index_folder_path: str, skipped_upload: bool, is_missing_dependencies: bool):
+    """
+    Updates the index folder with the uploaded pack, and sets the pack status.
+    Args:
+        pack (Pack): The uploaded pack.
+        index_folder_path (str): The downloaded index folder path.
+        skipped_upload (bool): Whether the pack upload was skipped, as it already exists in the storage.
+        is_missing_dependencies (bool): Whether the pack is missing dependencies in the index.
+    """
+    task_status, exists_in_index = pack.check_if_exists_in_index(index_folder_path)
+    if not task_status:
+        pack.status = PackStatus.FAILED_SEARCHING_PACK_IN_INDEX.name
+        pack.cleanup()
+        return
+
+    task_status = pack.prepare_for_index_upload()
+    if not task_status:
+        pack.status = PackStatus.FAILED_PREPARING_INDEX_FOLDER.name
+        pack.cleanup()
+        return
+
+    task_status = update_index_folder(index_folder_path=index_folder_path, pack_name=pack.name, pack_path=pack.path,
+                                      pack_version=pack.latest_version, hidden_pack=pack.hidden)
+    if not task_status:
+        pack.status = PackStatus.FAILED_UPDATING_INDEX_FOLDER.name
+        pack.cleanup()
+        return
+
+    # in case that pack already exist at cloud storage path and in index, don't show that the pack was changed
+    if skipped_upload and exists_in_index and not is_missing_dependencies:
+        pack.status = PackStatus.PACK_ALREADY_EXISTS.name
+        pack.cleanup()
+        return
+
+    pack.status = PackStatus.SUCCESS.name
+
+
+def _upload_prepared_pack(pack: Pack, prepared_pack: Future,
+                          upload_pack_func: Callable[[Pack], Tuple[bool, bool]]) -> Tuple[bool, bool, bool]:
+    task_status, is_missing_dependencies = prepared_pack.result()
+    if not task_status:
+        return False, is_missing_dependencies, False
+    task_status, skipped_upload = upload_pack_func(pack)
+    return task_status, is_missing_dependencies, skipped_upload
+
+
+def process_packs(packs: List[Pack], prepare_pack_func: Callable[[Pack], Tuple[bool, bool]],
+                  upload_pack_func: Callable[[Pack], Tuple[bool, bool]], max_workers: int = 1) \
+        -> Iterator[Tuple[Pack, bool, bool, bool]]:
+    """
+    Prepares and uploads the packs, and yields their results by the order of the packs.
+    With more than one worker, the packs are prepared (collected, their images uploaded, formatted, signed and zipped)
+    in one thread pool and their zips are uploaded to the storage in another, so the zip uploads don't wait for the
+    packs which are being zipped.
+    As preparing a pack reads the index folder, which is updated with the yielded results, the results are yielded
+    only once all the packs were processed.
+    Args:
+        packs (list): The packs to process.
+        prepare_pack_func (Callable): Prepares a pack, returns whether it succeeded and if it's missing dependencies.
+        upload_pack_func (Callable): Uploads a prepared pack, returns whether it succeeded and if it was skipped.
+        max_workers (int): The number of packs which are prepared, and uploaded, concurrently.
+    Returns:
+        (Iterator): The pack, whether it was prepared and uploaded successfully, whether it's missing dependencies,
+            and whether its upload was skipped.
+    """
+    if max_workers <= 1:
+        for pack in packs:
+            task_status, is_missing_dependencies = prepare_pack_func(pack)
+            skipped_upload = False
+            if task_status:
+                task_status, skipped_upload = upload_pack_func(pack)
+            yield pack, task_status, is_missing_dependencies, skipped_upload
+        return
+
+    logging.info(f"Processing {len(packs)} packs with {max_workers} workers")
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prepare_pack') as prepare_executor, \
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='upload_pack') as upload_executor:
+        prepared_packs = [prepare_executor.submit(prepare_pack_func, pack) for pack in packs]
+        uploaded_packs = [upload_executor.submit(_upload_prepared_pack, pack, prepared_pack, upload_pack_func)
+                          for pack, prepared_pack in zip(packs, prepared_packs)]
+        results = [uploaded_pack.result() for uploaded_pack in uploaded_packs]
+
+    for pack, (task_status, is_missing_dependencies, skipped_upload) in zip(packs, results):
+        yield pack, task_status, is_missing_dependencies, skipped_upload
+
+
 def option_handler():
     """Validates and parses script arguments.
 
@@ -1023,6 +1429,20 @@ def option_handler():
     parser.add_argument('-dz', '--create_dependencies_zip', type=str2bool, help="Upload packs with dependencies zip",
                         required=False)
     parser.add_argument('-mp', '--marketplace', help="marketplace version", default='xsoar')
+    parser.add_argument('-w', '--max_workers', type=int, default=1,
+                        help="Number of packs which are prepared and uploaded concurrently, of processes which "
+                             "parse the packs content items, and of files which are uploaded to the storage "
+                             "concurrently. Default is 1 (serial).")
+    parser.add_argument('-zc', '--zip_cache_path', default='',
+                        help="Full path to a folder used as a cache of signed pack zips. Packs with the same files "
+                             "and signature key as a cached zip are not signed and zipped again.")
+    parser.add_argument('-cc', '--content_items_cache_path', default='',
+                        help="Full path to a file used as a cache of parsed content items. Content items with the same "
+                             "files as cached content items are not parsed again.")
+    parser.add_argument('-ic', '--index_cache_path', default='',
+                        help="Full path to a folder used as a cache of the index zip. The cached index zip is used "
+                             "instead of downloading the same index zip, and the index zip is updated from it instead "
+                             "of being created from scratch.")
     # disable-secrets-detection-end
     return parser.parse_args()
 
@@ -1048,6 +1468,10 @@ def main():
     force_upload = option.force_upload
     marketplace = option.marketplace
     is_create_dependencies_zip = option.create_dependencies_zip
+    max_workers = option.max_workers
+    zip_cache_path = option.zip_cache_path
+    content_items_cache_path = option.content_items_cache_path
+    index_cache_path = option.index_cache_path
 
     # google cloud storage client initialized
     storage_client = init_storage_client(service_account)
@@ -1060,7 +1484,8 @@ def main():
     # download and extract index from public bucket
     index_folder_path, index_blob, index_generation = download_and_extract_index(storage_bucket,
                                                                                  extract_destination_path,
-                                                                                 storage_base_path)
+                                                                                 storage_base_path,
+                                                                                 index_cache_path)
 
     # content repo client initialized
     content_repo = get_content_git_client(CONTENT_ROOT_PATH)
@@ -1113,162 +1538,99 @@ def main():
         else:
             packs_for_current_marketplace_dict[pack.name] = pack
 
-    # iterating over packs that are for this current marketplace
-    # we iterate over all packs (and not just for modified packs) for several reasons -
-    # 1. we might need the info about this pack if a modified pack is dependent on it.
-    # 2. even if the pack is not updated, we still keep some fields in it's metadata updated, such as download count,
-    # changelog, etc.
-    for pack in list(packs_for_current_marketplace_dict.values()):
-        task_status = pack.collect_content_items()
-        if not task_status:
-            pack.status = PackStatus.FAILED_COLLECT_ITEMS.name
-            pack.cleanup()
-            continue
-
-        task_status = pack.upload_integration_images(storage_bucket, storage_base_path, diff_files_list, True)
-        if not task_status:
-            pack.status = PackStatus.FAILED_IMAGES_UPLOAD.name
-            pack.cleanup()
-            continue
-
-        task_status = pack.upload_author_image(storage_bucket, storage_base_path, diff_files_list, True)
-
-        if not task_status:
-            pack.status = PackStatus.FAILED_AUTHOR_IMAGE_UPLOAD.name
-            pack.cleanup()
-            continue
-
-        # detect if the pack is modified and return modified RN files
-        task_status, modified_rn_files_paths = pack.detect_modified(content_repo, index_folder_path,
-                                                                    current_commit_hash, previous_commit_hash)
-
-        if not task_status:
-            pack.status = PackStatus.FAILED_DETECTING_MODIFIED_FILES.name
-            pack.cleanup()
-            continue
-
-        task_status, is_missing_dependencies = pack.format_metadata(index_folder_path,
-                                                                    packs_dependencies_mapping, build_number,
-                                                                    current_commit_hash,
-                                                                    statistics_handler,
-                                                                    packs_for_current_marketplace_dict, marketplace)
-
-        if is_missing_dependencies:
-            # If the pack is dependent on a new pack, therefore it is not yet in the index.zip as it might not have
-            # been iterated yet, we will note that it is missing dependencies, and after updating the index.zip with
-            # all new packs - we will go over the pack again to add what was missing. See issue #37290.
-            packs_with_missing_dependencies.append(pack)
+    # parsing the content items of all packs at once, so they are parsed in parallel
+    content_items_cache = ContentItemsCache(content_items_cache_path)
+    content_items_cache.load([content_item_file for pack in packs_for_current_marketplace_dict.values()
+                              for content_item_file in pack.get_content_items_files()], max_workers)
+    content_items_cache.save()
+
+    # the storage transfers are waited for, and their workers are released, even if the upload fails
+    with StorageTransferExecutor(max_workers) as storage_executor:
+        # iterating over packs that are for this current marketplace
+        # we iterate over all packs (and not just for modified packs) for several reasons -
+        # 1. we might need the info about this pack if a modified pack is dependent on it.
+        # 2. even if the pack is not updated, we still keep some fields in it's metadata updated, such as download
+        # count, changelog, etc.
+        prepare_pack_func = partial(prepare_pack, content_repo=content_repo, index_folder_path=index_folder_path,
+                                    current_commit_hash=current_commit_hash, previous_commit_hash=previous_commit_hash,
+                                    packs_dependencies_mapping=packs_dependencies_mapping, build_number=build_number,
+                                    statistics_handler=statistics_handler,
+                                    packs_for_current_marketplace_dict=packs_for_current_marketplace_dict,
+                                    marketplace=marketplace, signature_key=signature_key,
+                                    remove_test_playbooks=remove_test_playbooks, storage_bucket=storage_bucket,
+                                    storage_base_path=storage_base_path, diff_files_list=diff_files_list,
+                                    zip_cache_path=zip_cache_path, content_items_cache=content_items_cache,
+                                    storage_executor=storage_executor)
+        upload_pack_func = partial(upload_pack, storage_bucket=storage_bucket, storage_base_path=storage_base_path,
+                                   override_all_packs=override_all_packs, storage_executor=storage_executor)
+        for pack, task_status, is_missing_dependencies, skipped_upload in process_packs(
+                list(packs_for_current_marketplace_dict.values()), prepare_pack_func, upload_pack_func, max_workers):
+            if is_missing_dependencies:
+                # If the pack is dependent on a new pack, therefore it is not yet in the index.zip as it might not have
+                # been iterated yet, we will note that it is missing dependencies, and after updating the index.zip with
+                # all new packs - we will go over the pack again to add what was missing. See issue #37290.
+                packs_with_missing_dependencies.append(pack)
 
-        if not task_status:
-            pack.status = PackStatus.FAILED_METADATA_PARSING.name
-            pack.cleanup()
-            continue
-
-        task_status, not_updated_build = pack.prepare_release_notes(index_folder_path, build_number,
-                                                                    modified_rn_files_paths)
-        if not task_status:
-            pack.status = PackStatus.FAILED_RELEASE_NOTES.name
-            pack.cleanup()
-            continue
-
-        if not_updated_build:
-            pack.status = PackStatus.PACK_IS_NOT_UPDATED_IN_RUNNING_BUILD.name
-            pack.cleanup()
-            continue
-
-        sign_and_zip_pack(pack, signature_key, remove_test_playbooks)
-
-        task_status, skipped_upload, _ = pack.upload_to_storage(pack.zip_path, pack.latest_version, storage_bucket,
-                                                                override_all_packs or pack.is_modified,
-                                                                storage_base_path)
-
-        if not task_status:
-            pack.status = PackStatus.FAILED_UPLOADING_PACK.name
-            pack.cleanup()
-            continue
-
-        task_status, exists_in_index = pack.check_if_exists_in_index(index_folder_path)
-        if not task_status:
-            pack.status = PackStatus.FAILED_SEARCHING_PACK_IN_INDEX.name
-            pack.cleanup()
-            continue
-
-        task_status = pack.prepare_for_index_upload()
-        if not task_status:
-            pack.status = PackStatus.FAILED_PREPARING_INDEX_FOLDER.name
-            pack.cleanup()
-            continue
-
-        task_status = update_index_folder(index_folder_path=index_folder_path, pack_name=pack.name, pack_path=pack.path,
-                                          pack_version=pack.latest_version, hidden_pack=pack.hidden)
-        if not task_status:
-            pack.status = PackStatus.FAILED_UPDATING_INDEX_FOLDER.name
-            pack.cleanup()
-            continue
-
-        # in case that pack already exist at cloud storage path and in index, don't show that the pack was changed
-        if skipped_upload and exists_in_index and pack not in packs_with_missing_dependencies:
-            pack.status = PackStatus.PACK_ALREADY_EXISTS.name
-            pack.cleanup()
-            continue
-
-        pack.status = PackStatus.SUCCESS.name
+            if not task_status:
+                continue
 
-    logging.info(f"packs_with_missing_dependencies: {packs_with_missing_dependencies}")
+            update_pack_in_index(pack, index_folder_path, skipped_upload, is_missing_dependencies)
 
-    # Going over all packs that were marked as missing dependencies,
-    # updating them with the new data for the new packs that were added to the index.zip
-    for pack in packs_with_missing_dependencies:
-        task_status, _ = pack.format_metadata(index_folder_path, packs_dependencies_mapping,
-                                              build_number, current_commit_hash, statistics_handler,
-                                              packs_for_current_marketplace_dict, marketplace,
-                                              format_dependencies_only=True)
+        logging.info(f"packs_with_missing_dependencies: {packs_with_missing_dependencies}")
 
-        if not task_status:
-            pack.status = PackStatus.FAILED_METADATA_REFORMATING.name
-            pack.cleanup()
-            continue
+        # Going over all packs that were marked as missing dependencies,
+        # updating them with the new data for the new packs that were added to the index.zip
+        for pack in packs_with_missing_dependencies:
+            task_status, _ = pack.format_metadata(index_folder_path, packs_dependencies_mapping,
+                                                  build_number, current_commit_hash, statistics_handler,
+                                                  packs_for_current_marketplace_dict, marketplace,
+                                                  format_dependencies_only=True)
 
-        task_status = update_index_folder(index_folder_path=index_folder_path, pack_name=pack.name, pack_path=pack.path,
-                                          pack_version=pack.latest_version, hidden_pack=pack.hidden)
-        if not task_status:
-            pack.status = PackStatus.FAILED_UPDATING_INDEX_FOLDER.name
-            pack.cleanup()
-            continue
+            if not task_status:
+                pack.status = PackStatus.FAILED_METADATA_REFORMATING.name
+                pack.cleanup()
+                continue
 
-        pack.status = PackStatus.SUCCESS.name
-
-    # upload core packs json to bucket
-    create_corepacks_config(storage_bucket, build_number, index_folder_path,
-                            os.path.dirname(packs_artifacts_path), storage_base_path, marketplace)
-
-    # finished iteration over content packs
-    upload_index_to_storage(index_folder_path=index_folder_path, extract_destination_path=extract_destination_path,
-                            index_blob=index_blob, build_number=build_number, private_packs=private_packs,
-                            current_commit_hash=current_commit_hash, index_generation=index_generation,
-                            force_upload=force_upload, previous_commit_hash=previous_commit_hash,
-                            landing_page_sections=statistics_handler.landing_page_sections,
-                            artifacts_dir=os.path.dirname(packs_artifacts_path),
-                            storage_bucket=storage_bucket)
-
-    # get the lists of packs divided by their status
-    successful_packs, skipped_packs, failed_packs = get_packs_summary(packs_list)
-
-    # Store successful and failed packs list in CircleCI artifacts - to be used in Upload Packs To Marketplace job
-    packs_results_file_path = os.path.join(os.path.dirname(packs_artifacts_path), BucketUploadFlow.PACKS_RESULTS_FILE)
-    store_successful_and_failed_packs_in_ci_artifacts(
-        packs_results_file_path, BucketUploadFlow.PREPARE_CONTENT_FOR_TESTING, successful_packs, failed_packs,
-        updated_private_packs_ids, images_data=get_images_data(packs_list)
-    )
+            task_status = update_index_folder(index_folder_path=index_folder_path, pack_name=pack.name, pack_path=pack.path,
+                                              pack_version=pack.latest_version, hidden_pack=pack.hidden)
+            if not task_status:
+                pack.status = PackStatus.FAILED_UPDATING_INDEX_FOLDER.name
+                pack.cleanup()
+                continue
+
+            pack.status = PackStatus.SUCCESS.name
+
+        # upload core packs json to bucket
+        create_corepacks_config(storage_bucket, build_number, index_folder_path,
+                                os.path.dirname(packs_artifacts_path), storage_base_path, marketplace)
+
+        # finished iteration over content packs
+        upload_index_to_storage(index_folder_path=index_folder_path, extract_destination_path=extract_destination_path,
+                                index_blob=index_blob, build_number=build_number, private_packs=private_packs,
+                                current_commit_hash=current_commit_hash, index_generation=index_generation,
+                                force_upload=force_upload, previous_commit_hash=previous_commit_hash,
+                                landing_page_sections=statistics_handler.landing_page_sections,
+                                artifacts_dir=os.path.dirname(packs_artifacts_path),
+                                storage_bucket=storage_bucket, index_cache_path=index_cache_path)
+
+        # get the lists of packs divided by their status
+        successful_packs, skipped_packs, failed_packs = get_packs_summary(packs_list)
+
+        # Store successful and failed packs list in CircleCI artifacts - to be used in Upload Packs To Marketplace job
+        packs_results_file_path = os.path.join(os.path.dirname(packs_artifacts_path), BucketUploadFlow.PACKS_RESULTS_FILE)
+        store_successful_and_failed_packs_in_ci_artifacts(
+            packs_results_file_path, BucketUploadFlow.PREPARE_CONTENT_FOR_TESTING, successful_packs, failed_packs,
+            updated_private_packs_ids, images_data=get_images_data(packs_list)
+        )
 
-    # summary of packs status
-    print_packs_summary(successful_packs, skipped_packs, failed_packs, not is_bucket_upload_flow)
+        # summary of packs status
+        print_packs_summary(successful_packs, skipped_packs, failed_packs, not is_bucket_upload_flow)
 
-    # marketplace v2 isn't currently supported - dependencies zip should only be used for v1
-    if is_create_dependencies_zip and marketplace == 'xsoar':
-        # handle packs with dependencies zip
-        upload_packs_with_dependencies_zip(signature_key, storage_bucket, storage_base_path,
-                                           packs_for_current_marketplace_dict)
+        # marketplace v2 isn't currently supported - dependencies zip should only be used for v1
+        if is_create_dependencies_zip and marketplace == 'xsoar':
+            # handle packs with dependencies zip
+            upload_packs_with_dependencies_zip(signature_key, storage_bucket, storage_base_path,
+                                               packs_for_current_marketplace_dict, zip_cache_path, storage_executor)
 
 
 if __name__ == '__main__':
@@ -4,12 +4,13 @@ This script is used to create a filter_file.txt file which will run only the nee
 Overview can be found at: https://confluence.paloaltonetworks.com/display/DemistoContent/Configure+Test+Filter
 """
 import argparse
+import gc
 import glob
 import json
 import re
-from copy import deepcopy
+from functools import lru_cache
 from packaging.version import Version
-from typing import Dict, Tuple, Optional
+from typing import Any, Dict, Tuple, Optional
 
 import os
 import sys
@@ -104,6 +105,7 @@ class TestConf(object):
 
     def get_packs_of_tested_integrations(self, collected_tests, id_set):
         packs = set([])
+        id_set = IdSetIndex.of(id_set)
         tested_integrations = self.get_tested_integrations_for_collected_tests(collected_tests)
         for integration in tested_integrations:
             try:
@@ -130,21 +132,158 @@ class TestConf(object):
         return test_playbooks
 
 
+class IdSetIndex(dict):
+    """The id_set json, together with lookup tables of its entities.
+
+    The lookup tables are built once, so finding an entity by its id, name, file path or by the entities it uses does
+    not scan the id_set lists. Every table entry is a (position, entity id, entity data) tuple, where position is the
+    index of the entity in the id_set, so entries can be processed in the same order as the id_set lists.
+    The id_set must not be modified after the index is created.
+    """
+
+    def __init__(self, id_set: dict) -> None:
+        super().__init__(id_set)
+        self._entities_by_id: Dict[str, Dict[str, list]] = {}
+        self._entities_by_name: Dict[str, Dict[str, list]] = {}
+        self.entities_by_file_path: Dict[str, list] = {}
+        self.integrations_by_api_module: Dict[str, list] = {}
+        # reverse lookups of the non deprecated playbooks and scripts, used to find the entities affected by a change
+        self.playbooks_by_implementing_playbook: Dict[str, list] = {}
+        self.playbooks_by_implementing_script: Dict[str, list] = {}
+        self.playbooks_by_command: Dict[str, list] = {}
+        self.scripts_by_script_execution: Dict[str, list] = {}
+        self.scripts_by_depends_on: Dict[str, list] = {}
+        # reverse lookups of the test playbooks, used to find the tests of the affected entities
+        self.test_playbooks_by_implementing_script: Dict[str, list] = {}
+        self.test_playbooks_by_implementing_playbook: Dict[str, list] = {}
+        self.test_playbooks_by_command: Dict[str, list] = {}
+
+        is_packs_list_reached = False
+        position = 0
+        for entity_type, entities in id_set.items():
+            # Ignore the Packs list in the ID set and the lists which come after it
+            is_packs_list_reached = is_packs_list_reached or isinstance(entities, dict)
+            if isinstance(entities, dict):
+                continue
+
+            entities_by_id = self._entities_by_id.setdefault(entity_type, {})
+            entities_by_name = self._entities_by_name.setdefault(entity_type, {})
+            for entity in entities:
+                position += 1
+                for entity_id, entity_data in entity.items():
+                    entry = (position, entity_id, entity_data)
+                    entities_by_id.setdefault(entity_id, []).append(entry)
+                    entities_by_name.setdefault(entity_data.get('name'), []).append(entry)
+                    if not is_packs_list_reached:
+                        self._add_entry(self.entities_by_file_path, [entity_data.get('file_path')], entry)
+                    self._index_entity_usage(entity_type, entry)
+
+    @staticmethod
+    def _add_entry(table: Dict[str, list], keys, entry: tuple):
+        for key in keys:
+            table.setdefault(key, []).append(entry)
+
+    def _index_entity_usage(self, entity_type: str, entry: tuple):
+        entity_data = entry[2]
+        if entity_type == 'integrations':
+            api_module = entity_data.get('api_modules')
+            if isinstance(api_module, str):
+                self._add_entry(self.integrations_by_api_module, [api_module], entry)
+
+        elif entity_type == 'TestPlaybooks':
+            self._add_entry(self.test_playbooks_by_implementing_script, entity_data.get('implementing_scripts', []),
+                            entry)
+            self._add_entry(self.test_playbooks_by_implementing_playbook,
+                            entity_data.get('implementing_playbooks', []), entry)
+            self._add_entry(self.test_playbooks_by_command, entity_data.get('command_to_integration', {}).keys(),
+                            entry)
+
+        elif entity_data.get('deprecated', False):
+            return
+
+        elif entity_type == 'playbooks':
+            self._add_entry(self.playbooks_by_implementing_playbook, entity_data.get('implementing_playbooks', []),
+                            entry)
+            self._add_entry(self.playbooks_by_implementing_script, entity_data.get('implementing_scripts', []), entry)
+            self._add_entry(self.playbooks_by_command, entity_data.get('command_to_integration', {}).keys(), entry)
+
+        elif entity_type == 'scripts':
+            self._add_entry(self.scripts_by_script_execution, entity_data.get('script_executions', []), entry)
+            self._add_entry(self.scripts_by_depends_on, entity_data.get('depends_on', []), entry)
+
+    @classmethod
+    def load(cls, id_set_path: str) -> 'IdSetIndex':
+        """Loads and indexes the id_set json file.
+
+        Args:
+            id_set_path (str): Path to the id_set json file.
+
+        Returns:
+            IdSetIndex. The indexed id_set.
+        """
+        # the id_set is loaded into many objects which live until the end of the run, so garbage collection passes
+        # while loading it only add time
+        is_gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(id_set_path, 'r') as id_set_file:
+                return cls(json.load(id_set_file))
+        finally:
+            if is_gc_enabled:
+                gc.enable()
+
+    @classmethod
+    def of(cls, id_set: dict) -> 'IdSetIndex':
+        """Returns the given id_set if it is already indexed, otherwise indexes it."""
+        return id_set if isinstance(id_set, cls) else cls(id_set)
+
+    @staticmethod
+    def merge_entries(table: Dict[str, list], keys) -> list:
+        """Returns the entries of all the given keys in the table, without duplicates and by their id_set order."""
+        entries_by_position = {entry[0]: entry for key in keys for entry in table.get(key, [])}
+        return [entries_by_position[position] for position in sorted(entries_by_position)]
+
+    def get_entities_by_id(self, entity_type: str, entity_id: str) -> list:
+        return self._entities_by_id.get(entity_type, {}).get(entity_id, [])
+
+    def get_entities_by_name(self, entity_type: str, entity_name: str) -> list:
+        return self._entities_by_name.get(entity_type, {}).get(entity_name, [])
+
+    def get_entities_by_ids(self, entity_type: str, entity_ids) -> list:
+        return self.merge_entries(self._entities_by_id.get(entity_type, {}), entity_ids)
+
+    def get_entities_by_names(self, entity_type: str, entity_names) -> list:
+        return self.merge_entries(self._entities_by_name.get(entity_type, {}), entity_names)
+
+    def get_matching_entity(self, entity_type: str, entity_id_or_name: str, server_version: str = '0'):
+        """Gets first occurrence of entity with matching id/name and valid from/to version"""
+        entries = self.get_entities_by_id(entity_type, entity_id_or_name) + [
+            entry for entry in self.get_entities_by_name(entity_type, entity_id_or_name)
+            # entities are matched by name only if they can't be matched by id
+            if entry[1] != entity_id_or_name
+        ]
+        for _, _, entity_data in sorted(entries, key=lambda entry: entry[0]):
+            fromversion = entity_data.get('fromversion', '0.0')
+            toversion = entity_data.get('toversion', '99.99.99')
+            if is_runnable_in_server_version(from_v=fromversion, server_v=server_version, to_v=toversion):
+                return entity_data
+        return None
+
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 CONTENT_DIR = os.path.abspath(SCRIPT_DIR + '/../..')
 sys.path.append(CONTENT_DIR)
 
 # Global used to indicate if failed during any of the validation states
 _FAILED = False
-ID_SET = {}
+ID_SET: Dict[str, Any] = {}
 CONF: TestConf = None  # type: ignore[assignment]
 
 ARTIFACTS_FOLDER = os.getenv('ARTIFACTS_FOLDER', './artifacts')
 ARTIFACTS_ID_SET_PATH = os.path.join(ARTIFACTS_FOLDER, 'id_set.json')
 ARTIFACTS_CONF_PATH = os.path.join(ARTIFACTS_FOLDER, 'conf.json')
 if os.path.isfile(ARTIFACTS_ID_SET_PATH):
-    with open(ARTIFACTS_ID_SET_PATH, 'r') as conf_file:
-        ID_SET = json.load(conf_file)
+    ID_SET = IdSetIndex.load(ARTIFACTS_ID_SET_PATH)
 
 if os.path.isfile(ARTIFACTS_CONF_PATH):
     with open(ARTIFACTS_CONF_PATH, 'r') as conf_file:
@@ -183,6 +322,12 @@ def get_tests(file_path):
     return []
 
 
+@lru_cache(maxsize=None)
+def has_unit_tests(package_path):
+    """Checks whether the script or integration package has unit tests. Packages are checked once per run."""
+    return bool(glob.glob(package_path + "/*_test.py"))
+
+
 def collect_tests_and_content_packs(
         script_ids,
         playbook_ids,
@@ -190,8 +335,8 @@ def collect_tests_and_content_packs(
         catched_scripts,
         catched_playbooks,
         tests_set,
-        id_set=deepcopy(ID_SET),
-        conf=deepcopy(CONF)
+        id_set=None,
+        conf=None
 ):
     """Collect tests for the affected script_ids,playbook_ids,integration_ids.
 
@@ -206,6 +351,8 @@ def collect_tests_and_content_packs(
 
     :return: (test_ids, missing_ids) - All the names of possible tests, the ids we didn't match a test for.
     """
+    id_set = IdSetIndex.of(ID_SET if id_set is None else id_set)
+    conf = CONF if conf is None else conf
     caught_missing_test = False
     catched_intergrations = set([])
 
@@ -213,42 +360,35 @@ def collect_tests_and_content_packs(
     skipped_tests = conf.get_skipped_tests()
     skipped_integrations = conf.get_skipped_integrations()
 
-    integration_set = id_set['integrations']
-    test_playbooks_set = id_set['TestPlaybooks']
-    integration_to_command, _ = get_integration_commands(integration_ids, integration_set)
+    integration_to_command, _ = get_integration_commands(integration_ids, id_set)
+    detected_test_playbooks = {}
 
-    for test_playbook in test_playbooks_set:
-        detected_usage = False
-        test_playbook_id = list(test_playbook.keys())[0]
-        test_playbook_data = list(test_playbook.values())[0]
-        test_playbook_name = test_playbook_data.get('name')
+    for script in script_ids:
+        for test_playbook_entry in id_set.test_playbooks_by_implementing_script.get(script, []):
+            detected_test_playbooks[test_playbook_entry[0]] = test_playbook_entry
+            tests_set.add(test_playbook_entry[1])
+            catched_scripts.add(script)
 
-        for script in test_playbook_data.get('implementing_scripts', []):
-            if script in script_ids:
-                detected_usage = True
-                tests_set.add(test_playbook_id)
-                catched_scripts.add(script)
+    for playbook in playbook_ids:
+        for test_playbook_entry in id_set.test_playbooks_by_implementing_playbook.get(playbook, []):
+            detected_test_playbooks[test_playbook_entry[0]] = test_playbook_entry
+            tests_set.add(test_playbook_entry[1])
+            catched_playbooks.add(playbook)
 
-        for playbook in test_playbook_data.get('implementing_playbooks', []):
-            if playbook in playbook_ids:
-                detected_usage = True
-                tests_set.add(test_playbook_id)
-                catched_playbooks.add(playbook)
-
-        if integration_to_command:
-            command_to_integration = test_playbook_data.get('command_to_integration', {})
-            for command in test_playbook_data.get('command_to_integration', {}).keys():
-                for integration_id, integration_commands in integration_to_command.items():
-                    if command in integration_commands:
-                        if not command_to_integration.get(command) or \
-                                command_to_integration.get(command) == integration_id:
-                            detected_usage = True
-                            tests_set.add(test_playbook_id)
-                            catched_intergrations.add(integration_id)
-
-        if detected_usage and test_playbook_id not in test_ids and test_playbook_id not in skipped_tests:
+    for integration_id, integration_commands in integration_to_command.items():
+        for command in integration_commands:
+            for test_playbook_entry in id_set.test_playbooks_by_command.get(command, []):
+                command_to_integration = test_playbook_entry[2].get('command_to_integration', {})
+                if not command_to_integration.get(command) or command_to_integration.get(command) == integration_id:
+                    detected_test_playbooks[test_playbook_entry[0]] = test_playbook_entry
+                    tests_set.add(test_playbook_entry[1])
+                    catched_intergrations.add(integration_id)
+
+    for position in sorted(detected_test_playbooks):
+        _, test_playbook_id, test_playbook_data = detected_test_playbooks[position]
+        if test_playbook_id not in test_ids and test_playbook_id not in skipped_tests:
             caught_missing_test = check_if_test_should_not_be_missed(test_playbook_data.get('file_path', ''),
-                                                                     test_playbook_name)
+                                                                     test_playbook_data.get('name'))
 
     ids_with_no_tests = update_missing_sets(catched_intergrations, catched_playbooks, catched_scripts,
                                             integration_ids, playbook_ids, script_ids)
@@ -256,20 +396,16 @@ def collect_tests_and_content_packs(
     # remove skipped integrations from the list
     ids_with_no_tests = ids_with_no_tests - set(skipped_integrations)
     packs_to_install = set()
-    id_set_test_playbooks = id_set.get('TestPlaybooks', [])
-    for test_playbook in id_set_test_playbooks:
-        test_playbook_id = list(test_playbook.keys())[0]
-        test_playbook_object = test_playbook[test_playbook_id]
-        if test_playbook_id in tests_set:
-            test_playbook_pack = test_playbook_object.get('pack')
-            if test_playbook_pack:
-                logging.info(
-                    f'Found test playbook "{test_playbook_id}" in pack "{test_playbook_pack}"'
-                    f' - adding to packs to install')
-                packs_to_install.add(test_playbook_pack)
-            else:
-                logging.warning(f'Found test playbook "{test_playbook_id}" without pack'
-                                f' - not adding to packs to install')
+    for _, test_playbook_id, test_playbook_object in id_set.get_entities_by_ids('TestPlaybooks', tests_set):
+        test_playbook_pack = test_playbook_object.get('pack')
+        if test_playbook_pack:
+            logging.info(
+                f'Found test playbook "{test_playbook_id}" in pack "{test_playbook_pack}"'
+                f' - adding to packs to install')
+            packs_to_install.add(test_playbook_pack)
+        else:
+            logging.warning(f'Found test playbook "{test_playbook_id}" without pack'
+                            f' - not adding to packs to install')
 
     return test_ids, ids_with_no_tests, caught_missing_test, packs_to_install
 
@@ -306,22 +442,20 @@ def update_missing_sets(catched_intergrations, catched_playbooks, catched_script
     return missing_ids
 
 
-def get_integration_commands(integration_ids, integration_set):
+def get_integration_commands(integration_ids, id_set):
     integration_to_command = {}
     deprecated_message = ''
     deprecated_commands_string = ''
-    for integration in integration_set:
-        integration_id = list(integration.keys())[0]
-        integration_data = list(integration.values())[0]
-        if integration_id in integration_ids:
-            integration_commands = set(integration_data.get('commands', []))
-            integration_deprecated_commands = set(integration_data.get('deprecated_commands', []))
-            if integration_deprecated_commands:
-                deprecated_names = ', '.join(integration_deprecated_commands)
-                deprecated_commands_string += '{}: {}\n'.format(integration_id, deprecated_names)
-
-            relevant_commands = list(integration_commands - integration_deprecated_commands)
-            integration_to_command[integration_id] = relevant_commands
+    integrations = IdSetIndex.of(id_set).get_entities_by_ids('integrations', integration_ids)
+    for _, integration_id, integration_data in integrations:
+        integration_commands = set(integration_data.get('commands', []))
+        integration_deprecated_commands = set(integration_data.get('deprecated_commands', []))
+        if integration_deprecated_commands:
+            deprecated_names = ', '.join(integration_deprecated_commands)
+            deprecated_commands_string += '{}: {}\n'.format(integration_id, deprecated_names)
+
+        relevant_commands = list(integration_commands - integration_deprecated_commands)
+        integration_to_command[integration_id] = relevant_commands
 
     if deprecated_commands_string:
         deprecated_message = 'The following integration commands are deprecated and are not taken ' \
@@ -337,17 +471,15 @@ def is_integration_fetching_incidents(integration_yml_path):
 
 
 def id_set__get_test_playbook(id_set, test_playbook_id):
-    for test_playbook in id_set.get('TestPlaybooks', []):
-        if test_playbook_id in test_playbook.keys():
-            return test_playbook[test_playbook_id]
+    for _, _, test_playbook in IdSetIndex.of(id_set).get_entities_by_id('TestPlaybooks', test_playbook_id):
+        return test_playbook
 
     return None
 
 
 def id_set__get_integration_file_path(id_set, integration_id):
-    for integration in id_set.get('integrations', []):
-        if integration_id in integration.keys():
-            return integration[integration_id]['file_path']
+    for _, _, integration in IdSetIndex.of(id_set).get_entities_by_id('integrations', integration_id):
+        return integration['file_path']
 
     logging.critical(f'Could not find integration "{integration_id}" in the id_set')
     return None
@@ -380,7 +512,9 @@ def check_if_fetch_incidents_is_tested(missing_ids, integration_ids, id_set, con
     return missing_ids, tests_set
 
 
-def find_tests_and_content_packs_for_modified_files(modified_files, conf=deepcopy(CONF), id_set=deepcopy(ID_SET)):
+def find_tests_and_content_packs_for_modified_files(modified_files, conf=None, id_set=None):
+    conf = CONF if conf is None else conf
+    id_set = IdSetIndex.of(ID_SET if id_set is None else id_set)
     script_names: set = set([])
     playbook_names: set = set([])
     integration_ids: set = set([])
@@ -447,52 +581,42 @@ def collect_content_packs_to_install(id_set: Dict, integration_ids: set, playboo
         set. Pack names to install.
     """
     packs_to_install = set()
+    id_set = IdSetIndex.of(id_set)
+
+    for _, integration_id, integration_object in id_set.get_entities_by_ids('integrations', integration_ids):
+        integration_pack = integration_object.get('pack')
+        if integration_pack:
+            logging.info(
+                f'Found integration {integration_id} in pack {integration_pack} - adding to packs to install')
+            packs_to_install.add(integration_object.get('pack'))
+        else:
+            logging.warning(f'Found integration {integration_id} without pack - not adding to packs to install')
 
-    id_set_integrations = id_set.get('integrations', [])
-    for integration in id_set_integrations:
-        integration_id = list(integration.keys())[0]
-        integration_object = integration[integration_id]
-        if integration_id in integration_ids:
-            integration_pack = integration_object.get('pack')
-            if integration_pack:
-                logging.info(
-                    f'Found integration {integration_id} in pack {integration_pack} - adding to packs to install')
-                packs_to_install.add(integration_object.get('pack'))
-            else:
-                logging.warning(f'Found integration {integration_id} without pack - not adding to packs to install')
-
-    id_set_playbooks = id_set.get('playbooks', [])
-    for playbook in id_set_playbooks:
-        playbook_object = list(playbook.values())[0]
+    for _, _, playbook_object in id_set.get_entities_by_names('playbooks', playbook_names):
         playbook_name = playbook_object.get('name')
-        if playbook_name in playbook_names:
-            playbook_pack = playbook_object.get('pack')
-            if playbook_pack:
-                logging.info(f'Found playbook {playbook_name} in pack {playbook_pack} - adding to packs to install')
-                packs_to_install.add(playbook_pack)
-            else:
-                logging.warning(f'Found playbook {playbook_name} without pack - not adding to packs to install')
-
-    id_set_script = id_set.get('scripts', [])
-    for script in id_set_script:
-        script_id = list(script.keys())[0]
-        script_object = script[script_id]
-        if script_id in script_names:
-            script_pack = script_object.get('pack')
-            if script_pack:
-                logging.info(f'Found script {script_id} in pack {script_pack} - adding to packs to install')
-                packs_to_install.add(script_object.get('pack'))
-            else:
-                logging.warning(f'Found script {script_id} without pack - not adding to packs to install')
+        playbook_pack = playbook_object.get('pack')
+        if playbook_pack:
+            logging.info(f'Found playbook {playbook_name} in pack {playbook_pack} - adding to packs to install')
+            packs_to_install.add(playbook_pack)
+        else:
+            logging.warning(f'Found playbook {playbook_name} without pack - not adding to packs to install')
+
+    for _, script_id, script_object in id_set.get_entities_by_ids('scripts', script_names):
+        script_pack = script_object.get('pack')
+        if script_pack:
+            logging.info(f'Found script {script_id} in pack {script_pack} - adding to packs to install')
+            packs_to_install.add(script_object.get('pack'))
+        else:
+            logging.warning(f'Found script {script_id} without pack - not adding to packs to install')
 
     return packs_to_install
 
 
-def get_api_module_integrations(changed_api_modules, integration_set):
+def get_api_module_integrations(changed_api_modules, id_set):
     integration_to_version = {}
     integration_ids_to_test = set([])
-    for integration in integration_set:
-        integration_data = list(integration.values())[0]
+    integrations = IdSetIndex.merge_entries(IdSetIndex.of(id_set).integrations_by_api_module, changed_api_modules)
+    for _, _, integration_data in integrations:
         if integration_data.get('api_modules', '') in changed_api_modules:
             file_path = integration_data.get('file_path')
             integration_id = tools.get_script_or_integration_id(file_path)
@@ -503,7 +627,8 @@ def get_api_module_integrations(changed_api_modules, integration_set):
     return integration_ids_to_test, integration_to_version
 
 
-def collect_changed_ids(integration_ids, playbook_names, script_names, modified_files, id_set=deepcopy(ID_SET)):
+def collect_changed_ids(integration_ids, playbook_names, script_names, modified_files, id_set=None):
+    id_set = IdSetIndex.of(ID_SET if id_set is None else id_set)
     tests_set: set = set([])
     updated_script_names: set = set([])
     updated_playbook_names: set = set([])
@@ -521,7 +646,7 @@ def collect_changed_ids(integration_ids, playbook_names, script_names, modified_
             script_to_version[name] = (tools.get_from_version(file_path), tools.get_to_version(file_path))
 
             package_name = os.path.dirname(file_path)
-            if glob.glob(package_name + "/*_test.py"):
+            if has_unit_tests(package_name):
                 catched_scripts.add(name)
                 tests_set.add('Found a unittest for the script {}'.format(package_name))
 
@@ -539,33 +664,27 @@ def collect_changed_ids(integration_ids, playbook_names, script_names, modified_
             api_module_name = tools.get_script_or_integration_id(file_path)
             changed_api_modules.add(api_module_name)
 
-    script_set = id_set['scripts']
-    playbook_set = id_set['playbooks']
-    integration_set = id_set['integrations']
-
     if changed_api_modules:
         integration_ids_to_test, integration_to_version_to_add = get_api_module_integrations(changed_api_modules,
-                                                                                             integration_set)
+                                                                                             id_set)
         integration_ids = integration_ids.union(integration_ids_to_test)
         integration_to_version = {**integration_to_version, **integration_to_version_to_add}
 
-    deprecated_msgs = exclude_deprecated_entities(script_set, script_names,
-                                                  playbook_set, playbook_names,
-                                                  integration_set, integration_ids)
+    deprecated_msgs = exclude_deprecated_entities(id_set, script_names, playbook_names, integration_ids)
 
     for script_id in script_names:
-        enrich_for_script_id(script_id, script_to_version[script_id], script_names, script_set, playbook_set,
-                             playbook_names, updated_script_names, updated_playbook_names, catched_scripts,
-                             catched_playbooks, tests_set)
+        enrich_for_script_id(script_id, script_to_version[script_id], script_names, id_set, playbook_names,
+                             updated_script_names, updated_playbook_names, catched_scripts, catched_playbooks,
+                             tests_set)
 
-    integration_to_command, deprecated_commands_message = get_integration_commands(integration_ids, integration_set)
+    integration_to_command, deprecated_commands_message = get_integration_commands(integration_ids, id_set)
     for integration_id, integration_commands in integration_to_command.items():
         enrich_for_integration_id(integration_id, integration_to_version[integration_id], integration_commands,
-                                  script_set, playbook_set, playbook_names, script_names, updated_script_names,
+                                  id_set, playbook_names, script_names, updated_script_names,
                                   updated_playbook_names, catched_scripts, catched_playbooks, tests_set)
 
     for playbook_id in playbook_names:
-        enrich_for_playbook_id(playbook_id, playbook_to_version[playbook_id], playbook_names, script_set, playbook_set,
+        enrich_for_playbook_id(playbook_id, playbook_to_version[playbook_id], playbook_names, id_set,
                                updated_playbook_names, catched_playbooks, tests_set)
 
     for new_script in updated_script_names:
@@ -599,20 +718,17 @@ def collect_changed_ids(integration_ids, playbook_names, script_names, modified_
     return tests_set, catched_scripts, catched_playbooks, packs_to_install
 
 
-def exclude_deprecated_entities(script_set, script_names,
-                                playbook_set, playbook_names,
-                                integration_set, integration_ids):
+def exclude_deprecated_entities(id_set, script_names, playbook_names, integration_ids):
     """Removes deprecated entities from the affected entities sets.
 
-    :param script_set: The set of existing scripts within Content repo.
+    :param id_set: The id_set json.
     :param script_names: The names of the affected scripts in your change set.
-    :param playbook_set: The set of existing playbooks within Content repo.
     :param playbook_names: The ids of the affected playbooks in your change set.
-    :param integration_set: The set of existing integrations within Content repo.
     :param integration_ids: The ids of the affected integrations in your change set.
 
     :return: deprecated_messages_dict - A dict of messages specifying of all the deprecated entities.
     """
+    id_set = IdSetIndex.of(id_set)
     deprecated_messages_dict = {
         'scripts': '',
         'playbooks': '',
@@ -626,21 +742,21 @@ def exclude_deprecated_entities(script_set, script_names,
     }
 
     # Iterates over three types of entities: scripts, playbooks and integrations and removes deprecated entities
-    for entity_set, entity_names, entity_type in [(script_set, script_names, 'scripts'),
-                                                  (playbook_set, playbook_names, 'playbooks'),
-                                                  (integration_set, integration_ids, 'integrations')]:
-        for entity in entity_set:
-            # integrations are defined by their ids while playbooks and scripts and scripts are defined by names
-            if entity_type == 'integrations':
-                entity_name = list(entity.keys())[0]
-            else:
-                entity_name = list(entity.values())[0].get('name', '')
+    for entity_names, entity_type in [(script_names, 'scripts'),
+                                      (playbook_names, 'playbooks'),
+                                      (integration_ids, 'integrations')]:
+        # integrations are defined by their ids while playbooks and scripts and scripts are defined by names
+        if entity_type == 'integrations':
+            entities = [(entity_id, entity_data) for _, entity_id, entity_data in
+                        id_set.get_entities_by_ids(entity_type, entity_names)]
+        else:
+            entities = [(entity_data.get('name', ''), entity_data) for _, _, entity_data in
+                        id_set.get_entities_by_names(entity_type, entity_names)]
 
-            if entity_name in entity_names:
-                entity_data = list(entity.values())[0]
-                if entity_data.get('deprecated', False):
-                    deprecated_entities_strings_dict[entity_type] += entity_name + '\n'
-                    entity_names.remove(entity_name)
+        for entity_name, entity_data in entities:
+            if entity_name in entity_names and entity_data.get('deprecated', False):
+                deprecated_entities_strings_dict[entity_type] += entity_name + '\n'
+                entity_names.remove(entity_name)
 
         if deprecated_entities_strings_dict[entity_type]:
             deprecated_messages_dict[entity_type] = 'The following {} are deprecated ' \
@@ -651,16 +767,15 @@ def exclude_deprecated_entities(script_set, script_names,
     return deprecated_messages_dict
 
 
-def enrich_for_integration_id(integration_id, given_version, integration_commands, script_set, playbook_set,
-                              playbook_names, script_names, updated_script_names, updated_playbook_names,
-                              catched_scripts, catched_playbooks, tests_set):
+def enrich_for_integration_id(integration_id, given_version, integration_commands, id_set, playbook_names,
+                              script_names, updated_script_names, updated_playbook_names, catched_scripts,
+                              catched_playbooks, tests_set):
     """Enrich the list of affected scripts/playbooks by your change set.
 
     :param integration_id: The name of the integration we changed.
     :param given_version: the version of the integration we changed.
     :param integration_commands: The commands of the changed integation
-    :param script_set: The set of existing scripts within Content repo.
-    :param playbook_set: The set of existing playbooks within Content repo.
+    :param id_set: The indexed id_set json.
     :param playbook_names: The names of the playbooks affected by your changes.
     :param script_names: The names of the scripts affected by your changes.
     :param updated_script_names: The names of scripts we identify as affected to your change set.
@@ -669,10 +784,7 @@ def enrich_for_integration_id(integration_id, given_version, integration_command
     :param catched_playbooks: The names of playbooks we found tests for.
     :param tests_set: The names of the caught tests.
     """
-    for playbook in playbook_set:
-        playbook_data = list(playbook.values())[0]
-        if playbook_data.get('deprecated', False):
-            continue
+    for _, _, playbook_data in IdSetIndex.merge_entries(id_set.playbooks_by_command, integration_commands):
         playbook_name = playbook_data.get('name')
         playbook_fromversion = playbook_data.get('fromversion', '0.0.0')
         playbook_toversion = playbook_data.get('toversion', '99.99.99')
@@ -691,13 +803,10 @@ def enrich_for_integration_id(integration_id, given_version, integration_command
 
                         updated_playbook_names.add(playbook_name)
                         new_versions = (playbook_fromversion, playbook_toversion)
-                        enrich_for_playbook_id(playbook_name, new_versions, playbook_names, script_set, playbook_set,
+                        enrich_for_playbook_id(playbook_name, new_versions, playbook_names, id_set,
                                                updated_playbook_names, catched_playbooks, tests_set)
 
-    for script in script_set:
-        script_data = list(script.values())[0]
-        if script_data.get('deprecated', False):
-            continue
+    for _, _, script_data in IdSetIndex.merge_entries(id_set.scripts_by_depends_on, integration_commands):
         script_name = script_data.get('name')
         script_file_path = script_data.get('file_path')
         script_fromversion = script_data.get('fromversion', '0.0.0')
@@ -716,28 +825,24 @@ def enrich_for_integration_id(integration_id, given_version, integration_command
                             update_test_set(tests, tests_set)
 
                         package_name = os.path.dirname(script_file_path)
-                        if glob.glob(package_name + "/*_test.py"):
+                        if has_unit_tests(package_name):
                             catched_scripts.add(script_name)
                             tests_set.add('Found a unittest for the script {}'.format(script_name))
 
                         updated_script_names.add(script_name)
                         new_versions = (script_fromversion, script_toversion)
-                        enrich_for_script_id(script_name, new_versions, script_names, script_set, playbook_set,
-                                             playbook_names, updated_script_names, updated_playbook_names,
-                                             catched_scripts, catched_playbooks, tests_set)
+                        enrich_for_script_id(script_name, new_versions, script_names, id_set, playbook_names,
+                                             updated_script_names, updated_playbook_names, catched_scripts,
+                                             catched_playbooks, tests_set)
 
 
-def enrich_for_playbook_id(given_playbook_id, given_version, playbook_names, script_set, playbook_set,
-                           updated_playbook_names, catched_playbooks, tests_set):
-    for playbook in playbook_set:
-        playbook_data = list(playbook.values())[0]
-        if playbook_data.get('deprecated', False):
-            continue
+def enrich_for_playbook_id(given_playbook_id, given_version, playbook_names, id_set, updated_playbook_names,
+                           catched_playbooks, tests_set):
+    for _, _, playbook_data in id_set.playbooks_by_implementing_playbook.get(given_playbook_id, []):
         playbook_name = playbook_data.get('name')
         playbook_fromversion = playbook_data.get('fromversion', '0.0.0')
         playbook_toversion = playbook_data.get('toversion', '99.99.99')
-        if given_playbook_id in playbook_data.get('implementing_playbooks', []) and \
-                playbook_toversion >= given_version[1]:
+        if playbook_toversion >= given_version[1]:
 
             if playbook_name not in playbook_names and playbook_name not in updated_playbook_names:
                 tests = set(playbook_data.get('tests', []))
@@ -747,21 +852,18 @@ def enrich_for_playbook_id(given_playbook_id, given_version, playbook_names, scr
 
                 updated_playbook_names.add(playbook_name)
                 new_versions = (playbook_fromversion, playbook_toversion)
-                enrich_for_playbook_id(playbook_name, new_versions, playbook_names, script_set, playbook_set,
-                                       updated_playbook_names, catched_playbooks, tests_set)
+                enrich_for_playbook_id(playbook_name, new_versions, playbook_names, id_set, updated_playbook_names,
+                                       catched_playbooks, tests_set)
 
 
-def enrich_for_script_id(given_script_id, given_version, script_names, script_set, playbook_set, playbook_names,
-                         updated_script_names, updated_playbook_names, catched_scripts, catched_playbooks, tests_set):
-    for script in script_set:
-        script_data = list(script.values())[0]
-        if script_data.get('deprecated', False):
-            continue
+def enrich_for_script_id(given_script_id, given_version, script_names, id_set, playbook_names, updated_script_names,
+                         updated_playbook_names, catched_scripts, catched_playbooks, tests_set):
+    for _, _, script_data in id_set.scripts_by_script_execution.get(given_script_id, []):
         script_name = script_data.get('name')
         script_file_path = script_data.get('file_path')
         script_fromversion = script_data.get('fromversion', '0.0.0')
         script_toversion = script_data.get('toversion', '99.99.99')
-        if given_script_id in script_data.get('script_executions', []) and script_toversion >= given_version[1]:
+        if script_toversion >= given_version[1]:
             if script_name not in script_names and script_name not in updated_script_names:
                 tests = set(script_data.get('tests', []))
                 if tests:
@@ -769,24 +871,21 @@ def enrich_for_script_id(given_script_id, given_version, script_names, script_se
                     update_test_set(tests, tests_set)
 
                 package_name = os.path.dirname(script_file_path)
-                if glob.glob(package_name + "/*_test.py"):
+                if has_unit_tests(package_name):
                     catched_scripts.add(script_name)
                     tests_set.add('Found a unittest for the script {}'.format(script_name))
 
                 updated_script_names.add(script_name)
                 new_versions = (script_fromversion, script_toversion)
-                enrich_for_script_id(script_name, new_versions, script_names, script_set, playbook_set, playbook_names,
+                enrich_for_script_id(script_name, new_versions, script_names, id_set, playbook_names,
                                      updated_script_names, updated_playbook_names, catched_scripts, catched_playbooks,
                                      tests_set)
 
-    for playbook in playbook_set:
-        playbook_data = list(playbook.values())[0]
-        if playbook_data.get('deprecated', False):
-            continue
+    for _, _, playbook_data in id_set.playbooks_by_implementing_script.get(given_script_id, []):
         playbook_name = playbook_data.get('name')
         playbook_fromversion = playbook_data.get('fromversion', '0.0.0')
         playbook_toversion = playbook_data.get('toversion', '99.99.99')
-        if given_script_id in playbook_data.get('implementing_scripts', []) and playbook_toversion >= given_version[1]:
+        if playbook_toversion >= given_version[1]:
             if playbook_name not in playbook_names and playbook_name not in updated_playbook_names:
                 tests = set(playbook_data.get('tests', []))
                 if tests:
@@ -795,8 +894,8 @@ def enrich_for_script_id(given_script_id, given_version, script_names, script_se
 
                 updated_playbook_names.add(playbook_name)
                 new_versions = (playbook_fromversion, playbook_toversion)
-                enrich_for_playbook_id(playbook_name, new_versions, playbook_names, script_set, playbook_set,
-                                       updated_playbook_names, catched_playbooks, tests_set)
+                enrich_for_playbook_id(playbook_name, new_versions, playbook_names, id_set, updated_playbook_names,
+                                       catched_playbooks, tests_set)
 
 
 def update_test_set(tests, tests_set):
@@ -804,8 +903,9 @@ def update_test_set(tests, tests_set):
         tests_set.add(test)
 
 
-def get_test_conf_from_conf(test_id, server_version, conf=deepcopy(CONF)):
+def get_test_conf_from_conf(test_id, server_version, conf=None):
     """Gets first occurrence of test conf with matching playbookID value to test_id with a valid from/to version"""
+    conf = CONF if conf is None else conf
     test_conf_lst = conf.get_tests()
     # return None if nothing is found
     test_conf = next((test_conf for test_conf in test_conf_lst if
@@ -816,28 +916,9 @@ def get_test_conf_from_conf(test_id, server_version, conf=deepcopy(CONF)):
     return test_conf
 
 
-def extract_matching_object_from_id_set(obj_id, obj_set, server_version='0'):
+def extract_matching_object_from_id_set(obj_id, obj_type, id_set, server_version='0'):
     """Gets first occurrence of object in the object's id_set with matching id/name and valid from/to version"""
-    for obj_wrpr in obj_set:
-        # try to get object by id
-        if obj_id in obj_wrpr:
-            obj = obj_wrpr.get(obj_id)
-
-        # try to get object by name
-        else:
-            obj_keys = list(obj_wrpr.keys())
-            if not obj_keys:
-                continue
-            obj = obj_wrpr[obj_keys[0]]
-            if obj.get('name') != obj_id:
-                continue
-
-        # check if object is runnable
-        fromversion = obj.get('fromversion', '0.0')
-        toversion = obj.get('toversion', '99.99.99')
-        if is_runnable_in_server_version(from_v=fromversion, server_v=server_version, to_v=toversion):
-            return obj
-    return None
+    return IdSetIndex.of(id_set).get_matching_entity(obj_type, obj_id, server_version)
 
 
 def get_packs_from_landing_page(branch_name: str) -> set:
@@ -861,7 +942,8 @@ def get_packs_from_landing_page(branch_name: str) -> set:
     return changed_packs
 
 
-def get_test_from_conf(branch_name, conf=deepcopy(CONF)):
+def get_test_from_conf(branch_name, conf=None):
+    conf = CONF if conf is None else conf
     tests = set([])
     changed = set([])
     change_string = tools.run_command("git diff origin/master...{} Tests/conf.json".format(branch_name))
@@ -920,8 +1002,7 @@ def is_test_runnable(test_id, id_set, conf, server_version):
         return False
     conf_fromversion = test_conf.get('fromversion', '0.0')
     conf_toversion = test_conf.get('toversion', '99.99.99')
-    test_playbooks_set = id_set.get('TestPlaybooks', [])
-    test_playbook_obj = extract_matching_object_from_id_set(test_id, test_playbooks_set, server_version)
+    test_playbook_obj = extract_matching_object_from_id_set(test_id, 'TestPlaybooks', id_set, server_version)
 
     # check whether the test is runnable in id_set
     if not test_playbook_obj:
@@ -952,16 +1033,17 @@ def is_test_integrations_available(server_version, test_conf, conf, id_set):
         if not is_test_uses_active_integration(test_integration_ids, conf):
             return False
         # check if all integration from/toversion is valid with server_version
-        integrations_set = id_set.get('integrations', [])
-        if any(extract_matching_object_from_id_set(integration_id, integrations_set, server_version) is None for
+        id_set = IdSetIndex.of(id_set)
+        if any(extract_matching_object_from_id_set(integration_id, 'integrations', id_set, server_version) is None for
                integration_id in
                test_integration_ids):
             return False
     return True
 
 
-def is_test_uses_active_integration(integration_ids, conf=deepcopy(CONF)):
+def is_test_uses_active_integration(integration_ids, conf=None):
     """Checks whether there's an an integration in test_integration_ids that's not skipped"""
+    conf = CONF if conf is None else conf
     skipped_integrations = conf.get_skipped_integrations()
     # check if all integrations are skipped
     if all(integration_id in skipped_integrations for integration_id in integration_ids):
@@ -989,16 +1071,10 @@ def get_content_pack_name_of_test(tests: set, id_set: Optional[Dict] = None) ->
     """
     content_packs = set()
     if id_set is not None:
-        for test_playbook_object in id_set.get('TestPlaybooks', []):
-            test_playbook_name = list(test_playbook_object.keys())[0]
-            test_playbook_data = list(test_playbook_object.values())[0]
-            if test_playbook_name in tests:
-                pack_name = test_playbook_data.get('pack')
-                if pack_name:
-                    content_packs.add(pack_name)
-                    if len(tests) == len(content_packs):
-                        # we found all content packs for all tests we were looking for
-                        break
+        for _, _, test_playbook_data in IdSetIndex.of(id_set).get_entities_by_ids('TestPlaybooks', tests):
+            pack_name = test_playbook_data.get('pack')
+            if pack_name:
+                content_packs.add(pack_name)
 
     return content_packs
 
@@ -1065,6 +1141,7 @@ def remove_tests_for_non_supported_packs(tests: set, id_set: dict) -> set:
              set: The filtered tests set
         """
     tests_that_should_not_be_tested = set()
+    id_set = IdSetIndex.of(id_set)
     for test in tests:
         content_pack_name_list = list(get_content_pack_name_of_test({test}, id_set))
         if content_pack_name_list:
@@ -1111,6 +1188,7 @@ def filter_tests(tests: set, id_set: dict, modified_packs: set, is_nightly=False
     Returns:
         (set): Set of tests without ignored, non supported and deprecated-packs tests.
     """
+    id_set = IdSetIndex.of(id_set)
     tests_with_no_dummy_strings = {test for test in tests if 'no test' not in test.lower()}
     tests_without_ignored = remove_ignored_tests(tests_with_no_dummy_strings, id_set, modified_packs)
     tests_without_non_supported = remove_tests_for_non_supported_packs(tests_without_ignored, id_set)
@@ -1167,9 +1245,12 @@ def is_documentation_changes_only(files_string: str) -> bool:
 
 def get_test_list_and_content_packs_to_install(files_string,
                                                branch_name,
-                                               conf=deepcopy(CONF),
-                                               id_set=deepcopy(ID_SET)):
+                                               conf=None,
+                                               id_set=None):
     """Create a test list that should run"""
+    conf = CONF if conf is None else conf
+    # the id_set is indexed once, and the index is used by all the collection steps
+    id_set = IdSetIndex.of(ID_SET if id_set is None else id_set)
     modified_files_instance = get_modified_files_for_testing(files_string)
 
     modified_files_with_relevant_tests = modified_files_instance.modified_files
@@ -1303,22 +1384,15 @@ def get_from_version_and_to_version_bounderies(all_modified_files_paths: set,
         if to_version:
             max_to_version = max(max_to_version, Version(to_version))
 
-    for artifacts in id_set.values():
-
-        # Ignore the Packs list in the ID set
-        if isinstance(artifacts, dict):
-            break
-
-        for artifact_dict in artifacts:
-            for artifact_details in artifact_dict.values():
-                if artifact_details.get('file_path') in all_modified_files_paths:
-                    from_version = artifact_details.get('fromversion')
-                    to_version = artifact_details.get('toversion')
-                    if from_version:
-                        min_from_version = min(min_from_version, Version(from_version))
-                        max_from_version = max(max_from_version, Version(from_version))
-                    if to_version:
-                        max_to_version = max(max_to_version, Version(to_version))
+    modified_artifacts = IdSetIndex.merge_entries(IdSetIndex.of(id_set).entities_by_file_path, all_modified_files_paths)
+    for _, _, artifact_details in modified_artifacts:
+        from_version = artifact_details.get('fromversion')
+        to_version = artifact_details.get('toversion')
+        if from_version:
+            min_from_version = min(min_from_version, Version(from_version))
+            max_from_version = max(max_from_version, Version(from_version))
+        if to_version:
+            max_to_version = max(max_to_version, Version(to_version))
 
     if str(max_to_version) == '0.0.0' or max_to_version < max_from_version:
         max_to_version = Version('99.99.99')
@@ -1384,7 +1458,7 @@ def create_test_file(is_nightly, skip_save=False, path_to_pack=''):
     """Create a file containing all the tests we need to run for the CI"""
     if is_nightly:
         packs_to_install = filter_installed_packs(set(os.listdir(constants.PACKS_DIR)))
-        tests = filter_tests(set(CONF.get_test_playbook_ids()), id_set=deepcopy(ID_SET), is_nightly=True,
+        tests = filter_tests(set(CONF.get_test_playbook_ids()), id_set=ID_SET, is_nightly=True,
                              modified_packs=set())
         logging.info("Nightly - collected all tests that appear in conf.json and all packs from content repo that "
                      "should be tested")
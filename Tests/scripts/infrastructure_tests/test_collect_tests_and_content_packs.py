@@ -1,6 +1,7 @@
 # type: ignore[attr-defined]
 # pylint: disable=no-member
 import copy
+import gc
 import json
 import os
 import tempfile
@@ -16,7 +17,7 @@ from demisto_sdk.commands.common.constants import (PACK_METADATA_SUPPORT,
                                                    PACKS_PACK_META_FILE_NAME,
                                                    PACKS_DIR)
 from Tests.scripts.collect_tests_and_content_packs import (
-    SANITY_TESTS, TestConf, collect_content_packs_to_install,
+    SANITY_TESTS, TestConf, IdSetIndex, collect_content_packs_to_install,
     create_filter_envs_file, get_from_version_and_to_version_bounderies,
     get_test_list_and_content_packs_to_install, is_documentation_changes_only,
     remove_ignored_tests, remove_tests_for_non_supported_packs, check_if_test_should_not_be_missed)
@@ -1150,6 +1151,79 @@ def test_collect_test_playbooks_no_results():
     assert set() == content_packs
 
 
+@pytest.mark.parametrize('entity_type, entity_id_or_name, server_version, expected_file_path', [
+    ('integrations', 'fake_integration', '5.5.0',
+     'Tests/scripts/infrastructure_tests/tests_data/mock_integrations/fake_integration/fake_integration.yml'),
+    ('integrations', 'future_integration_1', '6.0.0', None),
+    ('playbooks', 'Calculate Severity By Highest DBotScore', '6.0.0',
+     'Tests/scripts/infrastructure_tests/tests_data/mock_playbooks/fake_playbook.yml'),
+    ('TestPlaybooks', 'not_in_id_set', '6.0.0', None),
+])
+def test_id_set_index_get_matching_entity(entity_type, entity_id_or_name, server_version, expected_file_path):
+    """
+    Given
+    - Case a: an integration which appears twice in the id_set.
+    - Case b: an integration which is not runnable in the server version.
+    - Case c: a playbook which appears twice in the id_set.
+    - Case d: a test playbook which is not in the id_set.
+
+    When
+    - Getting the entity from the indexed id_set.
+
+    Then
+    - Case a: Ensure the first runnable occurrence of the integration is returned.
+    - Case b: Ensure nothing is returned.
+    - Case c: Ensure the first occurrence of the playbook is returned.
+    - Case d: Ensure nothing is returned.
+    """
+    entity = IdSetIndex(MOCK_ID_SET).get_matching_entity(entity_type, entity_id_or_name, server_version)
+    assert (entity or {}).get('file_path') == expected_file_path
+
+
+def test_id_set_index_reverse_lookups():
+    """
+    Given
+    - The id_set.
+
+    When
+    - Indexing the id_set.
+
+    Then
+    - Ensure the index is still the id_set.
+    - Ensure the entities which use a script or a command are found without scanning the id_set.
+    """
+    id_set = IdSetIndex(MOCK_ID_SET)
+
+    assert id_set == MOCK_ID_SET
+    assert IdSetIndex.of(id_set) is id_set
+    playbooks_using_script = [entry[1] for entry in id_set.playbooks_by_implementing_script['fake-script']]
+    assert playbooks_using_script == ['fake_playbook', 'test_fake_playbook']
+    assert [entry[1] for entry in id_set.scripts_by_depends_on['fake-command']] == ['fake-script']
+    assert 'fake_test_playbook' in {entry[1] for entry in id_set.test_playbooks_by_command['fake-command']}
+
+
+def test_id_set_index_load(tmp_path):
+    """
+    Given
+    - An id_set file.
+
+    When
+    - Loading the id_set index.
+
+    Then
+    - Ensure the id_set is loaded and indexed.
+    - Ensure garbage collection is enabled again after loading.
+    """
+    id_set_path = tmp_path / 'id_set.json'
+    id_set_path.write_text(json.dumps(MOCK_ID_SET))
+
+    id_set = IdSetIndex.load(str(id_set_path))
+
+    assert id_set == MOCK_ID_SET
+    assert id_set.scripts_by_depends_on.keys() == IdSetIndex(MOCK_ID_SET).scripts_by_depends_on.keys()
+    assert gc.isenabled()
+
+
 @pytest.mark.parametrize('tests_to_filter, ignored_tests, expected_result', [
     ({'fake_test_playbook'}, {'fake_test_playbook'}, set()),
     ({'fake_test_playbook'}, set(), {'fake_test_playbook'}),